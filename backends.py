@@ -0,0 +1,490 @@
+"""
+Speech / Translation / TTS Backends
+One interface per stage with Google Cloud and local (open-source)
+implementations, so each stage can be picked independently:
+
+    backends = make_backends(stt="whisper", mt="google", tts="google")
+
+Defaults come from the stt_backend / mt_backend / tts_backend settings.
+Constructing a backend is cheap: clients, heavy libraries and models are
+only loaded on the first call that needs them.
+"""
+
+import html
+import io
+import threading
+import wave
+from collections import namedtuple
+
+import numpy as np
+
+import clients
+from config import settings
+from profiles import get_whisper_profile, whisper_transcribe_options
+from quota import quotas
+from segmenter import EnergyVAD, quietest_cut
+from translation import MicroBatcher, split_clauses, split_text, translate_batch
+from voices import registry as voice_registry
+
+RATE = 16000
+
+Backends = namedtuple("Backends", ["stt", "mt", "tts"])
+
+
+# ==============================
+# INTERFACES
+# ==============================
+class SpeechToText:
+    """Recognizes int16 mono PCM"""
+
+    def warm_up(self):
+        """Open connections / load models ahead of the first request"""
+
+    def stream(self, chunks, language_code, rate=RATE):
+        """chunks: iterator of raw int16 bytes -> yields (transcript, is_final)"""
+        raise NotImplementedError
+
+    def transcribe(self, samples, language_code, rate=RATE):
+        """samples: int16 or float32 numpy array -> transcript"""
+        raise NotImplementedError
+
+    def stream_detect(self, chunks, language_codes, rate=RATE):
+        """
+        Like stream() for speech in any of language_codes -> yields
+        (transcript, is_final, language_code). Backends that can't tell
+        languages apart report the first one.
+        """
+        for transcript, is_final in self.stream(chunks, language_codes[0], rate):
+            yield transcript, is_final, language_codes[0]
+
+    def transcribe_detect(self, samples, language_codes, rate=RATE):
+        """-> (transcript, language_code)"""
+        return self.transcribe(samples, language_codes[0], rate), language_codes[0]
+
+
+class Translator:
+
+    def warm_up(self):
+        pass
+
+    def translate(self, text, source, target):
+        """Plain text in, plain (unescaped) text out"""
+        raise NotImplementedError
+
+    def translate_many(self, texts, source, target):
+        """List in, list out - same order, same segment boundaries"""
+        return [self.translate(text, source, target) if text.strip() else "" for text in texts]
+
+    def translate_long(self, text, source, target):
+        """Whole transcript in, whole translation out - split at sentence boundaries, rejoined in order"""
+        translated = self.translate_many(split_text(text), source, target)
+        return " ".join(t for t in translated if t)
+
+
+class TextToSpeech:
+
+    def warm_up(self):
+        pass
+
+    def synthesize(self, text, lang_code, source=None):
+        """-> (samples numpy array, sample_rate); `source` is the language the text was translated from"""
+        raise NotImplementedError
+
+    def synthesize_clauses(self, text, lang_code, source=None):
+        """Yields (samples, sample_rate) clause by clause - the first is ready before the rest are synthesized"""
+        for clause in split_clauses(text):
+            yield self.synthesize(clause, lang_code, source)
+
+
+# ==============================
+# GOOGLE CLOUD
+# ==============================
+class GoogleSpeechToText(SpeechToText):
+    """Client is the shared clients.speech_client() unless one is passed in"""
+
+    def __init__(self, client=None, model="default"):
+        self._client = client
+        self.model = model
+
+    @property
+    def client(self):
+        return self._client or clients.speech_client()
+
+    def warm_up(self):
+        clients.prewarm("speech")
+
+    def _config(self, language_code, rate, alternative_language_codes=()):
+        from google.cloud import speech
+
+        return speech.RecognitionConfig(
+            encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
+            sample_rate_hertz=rate,
+            language_code=language_code,
+            alternative_language_codes=list(alternative_language_codes),
+            model=self.model,
+            enable_automatic_punctuation=True,
+        )
+
+    def _results(self, chunks, config):
+        from google.cloud import speech
+
+        streaming_config = speech.StreamingRecognitionConfig(
+            config=config,
+            interim_results=True,
+            single_utterance=False
+        )
+        requests = (
+            speech.StreamingRecognizeRequest(audio_content=chunk)
+            for chunk in chunks
+        )
+
+        # Opening the stream takes a request token; a failure mid-stream is
+        # not retried (its audio has already been consumed)
+        responses = quotas.call("speech", lambda: self.client.streaming_recognize(streaming_config, requests))
+        for response in responses:
+            for result in response.results:
+                if result.alternatives:
+                    yield result
+
+    def stream(self, chunks, language_code, rate=RATE):
+        for result in self._results(chunks, self._config(language_code, rate)):
+            yield result.alternatives[0].transcript, result.is_final
+
+    def stream_detect(self, chunks, language_codes, rate=RATE):
+        # One stream recognizes every language; each result says which one it heard
+        config = self._config(language_codes[0], rate, language_codes[1:])
+        for result in self._results(chunks, config):
+            language = detected_language(result.language_code, language_codes)
+            yield result.alternatives[0].transcript, result.is_final, language
+
+    def transcribe(self, samples, language_code, rate=RATE):
+        from google.cloud import speech
+
+        audio = speech.RecognitionAudio(content=to_int16(samples).tobytes())
+        config = self._config(language_code, rate)
+        response = quotas.call("speech", lambda: self.client.recognize(config=config, audio=audio))
+        return " ".join(r.alternatives[0].transcript for r in response.results if r.alternatives)
+
+
+class GoogleTranslator(Translator):
+    """
+    With a batch window (translate_batch_window_ms, default off) concurrent
+    translate() calls are coalesced into one request by a MicroBatcher.
+    translate_many() sends its requests on up to translate_max_workers threads.
+    """
+
+    def __init__(self, client=None, batch_window_ms=None, max_workers=None):
+        self._client = client
+        self.max_workers = max_workers or settings.translate_max_workers
+        if batch_window_ms is None:
+            batch_window_ms = settings.translate_batch_window_ms
+        self.batcher = MicroBatcher(batch_window_ms / 1000, client) if batch_window_ms > 0 else None
+
+    @property
+    def client(self):
+        return self._client or clients.translate_client()
+
+    def warm_up(self):
+        clients.prewarm("translate")
+
+    def translate(self, text, source, target):
+        if self.batcher:
+            return self.batcher.translate(text, source, target)
+
+        result = quotas.call(
+            "translate",
+            lambda: self.client.translate(text, source_language=source, target_language=target),
+            chars=len(text)
+        )
+        return html.unescape(result["translatedText"])
+
+    def translate_many(self, texts, source, target):
+        return translate_batch(texts, source, target, client=self._client, max_workers=self.max_workers)
+
+
+class GoogleTextToSpeech(TextToSpeech):
+    """Voice per language from voices.json; its request objects are built once, not per utterance"""
+
+    def __init__(self, client=None, rate=RATE, voices=None):
+        self._client = client
+        self.rate = rate
+        self.voices = voices or voice_registry
+
+    @property
+    def client(self):
+        return self._client or clients.tts_client()
+
+    def warm_up(self):
+        clients.prewarm("tts")
+
+    def synthesize(self, text, lang_code, source=None):
+        from google.cloud import texttospeech
+
+        # `source` picks up the voices.json "directions" override for the pair
+        voice, audio_config = self.voices.google_params(lang_code, source, sample_rate=self.rate)
+        response = quotas.call(
+            "tts",
+            lambda: self.client.synthesize_speech(
+                input=texttospeech.SynthesisInput(text=text),
+                voice=voice,
+                audio_config=audio_config
+            ),
+            chars=len(text)
+        )
+        return decode_linear16(response.audio_content, self.rate)
+
+
+# ==============================
+# LOCAL MODELS
+# ==============================
+# Models load on first use (not at construction), so building a pipeline
+# is instant and unused stages cost nothing.
+class WhisperSpeechToText(SpeechToText):
+    """faster_whisper; streaming is emulated by cutting the audio at pauses"""
+
+    def __init__(self, model_size="large-v2", profile=None,
+                 pause_seconds=0.6, max_utterance_seconds=15):
+        self.model_size = model_size
+        self.profile = get_whisper_profile(profile or settings.whisper_profile)
+        self.options = whisper_transcribe_options(self.profile)
+        self.pause_seconds = pause_seconds
+        self.max_utterance_seconds = max_utterance_seconds
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        with self._lock:
+            if self._model is None:
+                from faster_whisper import WhisperModel
+                self._model = WhisperModel(self.model_size, compute_type=self.profile["compute_type"])
+        return self._model
+
+    def warm_up(self):
+        self.model
+
+    def transcribe(self, samples, language_code, rate=RATE):
+        segments, _ = self.model.transcribe(
+            to_float32(samples),
+            language=language_code.split("-")[0],
+            **self.options
+        )
+        # segments is a lazy generator - decoding happens here
+        return " ".join(seg.text for seg in segments).strip()
+
+    def transcribe_detect(self, samples, language_codes, rate=RATE):
+        """Whisper's language ID, limited to language_codes"""
+        audio = to_float32(samples)
+        candidates = [code.split("-")[0] for code in language_codes]
+
+        segments, info = self.model.transcribe(audio, language=None, **self.options)
+        probabilities = dict(info.all_language_probs or [(info.language, info.language_probability)])
+        best = max(candidates, key=lambda language: probabilities.get(language, 0.0))
+        if best != info.language:
+            # Detected a language we don't translate - decode as the likeliest one we do
+            segments, _ = self.model.transcribe(audio, language=best, **self.options)
+
+        text = " ".join(seg.text for seg in segments).strip()
+        return text, language_codes[candidates.index(best)]
+
+    def stream(self, chunks, language_code, rate=RATE):
+        for utterance in self._utterances(chunks, rate):
+            text = self.transcribe(utterance, language_code, rate)
+            if text:
+                yield text, True
+
+    def stream_detect(self, chunks, language_codes, rate=RATE):
+        for utterance in self._utterances(chunks, rate):
+            text, language = self.transcribe_detect(utterance, language_codes, rate)
+            if text:
+                yield text, True, language
+
+    def _utterances(self, chunks, rate):
+        """Audio between pauses, as float32 arrays"""
+        vad = EnergyVAD(rate, pause_seconds=self.pause_seconds)
+        utterance = []
+        samples = 0
+
+        for data in chunks:
+            chunk = to_float32(np.frombuffer(data, dtype=np.int16))
+            paused = vad.update(chunk)
+
+            if not vad.heard_speech and not paused and not utterance:
+                continue
+
+            utterance.append(chunk)
+            samples += len(chunk)
+
+            if paused:
+                yield np.concatenate(utterance)
+                utterance = []
+                samples = 0
+            elif samples >= rate * self.max_utterance_seconds:
+                # Long monologue - cut at the quietest moment of the second half, keep the rest
+                audio = np.concatenate(utterance)
+                cut = quietest_cut(audio, rate, start=len(audio) // 2)
+                yield audio[:cut]
+                utterance = [audio[cut:]]
+                samples = len(audio) - cut
+
+
+# NLLB uses FLORES-200 language codes
+NLLB_CODES = {
+    "en": "eng_Latn",
+    "fr": "fra_Latn",
+    "ta": "tam_Taml",
+    "hi": "hin_Deva",
+}
+
+
+class NLLBTranslator(Translator):
+
+    def __init__(self, model_name="facebook/nllb-200-distilled-600M"):
+        self.model_name = model_name
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._model is None:
+                from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+                self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+                self._model = AutoModelForSeq2SeqLM.from_pretrained(self.model_name)
+        return self.tokenizer, self._model
+
+    def warm_up(self):
+        self._load()
+
+    def translate(self, text, source, target):
+        tokenizer, model = self._load()
+        tokenizer.src_lang = NLLB_CODES[source]
+        inputs = tokenizer(text, return_tensors="pt")
+        translated_tokens = model.generate(
+            **inputs,
+            forced_bos_token_id=tokenizer.convert_tokens_to_ids(NLLB_CODES[target])
+        )
+        return tokenizer.decode(translated_tokens[0], skip_special_tokens=True)
+
+
+class CoquiTextToSpeech(TextToSpeech):
+    """Coqui TTS; one model per language (coqui_model in voices.json)"""
+
+    def __init__(self, models=None):
+        self.models = dict(voice_registry.coqui_models(), **(models or {}))
+        self._loaded = {}
+        self._lock = threading.Lock()
+
+    def _model(self, lang_code):
+        with self._lock:
+            if lang_code not in self._loaded:
+                from TTS.api import TTS
+                name = self.models.get(lang_code, self.models["en"])
+                self._loaded[lang_code] = TTS(model_name=name, progress_bar=False)
+            return self._loaded[lang_code]
+
+    def warm_up(self):
+        self._model("en")
+
+    def synthesize(self, text, lang_code, source=None):
+        tts = self._model(lang_code)
+        wav = tts.tts(text)
+        return np.array(wav, dtype=np.float32), tts.synthesizer.output_sample_rate
+
+
+# ==============================
+# SELECTION
+# ==============================
+STT_BACKENDS = {"google": GoogleSpeechToText, "whisper": WhisperSpeechToText}
+MT_BACKENDS = {"google": GoogleTranslator, "nllb": NLLBTranslator}
+TTS_BACKENDS = {"google": GoogleTextToSpeech, "coqui": CoquiTextToSpeech}
+
+
+LOCAL_DEFAULTS = {"stt": "whisper", "mt": "nllb", "tts": "coqui"}
+
+
+def _select(registry, stage, name, default):
+    if default == "local":
+        default = LOCAL_DEFAULTS[stage]
+    name = name or settings[f"{stage}_backend"] or default
+    if name not in registry:
+        raise ValueError(
+            f"Unknown {stage.upper()} backend '{name}' (choose from: {', '.join(registry)})"
+        )
+    return registry[name]()
+
+
+def make_stt(name=None, default="google"):
+    return _select(STT_BACKENDS, "stt", name, default)
+
+
+def make_translator(name=None, default="google"):
+    return _select(MT_BACKENDS, "mt", name, default)
+
+
+def make_tts(name=None, default="google"):
+    return _select(TTS_BACKENDS, "tts", name, default)
+
+
+def make_backends(stt=None, mt=None, tts=None, default="google"):
+    """
+    One backend per stage. A stage uses the explicit name, else its
+    stt_backend / mt_backend / tts_backend setting, else `default`
+    ("google" or "local").
+    """
+    return Backends(
+        stt=make_stt(stt, default),
+        mt=make_translator(mt, default),
+        tts=make_tts(tts, default),
+    )
+
+
+def prewarm(backends):
+    """Warm every stage in the background; returns the started threads"""
+    def warm(backend):
+        try:
+            backend.warm_up()
+        except Exception as e:
+            print(f"⚠️  Pre-warm failed for {type(backend).__name__}: {e}")
+
+    threads = [
+        threading.Thread(target=warm, args=(backend,), daemon=True)
+        for backend in backends
+    ]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+# ==============================
+# AUDIO HELPERS
+# ==============================
+def to_float32(samples):
+    if samples.dtype == np.int16:
+        return samples.astype(np.float32) / 32768.0
+    return samples.astype(np.float32, copy=False)
+
+
+def to_int16(samples):
+    if samples.dtype == np.int16:
+        return samples
+    return (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+
+
+def detected_language(found, language_codes):
+    """Speech reports e.g. 'fr-fr' - map it back to one of the requested codes"""
+    found = (found or "").lower()
+    for code in language_codes:
+        if code.lower() == found:
+            return code
+    for code in language_codes:
+        if code.split("-")[0].lower() == found.split("-")[0]:
+            return code
+    return language_codes[0]
+
+
+def decode_linear16(content, rate):
+    """LINEAR16 responses carry a WAV header - strip it instead of playing it"""
+    if content[:4] == b"RIFF":
+        with wave.open(io.BytesIO(content), "rb") as wf:
+            return np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16), wf.getframerate()
+    return np.frombuffer(content, dtype=np.int16), rate
@@ -0,0 +1,4 @@
+"""
+Benchmark Harnesses
+Run from the repository root, e.g. `python -m benchmarks.whisper_profiles`
+"""
@@ -0,0 +1,105 @@
+"""
+Backend Latency Comparison
+Runs the same recorded utterances through every STT x MT x TTS backend
+combination and reports per-stage and total latency.
+
+Usage:
+    python -m benchmarks.backends meeting_fr.wav
+    python -m benchmarks.backends meeting_fr.wav --stt google whisper --mt google nllb --tts google
+    python -m benchmarks.backends --fake-cloud      # Google backends replaced by benchmarks/fakes.py
+"""
+
+import argparse
+import itertools
+import os
+import tempfile
+import time
+
+from backends import MT_BACKENDS, STT_BACKENDS, TTS_BACKENDS, make_stt, make_translator, make_tts
+from benchmarks.fakes import FakeCloud, install, load_pcm, speech_regions
+from benchmarks.fixtures import RATE, ensure_fixtures
+from tracing import percentile
+
+STAGES = ("stt", "mt", "tts", "total")
+
+
+def utterances(path, limit):
+    """Cut the recording into utterances at pauses"""
+    samples = load_pcm(path, RATE)
+    regions = speech_regions(samples, RATE)[:limit]
+    return [samples[int(start * RATE):int(end * RATE)] for start, end in regions]
+
+
+def run_combo(stt_name, mt_name, tts_name, clips, source, target, cache):
+    # Models are expensive to load - share instances across combinations
+    def cached(factory, name):
+        if (factory, name) not in cache:
+            cache[(factory, name)] = factory(name)
+        return cache[(factory, name)]
+
+    stt = cached(make_stt, stt_name)
+    mt = cached(make_translator, mt_name)
+    tts = cached(make_tts, tts_name)
+
+    timings = {stage: [] for stage in STAGES}
+    for clip in clips:
+        start = time.perf_counter()
+        text = stt.transcribe(clip, source, RATE)
+        recognized = time.perf_counter()
+        translated = mt.translate(text, source.split("-")[0], target) if text else ""
+        translated_at = time.perf_counter()
+        if translated:
+            tts.synthesize(translated, target)
+        end = time.perf_counter()
+
+        timings["stt"].append(recognized - start)
+        timings["mt"].append(translated_at - recognized)
+        timings["tts"].append(end - translated_at)
+        timings["total"].append(end - start)
+
+    return {stage: sorted(values) for stage, values in timings.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="STT/MT/TTS backend latency comparison")
+    parser.add_argument("fixture", nargs="?", help="WAV/MP4 recording (default: generated)")
+    parser.add_argument("--stt", nargs="+", default=list(STT_BACKENDS), choices=STT_BACKENDS)
+    parser.add_argument("--mt", nargs="+", default=list(MT_BACKENDS), choices=MT_BACKENDS)
+    parser.add_argument("--tts", nargs="+", default=list(TTS_BACKENDS), choices=TTS_BACKENDS)
+    parser.add_argument("--source", default="fr-FR")
+    parser.add_argument("--target", default="en")
+    parser.add_argument("--utterances", type=int, default=10)
+    parser.add_argument("--fake-cloud", action="store_true", help="use in-process fakes for Google APIs")
+    args = parser.parse_args()
+
+    restore = install(FakeCloud()) if args.fake_cloud else None
+    try:
+        fixture = args.fixture or ensure_fixtures(
+            os.path.join(tempfile.gettempdir(), "translator_fixtures"), with_video=False)[0]
+        clips = utterances(fixture, args.utterances)
+        print(f"🎧 {len(clips)} utterances from {os.path.basename(fixture)}")
+
+        cache = {}
+        results = []
+        for combo in itertools.product(args.stt, args.mt, args.tts):
+            print(f"▶️  {' + '.join(combo)}")
+            try:
+                results.append((combo, run_combo(*combo, clips, args.source, args.target, cache)))
+            except Exception as e:
+                print(f"   ❌ skipped: {e}")
+    finally:
+        if restore:
+            restore()
+
+    results.sort(key=lambda item: percentile(item[1]["total"], 0.5))
+
+    print("\n" + "=" * 84)
+    print(f"  {'STT':<9}{'MT':<8}{'TTS':<8}" + "".join(f"{s + ' p50':>12}" for s in STAGES) + f"{'total p95':>12}")
+    print("=" * 84)
+    for (stt, mt, tts), timings in results:
+        row = "".join(f"{percentile(timings[s], 0.5):>12.3f}" for s in STAGES)
+        print(f"  {stt:<9}{mt:<8}{tts:<8}{row}{percentile(timings['total'], 0.95):>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
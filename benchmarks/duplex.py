@@ -0,0 +1,165 @@
+"""
+Duplex / Direction Switch Benchmark
+Drives web_translator.py sessions against the fake clients:
+
+  * switch: flips direction every --switch-every seconds while the
+    fixture plays, either instantly (a new lane takes the next chunk,
+    the old one drains) or the old way (stop, join, sleep 0.3 s,
+    restart). Reports words finalized vs a run without switches.
+  * duplex: the meeting input (fr -> en) and a browser mic (en -> fr)
+    translated at the same time, sharing one set of clients and each
+    playing on its own output device.
+
+Usage:
+    python -m benchmarks.duplex
+    python -m benchmarks.duplex --switch-every 3 --speed 2
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from benchmarks.fakes import FakeCloud, install, load_pcm
+from benchmarks.fixtures import RATE, ensure_fixtures
+from benchmarks.pipelines import browser_uplink, parse_latency
+from tracing import tracer
+
+SWITCH_MODES = ("none", "instant", "restart")
+
+
+def listen(session):
+    """Collect final transcripts emitted by a session"""
+    finals = []
+
+    def emit(event, data=None):
+        if event == 'transcripts':
+            finals.extend(final['text'] for final in data['finals'])
+
+    session.emit = emit
+    return finals
+
+
+def wait_idle(cloud, session, timeout=60):
+    """Until the session's recognizer ended and every final was spoken"""
+    session.stop.wait(timeout)
+    cloud.wait_for("playbacks_finished", cloud.counters.get("speech_finals", 0), timeout)
+
+
+def run_switch(module, cloud, fixture, mode, every):
+    samples = load_pcm(fixture, RATE)
+    cloud.reset(samples, RATE)
+    tracer.reset()
+
+    session = module.DeviceSession()
+    finals = listen(session)
+    direction = 'fr-en'
+    module.start_session(session, direction, "device")
+
+    switches = 0
+    seconds = len(samples) / RATE / cloud.speed
+    start = time.monotonic()
+    while mode != "none" and time.monotonic() - start + every / cloud.speed < seconds:
+        time.sleep(every / cloud.speed)
+        direction = module.reverse_direction(direction)
+        switches += 1
+        if mode == "instant":
+            module.switch_direction(session, direction)
+        else:
+            # What change_direction used to do
+            module.stop_session(session)
+            time.sleep(0.3)
+            module.start_session(session, direction, "device")
+
+    wait_idle(cloud, session)
+    module.stop_session(session)
+
+    return {
+        "mode": mode,
+        "switches": switches,
+        "finals": len(finals),
+        "words": sum(len(text.split()) for text in finals),
+    }
+
+
+def run_duplex(module, cloud, fixture, duplex):
+    cloud.reset(load_pcm(fixture, RATE), RATE)
+    tracer.reset()
+    start = time.perf_counter()
+
+    # Like sessions_for(): the meeting plays on your headphones, your mic into the meeting
+    remote = module.DeviceSession()
+    remote.output_device = "Fake Headphones"
+    listen(remote)
+    module.start_session(remote, 'fr-en', "device")
+    sessions = [remote]
+
+    if duplex:
+        local = module.BrowserSession("bench")
+        local.output_device = "Fake CABLE Input"
+        listen(local)
+        module.start_session(local, 'en-fr', "device")
+        threading.Thread(target=browser_uplink, args=(cloud, local, 20.0, 0.0), daemon=True).start()
+        sessions.append(local)
+
+    for session in sessions:
+        wait_idle(cloud, session)
+    wall = time.perf_counter() - start
+    for session in sessions:
+        module.stop_session(session)
+
+    e2e = tracer.histograms().get("end_to_end", {})
+    return {
+        "lanes": len(sessions),
+        "utterances": e2e.get("count", 0),
+        "e2e_p50": e2e.get("p50", 0.0),
+        "e2e_p95": e2e.get("p95", 0.0),
+        "wall": wall,
+        "connects": cloud.counters.get("connects", 0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Duplex and direction switch benchmark")
+    parser.add_argument("--fixture", help="WAV file (default: generated 60 s meeting)")
+    parser.add_argument("--fixture-dir", default=os.path.join(tempfile.gettempdir(), "translator_fixtures"))
+    parser.add_argument("--switch-every", type=float, default=5.0, help="seconds of audio between switches")
+    parser.add_argument("--latency", action="append", default=[], metavar="API=SPEC")
+    parser.add_argument("--speed", type=float, default=1.0)
+    args = parser.parse_args()
+
+    fixture = args.fixture or next(f for f in ensure_fixtures(args.fixture_dir) if f.endswith("medium_60s.wav"))
+
+    cloud = FakeCloud(latencies=parse_latency(args.latency))
+    cloud.speed = args.speed
+    restore = install(cloud)
+
+    import web_translator
+
+    try:
+        switches = [run_switch(web_translator, cloud, fixture, mode, args.switch_every) for mode in SWITCH_MODES]
+        duplex = [run_duplex(web_translator, cloud, fixture, on) for on in (False, True)]
+    finally:
+        restore()
+        cloud.close()
+
+    baseline = switches[0]["words"] or 1
+    print("\n" + "=" * 60)
+    print(f"  {'SWITCH':<10}{'SWITCHES':>9}{'FINALS':>8}{'WORDS':>8}{'WORDS LOST':>12}")
+    print("=" * 60)
+    for r in switches:
+        lost = baseline - r["words"]
+        print(f"  {r['mode']:<10}{r['switches']:>9}{r['finals']:>8}{r['words']:>8}"
+              f"{lost:>7} ({lost / baseline:>3.0%})")
+
+    print("\n" + "=" * 60)
+    print(f"  {'LANES':<8}{'UTT':>6}{'E2E p50':>10}{'p95':>8}{'WALL s':>9}{'CONNECTS':>10}")
+    print("=" * 60)
+    for r in duplex:
+        print(f"  {r['lanes']:<8}{r['utterances']:>6}{r['e2e_p50']:>10.3f}{r['e2e_p95']:>8.3f}"
+              f"{r['wall']:>9.2f}{r['connects']:>10}")
+
+
+if __name__ == "__main__":
+    main()
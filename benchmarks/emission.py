@@ -0,0 +1,119 @@
+"""
+Transcript Emission Benchmark
+Many sessions each receive interim results at recognizer speed (growing
+text, the last word revised now and then, a final every few seconds).
+Compares per-result emission (--fps 0) with coalesced delta batches at
+several frame rates: messages/s and bytes/s actually sent, time spent
+serializing them, and how long an interim waited before going out.
+
+Usage:
+    python -m benchmarks.emission
+    python -m benchmarks.emission --sessions 200 --interims-per-second 20 --fps 0 5 10
+"""
+
+import argparse
+import json
+import random
+import time
+
+from emission import EmissionScheduler, TranscriptEmitter, stats
+from tracing import tracer
+
+WORDS = "bonjour merci réunion budget semaine équipe question réponse rapport client projet".split()
+
+
+class Speaker:
+    """One session's recognizer: a growing hypothesis, finalized every few seconds"""
+
+    def __init__(self, rng, utterance_seconds):
+        self.rng = rng
+        self.utterance_seconds = utterance_seconds
+        self.words = []
+        self.started = time.monotonic()
+
+    def next(self):
+        """-> (text, is_final)"""
+        if time.monotonic() - self.started >= self.utterance_seconds and self.words:
+            text = " ".join(self.words) + "."
+            self.words = []
+            self.started = time.monotonic()
+            return text, True
+
+        if self.words and self.rng.random() < 0.3:
+            self.words[-1] = self.rng.choice(WORDS)   # recognizer changed its mind
+        else:
+            self.words.append(self.rng.choice(WORDS))
+        return " ".join(self.words), False
+
+
+def run(fps, sessions, rate, seconds, utterance_seconds):
+    stats.reset()
+    tracer.reset()
+    scheduler = EmissionScheduler(fps)
+    serialize = [0.0]
+
+    def send(event, payload):
+        # Roughly what Socket.IO does to every message before writing it
+        start = time.perf_counter()
+        json.dumps([event, payload], ensure_ascii=False)
+        serialize[0] += time.perf_counter() - start
+
+    rng = random.Random(0)
+    pairs = [(TranscriptEmitter(send, scheduler), Speaker(rng, utterance_seconds)) for _ in range(sessions)]
+
+    start = time.monotonic()
+    tick = start
+    while time.monotonic() - start < seconds:
+        for emitter, speaker in pairs:
+            text, is_final = speaker.next()
+            if is_final:
+                emitter.final("fr-en", text)
+            else:
+                emitter.interim("fr-en", text)
+        tick += 1 / rate
+        time.sleep(max(0.0, tick - time.monotonic()))
+
+    for emitter, _ in pairs:
+        emitter.close()
+
+    snapshot = stats.snapshot()
+    delay = tracer.histograms().get("interim_delay", {})
+    return {
+        "fps": fps,
+        "before": snapshot["before"],
+        "after": snapshot["after"],
+        "serialize_seconds": serialize[0],
+        "delay_p50": delay.get("p50", 0.0),
+        "delay_p95": delay.get("p95", 0.0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcript emission benchmark")
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--interims-per-second", type=float, default=20.0)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--utterance-seconds", type=float, default=4.0)
+    parser.add_argument("--fps", type=float, nargs="+", default=[0, 5, 10, 20])
+    args = parser.parse_args()
+
+    results = [run(fps, args.sessions, args.interims_per_second, args.seconds, args.utterance_seconds)
+               for fps in args.fps]
+
+    before = results[0]["before"]
+    print("\n" + "=" * 92)
+    print(f"  {args.sessions} sessions x {args.interims_per_second:g} interims/s - per-result emission would send "
+          f"{before['messages_per_second']:.0f} msg/s, {before['bytes_per_second'] / 1000:.1f} kB/s")
+    print("=" * 92)
+    print(f"  {'FPS':>5}{'MSG/s':>10}{'kB/s':>9}{'vs BEFORE':>11}{'SERIALIZE ms':>14}"
+          f"{'DELAY p50 ms':>14}{'p95 ms':>9}")
+    for r in results:
+        after = r["after"]
+        print(f"  {r['fps']:>5g}{after['messages_per_second']:>10.0f}{after['bytes_per_second'] / 1000:>9.1f}"
+              f"{after['bytes'] / max(1, r['before']['bytes']):>10.0%} "
+              f"{r['serialize_seconds'] * 1000:>13.1f}"
+              f"{r['delay_p50'] * 1000:>14.1f}{r['delay_p95'] * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,933 @@
+"""
+Fake Cloud Backends
+In-process stand-ins for Google Speech / Translate / Text-to-Speech /
+Storage, for the local Whisper / NLLB / Coqui models (opensource.py) and
+for sounddevice, with configurable latency distributions, so the
+pipelines can run on a headless box without credentials, model weights,
+microphones or virtual cables.
+
+    cloud = FakeCloud(latencies={"translate": Latency.parse("normal:0.15,0.03")})
+    restore = install(cloud)      # before importing chitrp / test / ...
+"""
+
+import datetime
+import html
+import io
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import types
+import wave
+from types import SimpleNamespace
+
+import numpy as np
+
+import clients
+
+WORDS_PER_SECOND = 2.5
+TTS_CHARS_PER_SECOND = 15
+CLAUSE_WORDS = 6          # finals get a comma every few words, like punctuated speech
+SENTENCE_WORDS = 12       # local Whisper closes a sentence every so many words, even mid-speech
+
+
+# ==============================
+# LATENCY DISTRIBUTIONS
+# ==============================
+class Latency:
+    """
+    const:S | uniform:LO,HI | normal:MEAN,STD | lognormal:MEDIAN,SIGMA
+    (all in seconds)
+    """
+
+    KINDS = ("const", "uniform", "normal", "lognormal")
+
+    def __init__(self, kind="const", a=0.0, b=0.0, seed=None):
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown latency kind '{kind}' (choose from: {', '.join(self.KINDS)})")
+        self.kind = kind
+        self.a = a
+        self.b = b
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def parse(cls, spec, seed=None):
+        kind, _, params = spec.partition(":")
+        values = [float(v) for v in params.split(",") if v] if params else []
+        return cls(kind, *values, seed=seed)
+
+    def sample(self):
+        with self._lock:
+            if self.kind == "const":
+                value = self.a
+            elif self.kind == "uniform":
+                value = self._random.uniform(self.a, self.b)
+            elif self.kind == "normal":
+                value = self._random.gauss(self.a, self.b)
+            else:
+                value = self.a * np.exp(self._random.gauss(0.0, self.b))
+        return max(0.0, float(value))
+
+    def sleep(self):
+        time.sleep(self.sample())
+
+    def __repr__(self):
+        return f"{self.kind}:{self.a},{self.b}"
+
+
+DEFAULT_LATENCIES = {
+    "speech_final": "normal:0.30,0.05",   # end of speech -> final streaming result
+    "speech_lro": "const:2.0",            # long_running_recognize queueing time
+    "translate": "lognormal:0.12,0.3",
+    "tts": "lognormal:0.25,0.3",
+    "storage": "const:0.05",              # per-request overhead on uploads
+    "connect": "const:0.35",              # TLS + channel + token on a client's first call
+    "whisper": "const:0.05",              # local models: per call, plus whisper_rtf per audio second
+    "nllb": "lognormal:0.08,0.3",
+    "coqui": "lognormal:0.15,0.3",
+}
+
+
+# ==============================
+# AUDIO HELPERS
+# ==============================
+def ffmpeg_exe():
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except ImportError:
+        exe = shutil.which("ffmpeg")
+        if not exe:
+            raise RuntimeError("ffmpeg not found (install imageio-ffmpeg or ffmpeg)")
+        return exe
+
+
+def audio_seconds(path, rate=16000):
+    """Duration without decoding when the file is a WAV"""
+    if path.lower().endswith(".wav"):
+        with wave.open(path, "rb") as wf:
+            return wf.getnframes() / wf.getframerate()
+    return len(load_pcm(path, rate)) / rate
+
+
+def load_pcm(path, rate=16000):
+    """Decode any audio/video file to mono int16 at `rate`"""
+    if path.lower().endswith(".wav"):
+        with wave.open(path, "rb") as wf:
+            if wf.getframerate() == rate and wf.getnchannels() == 1 and wf.getsampwidth() == 2:
+                return np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+
+    result = subprocess.run(
+        [ffmpeg_exe(), "-v", "error", "-i", path, "-f", "s16le", "-ac", "1", "-ar", str(rate), "-"],
+        check=True, capture_output=True,
+    )
+    return np.frombuffer(result.stdout, dtype=np.int16)
+
+
+def wav_bytes(samples, rate):
+    """LINEAR16 WAV container, like Text-to-Speech returns"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(samples.astype(np.int16).tobytes())
+    return buffer.getvalue()
+
+
+def encode_audio(samples, rate, fmt):
+    """Encode int16 PCM with ffmpeg (fmt: mp3 / ogg / flac)"""
+    result = subprocess.run(
+        [ffmpeg_exe(), "-v", "error", "-f", "s16le", "-ac", "1", "-ar", str(rate),
+         "-i", "-", "-f", fmt, "-"],
+        input=samples.astype(np.int16).tobytes(), check=True, capture_output=True,
+    )
+    return result.stdout
+
+
+def rms(samples):
+    if len(samples) == 0:
+        return 0.0
+    return float(np.sqrt(np.mean(np.square(samples.astype(np.float32)))))
+
+
+def speech_regions(samples, rate, threshold=500.0, min_gap=0.5, frame=0.1):
+    """(start, end) seconds of loud regions separated by >= min_gap silence"""
+    hop = int(rate * frame)
+    regions = []
+    start = None
+    last_loud = None
+
+    for i in range(0, len(samples), hop):
+        t = i / rate
+        if rms(samples[i:i + hop]) >= threshold:
+            if start is None:
+                start = t
+            last_loud = t + frame
+        elif start is not None and t - last_loud >= min_gap:
+            regions.append((start, last_loud))
+            start = None
+
+    if start is not None:
+        regions.append((start, last_loud))
+    return regions
+
+
+def fake_words(count, offset=0):
+    return [f"mot{offset + i + 1}" for i in range(count)]
+
+
+def punctuate(words):
+    """['mot1', ..., 'mot8'] -> 'mot1 ... mot6, mot7 mot8.'"""
+    clauses = [" ".join(words[i:i + CLAUSE_WORDS]) for i in range(0, len(words), CLAUSE_WORDS)]
+    return ", ".join(clauses) + "."
+
+
+def tone(seconds, rate, freq=220.0):
+    """int16 sine built from one second repeated, so minutes of speech stay cheap to fake"""
+    t = np.arange(rate) / rate
+    second = (np.sin(2 * np.pi * freq * t) * 8000).astype(np.int16)
+    count = int(seconds * rate)
+    return np.tile(second, count // rate + 1)[:count]
+
+
+# ==============================
+# FAKE CLOUD (SHARED STATE)
+# ==============================
+class FakeCloud:
+
+    def __init__(self, latencies=None, lro_rtf=0.05, upload_mbps=20.0,
+                 endpoint_seconds=0.5, interim_seconds=0.3, speech_threshold=500.0,
+                 translate_max_segments=128, translate_max_chars=30000,
+                 translate_seconds_per_kchar=0.02, tts_seconds_per_kchar=2.0,
+                 stream_rtf=0.1, stream_max_lead=5.0, server_quotas=None, seed=0):
+        self.latencies = {
+            name: Latency.parse(spec, seed=seed + i)
+            for i, (name, spec) in enumerate(DEFAULT_LATENCIES.items())
+        }
+        self.latencies.update(latencies or {})
+        self.lro_rtf = lro_rtf
+        self.upload_mbps = upload_mbps
+        self.endpoint_seconds = endpoint_seconds
+        self.interim_seconds = interim_seconds
+        self.speech_threshold = speech_threshold
+        self.stream_rtf = stream_rtf   # streaming server time per second of audio
+        self.stream_max_lead = stream_max_lead   # audio seconds a stream may run ahead of (scaled) real time
+        self.translate_max_segments = translate_max_segments   # payload limits -> 400
+        self.translate_max_chars = translate_max_chars
+        self.translate_seconds_per_kchar = translate_seconds_per_kchar
+        self.tts_seconds_per_kchar = tts_seconds_per_kchar   # synthesis time grows with the text
+        self.server_quotas = server_quotas or {}             # api -> requests per second, else 429
+        self.failing = set()                                 # apis answering 503 (an outage)
+        self._admitted = {}                                  # api -> request times in the last second
+
+        self.storage_dir = tempfile.mkdtemp(prefix="fake_gcs_")
+        self.source = np.zeros(0, dtype=np.int16)   # what the fake microphone plays
+        self.source_rate = 16000
+        self.device_rate = 48000                    # what the fake devices report and run at
+        self.device_channels = 2
+        self.speed = 1.0                            # >1 replays capture/playback faster
+        self.input_finished = threading.Event()
+        self.mic_started = None                     # when the fixture started "playing in the room"
+
+        self._lock = threading.Lock()
+        self._done = threading.Condition(self._lock)
+        self.counters = {}
+
+    # ------------------------------
+    # Bookkeeping
+    # ------------------------------
+    def count(self, name, amount=1):
+        with self._done:
+            self.counters[name] = self.counters.get(name, 0) + amount
+            self._done.notify_all()
+
+    def wait_for(self, name, target, timeout=60):
+        """Block until counter `name` reaches `target`"""
+        deadline = time.monotonic() + timeout
+        with self._done:
+            while self.counters.get(name, 0) < target:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._done.wait(remaining)
+        return True
+
+    def admit(self, api):
+        """Refuse the request like the real API would: 503 in an outage, 429 over quota"""
+        from google.api_core.exceptions import ResourceExhausted, ServiceUnavailable
+
+        if api in self.failing:
+            self.count(f"{api}_unavailable")
+            raise ServiceUnavailable(f"503 The service is currently unavailable ({api})")
+
+        limit = self.server_quotas.get(api)
+        if not limit:
+            return
+        now = time.monotonic()
+        with self._lock:
+            recent = [t for t in self._admitted.get(api, []) if now - t < 1.0]
+            over = len(recent) >= limit
+            if not over:
+                recent.append(now)
+            self._admitted[api] = recent
+        if over:
+            self.count(f"{api}_quota_exceeded")
+            raise ResourceExhausted(f"429 Quota exceeded for {api} requests per second")
+
+    def reset(self, source=None, rate=16000):
+        with self._lock:
+            self.counters = {}
+            self._admitted = {}
+        self.failing.clear()
+        self.input_finished.clear()
+        self.mic_started = None
+        if source is not None:
+            self.source = source
+            self.source_rate = rate
+
+    def resolve(self, uri):
+        """gs://bucket/blob -> local file in the fake bucket"""
+        bucket, _, blob = uri[len("gs://"):].partition("/")
+        return os.path.join(self.storage_dir, bucket, blob)
+
+    def close(self):
+        shutil.rmtree(self.storage_dir, ignore_errors=True)
+
+    # ------------------------------
+    # Streaming recognition
+    # ------------------------------
+    def stream_responses(self, config, requests):
+        rate = config.config.sample_rate_hertz or 16000
+        # With alternative languages the speakers take turns, one utterance each
+        languages = [config.config.language_code] + list(config.config.alternative_language_codes)
+        endpoint = int(rate * self.endpoint_seconds)
+        interim_every = int(rate * self.interim_seconds)
+
+        position = 0          # samples received so far
+        speech_start = None
+        speech = 0
+        silence = 0
+        since_interim = 0
+        words_total = 0
+
+        # Finals are due speech_final latency after their endpoint; intake
+        # keeps going meanwhile, like a real bidirectional stream
+        pending = []
+        finals = []   # language of each final so far
+
+        def final():
+            nonlocal words_total
+            words = timed_words(speech_start / rate, (position - silence) / rate, words_total)
+            words_total += len(words)
+            language = languages[len(finals) % len(languages)]
+            finals.append(language)
+            response = streaming_response(punctuate([w.word for w in words]), is_final=True, words=words,
+                                          end_time=position / rate, language_code=language.lower())
+            pending.append((time.monotonic() + self.latencies["speech_final"].sample(), response))
+
+        def due(wait=False):
+            while pending and (wait or pending[0][0] <= time.monotonic()):
+                at, response = pending.pop(0)
+                time.sleep(max(0.0, at - time.monotonic()))
+                self.count("speech_finals")
+                yield response
+
+        started = None
+        for request in requests:
+            chunk = np.frombuffer(request.audio_content, dtype=np.int16)
+            position += len(chunk)
+
+            # Like Speech v1: audio has to arrive at about real time (scaled by speed)
+            started = started or time.monotonic()
+            if position / rate > (time.monotonic() - started) * self.speed + self.stream_max_lead:
+                from google.api_core.exceptions import OutOfRange
+                self.count("streams_too_fast")
+                raise OutOfRange("Audio data is being streamed too fast. "
+                                 "Please stream audio data approximately at real time.")
+
+            time.sleep(len(chunk) / rate * self.stream_rtf)
+            yield from due()
+
+            if rms(chunk) >= self.speech_threshold:
+                if not speech:
+                    speech_start = position - len(chunk)
+                speech += len(chunk)
+                since_interim += len(chunk)
+                silence = 0
+                if since_interim >= interim_every:
+                    since_interim = 0
+                    words = fake_words(max(1, int(speech / rate * WORDS_PER_SECOND)), words_total)
+                    yield streaming_response(" ".join(words), is_final=False)
+                continue
+
+            if speech:
+                silence += len(chunk)
+                if silence >= endpoint:
+                    final()
+                    speech = since_interim = silence = 0
+            elif self.input_finished.is_set() and not pending:
+                return
+
+        # Half-close: whatever was still being spoken is finalized
+        if speech:
+            final()
+        yield from due(wait=True)
+
+    # ------------------------------
+    # Long running recognition
+    # ------------------------------
+    def recognize_file(self, path, rate=16000):
+        return self.recognize_samples(load_pcm(path, rate), rate)
+
+    def recognize_samples(self, samples, rate=16000):
+        duration = len(samples) / rate
+        results = []
+        words_total = 0
+
+        for start, end in speech_regions(samples, rate, self.speech_threshold):
+            words = timed_words(start, end, words_total)
+            words_total += len(words)
+            results.append(SimpleNamespace(
+                alternatives=[SimpleNamespace(
+                    transcript=" ".join(w.word for w in words) + ".",
+                    confidence=0.9,
+                    words=words,
+                )],
+                result_end_time=datetime.timedelta(seconds=end),
+                language_code="",
+            ))
+
+        return SimpleNamespace(results=results), duration
+
+
+def timed_words(start, end, offset=0):
+    """Fake words spread evenly over [start, end] seconds"""
+    count = max(1, int((end - start) * WORDS_PER_SECOND))
+    step = (end - start) / count
+    return [
+        SimpleNamespace(
+            word=word,
+            start_time=datetime.timedelta(seconds=start + i * step),
+            end_time=datetime.timedelta(seconds=start + (i + 1) * step),
+            confidence=0.9,
+        )
+        for i, word in enumerate(fake_words(count, offset))
+    ]
+
+
+def streaming_response(transcript, is_final, words=(), end_time=0.0, language_code=""):
+    return SimpleNamespace(results=[SimpleNamespace(
+        alternatives=[SimpleNamespace(transcript=transcript, confidence=0.9 if is_final else 0.0,
+                                      words=list(words))],
+        is_final=is_final,
+        stability=0.0 if is_final else 0.8,
+        result_end_time=datetime.timedelta(seconds=end_time),
+        language_code=language_code,
+    )])
+
+
+# ==============================
+# FAKE CLIENTS
+# ==============================
+class FakeTransport:
+    """Accepts the keep-alive channel setup in clients.py"""
+
+    def __init__(self, channel=None, **kwargs):
+        self.grpc_channel = channel
+
+    @classmethod
+    def create_channel(cls, *args, **kwargs):
+        return None
+
+
+class FakeClient:
+    """install() binds `cloud` on a subclass, so pipelines construct these normally"""
+
+    cloud = None
+
+    def __init__(self, cloud=None, **kwargs):
+        self.cloud = cloud or type(self).cloud
+        self.transport = kwargs.get("transport") or FakeTransport()
+        self._connected = False
+
+    def _connect(self):
+        """First call on a new client pays the connection setup cost"""
+        if not self._connected:
+            self._connected = True
+            self.cloud.count("connects")
+            self.cloud.latencies["connect"].sleep()
+
+    @classmethod
+    def get_transport_class(cls, label=None):
+        return FakeTransport
+
+
+class FakeSpeechClient(FakeClient):
+
+    def streaming_recognize(self, config, requests, **kwargs):
+        self._connect()
+        return self.cloud.stream_responses(config, requests)
+
+    def long_running_recognize(self, config=None, audio=None, request=None, **kwargs):
+        self._connect()
+        self.cloud.count("speech_lro_requests")
+        return FakeOperation(self.cloud, config, audio)
+
+    def recognize(self, config=None, audio=None, request=None, **kwargs):
+        self._connect()
+        self.cloud.count("speech_recognize_requests")
+        return FakeOperation(self.cloud, config, audio).result()
+
+
+# File signature -> the RecognitionConfig.encoding that can read it
+CONTAINER_ENCODINGS = {b"RIFF": "LINEAR16", b"fLaC": "FLAC", b"OggS": "OGG_OPUS"}
+
+
+def check_encoding(path, config):
+    """Reject a config whose encoding does not match the uploaded file, like the API does"""
+    with open(path, "rb") as f:
+        found = CONTAINER_ENCODINGS.get(f.read(4))
+    declared = getattr(config.encoding, "name", str(config.encoding))
+
+    # WAV/FLAC headers are self-describing; the API accepts them unspecified
+    if declared != found and not (declared == "ENCODING_UNSPECIFIED" and found in ("LINEAR16", "FLAC")):
+        from google.api_core.exceptions import InvalidArgument
+        raise InvalidArgument(f"Audio is {found or 'unknown'} but RecognitionConfig.encoding is {declared}")
+
+
+class FakeOperation:
+    """Finishes speech_lro latency + duration * lro_rtf after it was submitted"""
+
+    def __init__(self, cloud, config, audio):
+        self.cloud = cloud
+        self.config = config
+        self.audio = audio
+        self.rate = getattr(config, "sample_rate_hertz", 0) or 16000
+        self._response = None
+
+        if getattr(audio, "uri", ""):
+            path = cloud.resolve(audio.uri)
+            check_encoding(path, config)
+            duration = audio_seconds(path, self.rate)
+        else:
+            duration = len(audio.content) / 2 / self.rate
+        self.cloud.count("speech_lro_audio_ms", int(duration * 1000))
+        self._ready_at = time.monotonic() + cloud.latencies["speech_lro"].sample() + duration * cloud.lro_rtf
+
+    def result(self, timeout=None):
+        time.sleep(max(0.0, self._ready_at - time.monotonic()))
+        if self._response is None:
+            if getattr(self.audio, "uri", ""):
+                response, _ = self.cloud.recognize_file(self.cloud.resolve(self.audio.uri), self.rate)
+            else:
+                samples = np.frombuffer(self.audio.content, dtype=np.int16)
+                response, _ = self.cloud.recognize_samples(samples, self.rate)
+            self._response = response
+        return self._response
+
+    def done(self):
+        self.cloud.count("speech_lro_polls")
+        return time.monotonic() >= self._ready_at
+
+
+class FakeTranslateClient(FakeClient):
+
+    def translate(self, values, target_language=None, format_=None,
+                  source_language=None, customization_ids=(), model=None):
+        self._connect()
+        self.cloud.admit("translate")
+        single = isinstance(values, str)
+        items = [values] if single else list(values)
+        chars = sum(len(v) for v in items)
+
+        # Oversized payloads are rejected like the real API's 400
+        if len(items) > self.cloud.translate_max_segments or chars > self.cloud.translate_max_chars:
+            from google.api_core.exceptions import BadRequest
+            self.cloud.count("translate_rejected")
+            raise BadRequest(
+                f"Request payload too large: {len(items)} segments, {chars} characters "
+                f"(limits {self.cloud.translate_max_segments} / {self.cloud.translate_max_chars})"
+            )
+
+        self.cloud.count("translate_requests")
+        self.cloud.count("translate_chars", chars)
+        self.cloud.latencies["translate"].sleep()
+        # Server time grows with the payload
+        time.sleep(chars / 1000 * self.cloud.translate_seconds_per_kchar)
+
+        # The real API HTML-escapes its output (e.g. &#39;)
+        results = [{
+            "translatedText": html.escape(f"[{target_language}] {text}"),
+            "detectedSourceLanguage": source_language or "",
+            "input": text,
+        } for text in items]
+        return results[0] if single else results
+
+    def get_languages(self, target_language=None, model=None):
+        self._connect()
+        return [{"language": "en"}, {"language": "fr"}, {"language": "ta"}]
+
+
+class FakeTextToSpeechClient(FakeClient):
+
+    def synthesize_speech(self, input=None, voice=None, audio_config=None, request=None, **kwargs):
+        self._connect()
+        self.cloud.admit("tts")
+        text = input.text or input.ssml
+        self.cloud.count("tts_requests")
+        self.cloud.count("tts_chars", len(text))
+        self.cloud.latencies["tts"].sleep()
+        time.sleep(len(text) / 1000 * self.cloud.tts_seconds_per_kchar)
+
+        rate = audio_config.sample_rate_hertz or 24000
+        samples = tone(max(0.2, len(text) / TTS_CHARS_PER_SECOND), rate)
+        encoding = getattr(audio_config.audio_encoding, "name", str(audio_config.audio_encoding))
+
+        if encoding == "MP3":
+            content = encode_audio(samples, rate, "mp3")
+        elif encoding == "OGG_OPUS":
+            content = encode_audio(samples, rate, "ogg")
+        else:
+            content = wav_bytes(samples, rate)
+        return SimpleNamespace(audio_content=content)
+
+    def list_voices(self, language_code=None, **kwargs):
+        self._connect()
+        return SimpleNamespace(voices=[])
+
+
+class FakeStorageClient(FakeClient):
+
+    def bucket(self, name):
+        return FakeBucket(self.cloud, name)
+
+
+class FakeBucket:
+
+    def __init__(self, cloud, name):
+        self.cloud = cloud
+        self.name = name
+
+    def blob(self, name):
+        return FakeBlob(self.cloud, self.name, name)
+
+
+class FakeBlob:
+
+    def __init__(self, cloud, bucket, name):
+        self.cloud = cloud
+        self.bucket = bucket
+        self.name = name
+
+    @property
+    def path(self):
+        return self.cloud.resolve(f"gs://{self.bucket}/{self.name}")
+
+    def upload_from_filename(self, filename, **kwargs):
+        size = os.path.getsize(filename)
+        start = time.monotonic()
+
+        self.cloud.latencies["storage"].sleep()
+        time.sleep(size / (self.cloud.upload_mbps * 1e6 / 8))
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        shutil.copyfile(filename, self.path)
+
+        self.cloud.count("storage_uploads")
+        self.cloud.count("storage_bytes", size)
+        self.cloud.count("storage_upload_ms", int((time.monotonic() - start) * 1000))
+
+    def delete(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+
+# ==============================
+# FAKE LOCAL MODELS
+# ==============================
+def spoken_text(samples, rate, threshold=500.0, min_gap=0.5):
+    """
+    What a Whisper-like model makes of a buffer: fake words over its loud
+    regions, a sentence closed every SENTENCE_WORDS words and at each pause.
+    The last sentence has no full stop while its speech is still going, and
+    a longer buffer only ever extends the text of a shorter one.
+    """
+    duration = len(samples) / rate
+    sentences, current, count = [], [], 0
+    for start, end in speech_regions(samples, rate, threshold, min_gap):
+        for _ in range(max(1, int((end - start) * WORDS_PER_SECOND))):
+            count += 1
+            current.append(f"mot{count}")
+            if len(current) == SENTENCE_WORDS:
+                sentences.append(punctuate(current))
+                current = []
+        if current and duration - end >= min_gap:
+            sentences.append(punctuate(current))
+            current = []
+    if current:
+        sentences.append(" ".join(current))
+    return " ".join(sentences)
+
+
+class FakeWhisper:
+    """WhisperSpeechToText stand-in: transcribe() only, like opensource.py uses it"""
+
+    def __init__(self, cloud, rtf=0.05):
+        self.cloud = cloud
+        self.rtf = rtf   # model time per second of audio
+
+    def warm_up(self):
+        pass
+
+    def transcribe(self, samples, language_code, rate=16000):
+        samples = np.asarray(samples)
+        if samples.dtype.kind == "f":
+            samples = samples * 32768.0
+        self.cloud.count("whisper_calls")
+        self.cloud.count("whisper_seconds", len(samples) / rate)
+        self.cloud.latencies["whisper"].sleep()
+        time.sleep(len(samples) / rate * self.rtf)
+        return spoken_text(samples, rate, self.cloud.speech_threshold)
+
+    def transcribe_detect(self, samples, language_codes, rate=16000):
+        return self.transcribe(samples, language_codes[0], rate), language_codes[0]
+
+
+class FakeNLLB:
+
+    def __init__(self, cloud):
+        self.cloud = cloud
+
+    def warm_up(self):
+        pass
+
+    def translate(self, text, source, target):
+        self.cloud.count("nllb_translations")
+        self.cloud.latencies["nllb"].sleep()
+        return f"[{target}] {text}"
+
+
+class FakeCoqui:
+
+    RATE = 22050
+
+    def __init__(self, cloud):
+        self.cloud = cloud
+
+    def warm_up(self):
+        pass
+
+    def synthesize(self, text, lang_code, source=None):
+        self.cloud.count("coqui_requests")
+        self.cloud.latencies["coqui"].sleep()
+        samples = tone(max(0.2, len(text) / TTS_CHARS_PER_SECOND), self.RATE)
+        return samples.astype(np.float32) / 32768.0, self.RATE
+
+
+def fake_local_backends(cloud, whisper_rtf=0.05):
+    """backends.Backends of fake local models, for opensource.backends"""
+    from backends import Backends
+
+    return Backends(stt=FakeWhisper(cloud, whisper_rtf), mt=FakeNLLB(cloud), tts=FakeCoqui(cloud))
+
+
+# ==============================
+# FAKE SOUNDDEVICE
+# ==============================
+class FakeInputStream:
+    """Replays cloud.source into the callback in (scaled) real time, at the stream's rate and channels"""
+
+    def __init__(self, cloud, samplerate=16000, blocksize=1600, dtype="int16",
+                 channels=1, callback=None, device=None, **kwargs):
+        self.cloud = cloud
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        self.dtype = dtype
+        self.channels = channels
+        self.callback = callback
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        source = self.cloud.source
+        if self.samplerate != self.cloud.source_rate and len(source):
+            # The room's sound as this device hears it (linear interpolation is plenty for fake speech)
+            times = np.arange(int(len(source) * self.samplerate / self.cloud.source_rate)) / self.samplerate
+            source = np.interp(times, np.arange(len(source)) / self.cloud.source_rate, source).astype(np.int16)
+        interval = self.blocksize / self.samplerate / self.cloud.speed
+
+        # Reopening a stream doesn't rewind the room: pick up where the fixture is now
+        now = time.monotonic()
+        if self.cloud.mic_started is None:
+            self.cloud.mic_started = now
+        position = int((now - self.cloud.mic_started) / interval) * self.blocksize
+        next_tick = now
+
+        # Keep feeding silence after the fixture ends, like a real microphone
+        while not self._stop.is_set():
+            block = source[position:position + self.blocksize]
+            position += self.blocksize
+            if len(block) < self.blocksize:
+                block = np.concatenate([block, np.zeros(self.blocksize - len(block), np.int16)])
+                if position >= len(source) + self.samplerate:
+                    self.cloud.input_finished.set()
+
+            if self.dtype == "float32":
+                block = block.astype(np.float32) / 32768.0
+            data = np.repeat(block.reshape(-1, 1), self.channels, axis=1)
+
+            self.callback(data, self.blocksize, None, None)
+
+            next_tick += interval
+            time.sleep(max(0.0, next_tick - time.monotonic()))
+
+    def stop(self):
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+
+    def close(self):
+        self.stop()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class FakeOutputStream:
+    """sd.OutputStream: write() blocks for as long as the samples take to play"""
+
+    def __init__(self, cloud, samplerate=16000, channels=1, dtype="float32", device=None, **kwargs):
+        self.cloud = cloud
+        self.samplerate = samplerate
+        self.device = device
+
+    def start(self):
+        pass
+
+    def write(self, data):
+        self.cloud.count("playbacks")
+        time.sleep(len(data) / self.samplerate / self.cloud.speed)
+        self.cloud.count("playbacks_finished")
+
+    def stop(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def make_sounddevice(cloud):
+    """
+    Module object that can be installed as `sounddevice`. play() / wait()
+    / stop() share one module-global stream like the real ones: play()
+    stops whatever is playing, on any device, and wait() waits for the
+    stream started last.
+    """
+    module = types.ModuleType("sounddevice")
+    lock = threading.Lock()
+    current = {"until": 0.0, "stopped": threading.Event()}
+
+    def stop(ignore_errors=True):
+        with lock:
+            if current["until"] > time.monotonic() and not current["stopped"].is_set():
+                cloud.count("playbacks_cut")
+            current["stopped"].set()
+
+    def play(data, samplerate=None, device=None, **kwargs):
+        stop()
+        with lock:
+            current["until"] = time.monotonic() + len(data) / (samplerate or 16000) / cloud.speed
+            current["stopped"] = threading.Event()
+        cloud.count("playbacks")
+
+    def wait(ignore_errors=True):
+        with lock:
+            until, stopped = current["until"], current["stopped"]
+        stopped.wait(max(0.0, until - time.monotonic()))
+        cloud.count("playbacks_finished")
+
+    def rec(frames, samplerate=None, channels=1, dtype="float32", device=None, **kwargs):
+        return np.zeros((frames, channels), dtype=dtype)
+
+    def query_devices(device=None, kind=None):
+        fake = {"name": "Fake Device", "max_input_channels": cloud.device_channels,
+                "max_output_channels": 2, "default_samplerate": float(cloud.device_rate)}
+        return fake if kind or device is not None else [fake]
+
+    module.InputStream = lambda *a, **k: FakeInputStream(cloud, *a, **k)
+    module.OutputStream = lambda *a, **k: FakeOutputStream(cloud, *a, **k)
+    module.play = play
+    module.wait = wait
+    module.stop = stop
+    module.rec = rec
+    module.query_devices = query_devices
+    return module
+
+
+# ==============================
+# INSTALL
+# ==============================
+def install(cloud):
+    """
+    Patch the Google client classes and `sounddevice` with fakes bound to
+    `cloud`. Call before importing a pipeline module. Returns a restore().
+    """
+    patches = []
+
+    def patch(module_name, attr, value):
+        try:
+            module = __import__(module_name, fromlist=[attr])
+        except ImportError:
+            return
+        patches.append((module, attr, getattr(module, attr, None)))
+        setattr(module, attr, value)
+
+    def bind(cls):
+        return type(cls.__name__, (cls,), {"cloud": cloud})
+
+    def anonymous_credentials(*args, **kwargs):
+        from google.auth.credentials import AnonymousCredentials
+        return AnonymousCredentials(), "fake-project"
+
+    patch("google.cloud.speech", "SpeechClient", bind(FakeSpeechClient))
+    patch("google.cloud.speech_v1", "SpeechClient", bind(FakeSpeechClient))
+    patch("google.cloud.speech_v1.services.speech.transports", "SpeechRestTransport", lambda *a, **k: None)
+    patch("google.cloud.texttospeech", "TextToSpeechClient", bind(FakeTextToSpeechClient))
+    patch("google.cloud.texttospeech_v1", "TextToSpeechClient", bind(FakeTextToSpeechClient))
+    patch("google.cloud.translate_v2", "Client", bind(FakeTranslateClient))
+    patch("google.cloud.storage", "Client", bind(FakeStorageClient))
+    patch("google.auth", "default", anonymous_credentials)
+
+    # Shared clients created before install() would bypass the fakes
+    clients.reset()
+
+    previous_sd = sys.modules.get("sounddevice")
+    sys.modules["sounddevice"] = make_sounddevice(cloud)
+
+    def restore():
+        for module, attr, original in reversed(patches):
+            setattr(module, attr, original)
+        clients.reset()
+        if previous_sd is not None:
+            sys.modules["sounddevice"] = previous_sd
+        else:
+            sys.modules.pop("sounddevice", None)
+
+    return restore
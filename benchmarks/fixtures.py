@@ -0,0 +1,84 @@
+"""
+Benchmark Fixtures
+Synthetic "speech-like" recordings (syllable-rate modulated harmonics
+separated by pauses) so benchmarks run without checked-in media. Real
+WAV/MP4 recordings can be passed to the runners instead.
+"""
+
+import os
+import subprocess
+import wave
+
+import numpy as np
+
+from benchmarks.fakes import ffmpeg_exe
+
+RATE = 16000
+
+DEFAULT_FIXTURES = {
+    "short_15s.wav": 15,
+    "medium_60s.wav": 60,
+}
+
+
+def speech_like(seconds, rate=RATE, seed=0, utterance=(1.5, 4.0), pause=(0.7, 1.5)):
+    """Alternating voiced bursts and near-silent pauses, int16 mono"""
+    rng = np.random.default_rng(seed)
+    total = int(seconds * rate)
+    out = (rng.normal(0, 30, total)).astype(np.float32)   # noise floor
+    position = int(0.5 * rate)
+
+    while position < total:
+        length = int(rng.uniform(*utterance) * rate)
+        end = min(total, position + length)
+        t = np.arange(end - position) / rate
+
+        pitch = rng.uniform(100, 220)
+        voice = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 5))
+        syllables = 0.5 * (1 + np.sin(2 * np.pi * rng.uniform(3, 5) * t))   # ~4 Hz envelope
+        out[position:end] += voice * syllables * 6000
+
+        position = end + int(rng.uniform(*pause) * rate)
+
+    return np.clip(out, -32768, 32767).astype(np.int16)
+
+
+def write_wav(path, samples, rate=RATE):
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(samples.tobytes())
+
+
+def make_video(path, wav_path, seconds, size="320x240", fps=10, pattern="color=c=black"):
+    """MP4 carrying `wav_path` as its audio track (tiny black frames by default)"""
+    options = f"s={size}:r={fps}:d={seconds}"
+    source = f"{pattern}:{options}" if "=" in pattern else f"{pattern}={options}"
+    subprocess.run(
+        [ffmpeg_exe(), "-v", "error", "-y",
+         "-f", "lavfi", "-i", source,
+         "-i", wav_path, "-shortest",
+         "-c:v", "libx264", "-pix_fmt", "yuv420p", "-c:a", "aac", path],
+        check=True,
+    )
+
+
+def ensure_fixtures(directory, with_video=True):
+    """Create the default fixtures in `directory` (once) and return their paths"""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+
+    for i, (name, seconds) in enumerate(DEFAULT_FIXTURES.items()):
+        path = os.path.join(directory, name)
+        if not os.path.exists(path):
+            write_wav(path, speech_like(seconds, seed=i))
+        paths.append(path)
+
+        if with_video:
+            video = os.path.splitext(path)[0] + ".mp4"
+            if not os.path.exists(video):
+                make_video(video, path, seconds)
+            paths.append(video)
+
+    return paths
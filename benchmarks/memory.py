@@ -0,0 +1,132 @@
+"""
+Dubbing Memory Benchmark
+Peak RSS of test.py's dubbing job against the fake clouds as the input
+gets longer, in batch mode (whole transcript at once) and stream mode
+(STREAM_WINDOW segments at a time). Each run is its own process, since
+peak RSS only ever goes up; GROWTH is the peak minus the process's RSS
+once everything is imported, i.e. what the job itself holds.
+
+Recognition is forced onto the streaming engine: the fake long-running
+operations decode the whole upload in-process, which would measure the
+fake server rather than the pipeline. The fake clock runs CLOCK_SPEED x
+faster, so sessions paced at "real time" get through hours of audio. The fake TTS server's encoding of
+one request (~40 MB for a 4000-character chunk) is in every peak.
+
+Usage:
+    python -m benchmarks.memory
+    python -m benchmarks.memory --minutes 5 30 120 --modes stream
+"""
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+
+from benchmarks.fixtures import RATE, speech_like
+
+MODES = ("batch", "stream")
+CLOCK_SPEED = 1000
+
+
+def fixture(directory, minutes):
+    """minutes of speech-like audio, written a minute at a time"""
+    path = os.path.join(directory, f"speech_{minutes}min.wav")
+    if not os.path.exists(path):
+        with wave.open(path, "wb") as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(RATE)
+            for minute in range(minutes):
+                wf.writeframes(speech_like(60, seed=minute).tobytes())
+    return path
+
+
+def rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def child(path, mode):
+    """One dubbing job; prints its numbers as JSON on the last line"""
+    from benchmarks.fakes import FakeCloud, Latency, install
+    from config import settings
+
+    settings.update(stt_engine="streaming", stream_pace=CLOCK_SPEED)
+
+    cloud = FakeCloud(
+        latencies={name: Latency("const") for name in ("speech_final", "translate", "tts", "storage", "connect")},
+        stream_rtf=0.0, tts_seconds_per_kchar=0.0
+    )
+    cloud.speed = CLOCK_SPEED
+    restore = install(cloud)
+    workdir = tempfile.mkdtemp(prefix="bench_memory_")
+
+    try:
+        import test
+
+        test.INPUT_VIDEO = path
+        test.TEMP_AUDIO = os.path.join(workdir, "source_audio.wav")
+        test.OUTPUT_AUDIO = os.path.join(workdir, "output_audio.mp3")
+        test.DUB_MODE = mode
+        test.extract_audio = lambda video, audio: shutil.copyfile(video, audio)   # a WAV already
+
+        import moviepy  # noqa: F401  (imported lazily by the job - count it in the baseline)
+
+        baseline = rss_mb()
+        start = time.perf_counter()
+        test.process_video()
+        wall = time.perf_counter() - start
+    finally:
+        restore()
+        cloud.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(json.dumps({"baseline_mb": baseline, "peak_mb": rss_mb(), "wall_seconds": wall,
+                      "tts_requests": cloud.counters.get("tts_requests", 0)}))
+
+
+def run(path, mode):
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.memory", "--child", path, mode],
+        capture_output=True, text=True
+    )
+    if result.returncode:
+        raise RuntimeError(f"{mode} run on {path} failed:\n{result.stderr[-2000:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak RSS of the dubbing job by input length")
+    parser.add_argument("--minutes", type=int, nargs="+", default=[5, 20, 60])
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=MODES)
+    parser.add_argument("--fixture-dir", default=os.path.join(tempfile.gettempdir(), "translator_fixtures"))
+    parser.add_argument("--child", nargs=2, metavar=("FIXTURE", "MODE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    os.makedirs(args.fixture_dir, exist_ok=True)
+    results = []
+    for minutes in args.minutes:
+        path = fixture(args.fixture_dir, minutes)
+        for mode in args.modes:
+            print(f"▶️  {minutes} min, {mode}")
+            results.append((minutes, mode, run(path, mode)))
+
+    print("\n" + "=" * 72)
+    print(f"  {'MINUTES':>7}  {'MODE':<8}{'BASE MB':>9}{'PEAK MB':>9}{'GROWTH MB':>11}{'TTS CALLS':>11}{'WALL s':>9}")
+    print("=" * 72)
+    for minutes, mode, r in results:
+        print(f"  {minutes:>7}  {mode:<8}{r['baseline_mb']:>9.1f}{r['peak_mb']:>9.1f}"
+              f"{r['peak_mb'] - r['baseline_mb']:>11.1f}{r['tts_requests']:>11}{r['wall_seconds']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Video Merge Benchmark
+Swaps the audio track of a fixture video three ways and reports wall time,
+CPU time (this process + ffmpeg children) and output size:
+
+  reencode     moviepy write_videofile(codec="libx264") - the old path
+  remux        ffmpeg -c:v copy, only the dubbed audio encoded
+  multitrack   remux keeping the original audio as a second track
+
+Usage:
+    python -m benchmarks.merge
+    python -m benchmarks.merge --seconds 120 --size 1920x1080 --fps 30
+"""
+
+import argparse
+import os
+import resource
+import shutil
+import tempfile
+import time
+
+from benchmarks.fixtures import make_video, speech_like, write_wav
+
+MODES = ("reencode", "remux", "multitrack")
+
+
+def cpu_seconds():
+    usage = [resource.getrusage(who) for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN)]
+    return sum(u.ru_utime + u.ru_stime for u in usage)
+
+
+def run(mode, video, audio, output):
+    import demo
+
+    wall = time.perf_counter()
+    cpu = cpu_seconds()
+    demo.merge_audio_video(
+        video, audio, output,
+        keep_original=(mode == "multitrack"),
+        reencode=(mode == "reencode")
+    )
+    return time.perf_counter() - wall, cpu_seconds() - cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Video merge benchmark")
+    parser.add_argument("--seconds", type=int, default=60)
+    parser.add_argument("--size", default="1280x720")
+    parser.add_argument("--fps", type=int, default=25)
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=MODES)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_merge_")
+    try:
+        original = os.path.join(workdir, "original.wav")
+        dubbed = os.path.join(workdir, "dubbed.wav")
+        video = os.path.join(workdir, "input.mp4")
+        write_wav(original, speech_like(args.seconds))
+        write_wav(dubbed, speech_like(args.seconds, seed=1))
+        make_video(video, original, args.seconds, size=args.size, fps=args.fps, pattern="testsrc2")
+
+        print(f"🎬 {args.seconds}s {args.size}@{args.fps} input, {os.path.getsize(video) / 1e6:.1f} MB\n")
+        print("=" * 58)
+        print(f"  {'MODE':<12}{'WALL s':>9}{'CPU s':>9}{'x RT':>9}{'OUTPUT MB':>11}")
+        print("=" * 58)
+
+        for mode in args.modes:
+            output = os.path.join(workdir, f"{mode}.mp4")
+            wall, cpu = run(mode, video, dubbed, output)
+            print(f"  {mode:<12}{wall:>9.2f}{cpu:>9.2f}{args.seconds / wall:>9.1f}"
+                  f"{os.path.getsize(output) / 1e6:>11.1f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
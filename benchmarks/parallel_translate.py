@@ -0,0 +1,106 @@
+"""
+Parallel Transcript Translation Benchmark
+Long-video transcripts translated against a fake Translate client that
+enforces payload limits (128 segments / 30k characters per request) and
+whose server time grows with payload size:
+
+  single        whole transcript in one request (old translate_to_english)
+  split xN      split_text() at sentence boundaries, N request threads
+
+Checks that every split run rejoins the chunks in their original order.
+
+Usage:
+    python -m benchmarks.parallel_translate
+    python -m benchmarks.parallel_translate --chars 20000 200000 --workers 1 4 16
+"""
+
+import argparse
+import random
+import time
+
+from backends import GoogleTranslator
+from benchmarks.fakes import FakeCloud, Latency, install
+from translation import MAX_CHARS_PER_REQUEST, split_text
+
+WORDS = ("வணக்கம் நன்றி கூட்டம் திட்டம் வாடிக்கையாளர் வாரம் குழு கேள்வி பதில் "
+         "அறிக்கை நாளை இன்று முக்கியம் வீடியோ மொழிபெயர்ப்பு").split()
+
+
+def transcript(chars, seed=0):
+    """Sentence-punctuated text of roughly `chars` characters, one run-on sentence included"""
+    rng = random.Random(seed)
+    sentences = []
+    size = 0
+    while size < chars:
+        length = rng.randint(4, 30) if sentences else 1500   # speech-to-text can emit huge unpunctuated runs
+        sentence = " ".join(rng.choice(WORDS) for _ in range(length)) + "."
+        sentences.append(sentence)
+        size += len(sentence) + 1
+    return " ".join(sentences)
+
+
+def run(text, workers):
+    translator = GoogleTranslator(batch_window_ms=0, max_workers=workers)
+    start = time.perf_counter()
+    result = translator.translate_long(text, "ta", "en")
+    return result, time.perf_counter() - start
+
+
+def run_single(text):
+    translator = GoogleTranslator(batch_window_ms=0)
+    start = time.perf_counter()
+    try:
+        translator.translate(text, "ta", "en")
+        status = "ok"
+    except Exception as e:
+        status = type(e).__name__
+    return status, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel transcript translation benchmark")
+    parser.add_argument("--chars", type=int, nargs="+", default=[20000, 100000, 400000])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--latency", default="lognormal:0.12,0.3", help="fake Translate latency")
+    parser.add_argument("--per-kchar", type=float, default=0.02, help="fake server seconds per 1000 chars")
+    args = parser.parse_args()
+
+    cloud = FakeCloud(
+        latencies={"translate": Latency.parse(args.latency), "connect": Latency()},
+        translate_seconds_per_kchar=args.per_kchar
+    )
+    restore = install(cloud)
+
+    try:
+        print("=" * 78)
+        print(f"  {'CHARS':>8}  {'MODE':<10}{'CHUNKS':>8}{'REQUESTS':>10}{'WALL s':>9}{'SPEED-UP':>10}  ORDER")
+        print("=" * 78)
+
+        for chars in args.chars:
+            text = transcript(chars)
+            chunks = split_text(text)
+            assert all(len(chunk) <= MAX_CHARS_PER_REQUEST for chunk in chunks)
+            expected = " ".join(f"[en] {chunk}" for chunk in chunks)
+
+            cloud.reset()
+            status, wall = run_single(text)
+            print(f"  {len(text):>8}  {'single':<10}{1:>8}{cloud.counters.get('translate_requests', 0):>10}"
+                  f"{wall:>9.2f}{'':>10}  {status}")
+
+            baseline = None
+            for workers in args.workers:
+                cloud.reset()
+                result, wall = run(text, workers)
+                baseline = baseline or wall
+                order = "ok" if result == expected else "MISMATCH"
+                print(f"  {len(text):>8}  {f'split x{workers}':<10}{len(chunks):>8}"
+                      f"{cloud.counters.get('translate_requests', 0):>10}{wall:>9.2f}"
+                      f"{baseline / wall:>9.1f}x  {order}")
+            print("-" * 78)
+    finally:
+        restore()
+        cloud.close()
+
+
+if __name__ == "__main__":
+    main()
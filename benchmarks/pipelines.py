@@ -0,0 +1,299 @@
+"""
+Offline Pipeline Benchmark
+Replays fixture WAV/MP4 files through each pipeline against the in-process
+fake Speech/Translate/TTS/Storage clients (benchmarks/fakes.py) and a fake
+sounddevice, then reports end-to-end latency, throughput and memory.
+opensource.py gets fake Whisper/NLLB/Coqui models in place of its backends.
+
+Needs the normal runtime packages (google-cloud-*, moviepy, flask-socketio,
+numpy) but no credentials, audio hardware or network.
+
+Usage:
+    python -m benchmarks.pipelines
+    python -m benchmarks.pipelines --pipelines chitrp web --speed 4
+    python -m benchmarks.pipelines --pipelines web-browser --uplink-jitter-ms 40
+    python -m benchmarks.pipelines --pipelines chitrp web --direction auto
+    python -m benchmarks.pipelines --pipelines opensource --latency whisper=const:0.3
+    python -m benchmarks.pipelines --fixtures meeting.wav talk.mp4 \\
+        --latency translate=lognormal:0.2,0.4 --latency tts=const:0.3 --json out.json
+"""
+
+import argparse
+import importlib
+import json
+import os
+import random
+import resource
+import shutil
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+
+from benchmarks.fakes import FakeCloud, Latency, fake_local_backends, install, load_pcm
+from benchmarks.fixtures import RATE, ensure_fixtures, write_wav
+import recognition
+from tracing import tracer
+
+PIPELINES = ("chitrp", "web", "web-browser", "opensource", "test", "demo")
+
+BROWSER_FRAME = 320   # 20 ms at 16 kHz, what translator.html's AudioWorklet sends
+
+
+# ==============================
+# RUNNERS
+# ==============================
+def run_live(module_name, cloud, fixture, direction="fr-en"):
+    """chitrp.py / web_translator.py: fixture plays into the fake microphone"""
+    cloud.reset(load_pcm(fixture, RATE), RATE)
+    module = importlib.import_module(module_name)
+
+    if module_name == "chitrp":
+        # Drop audio left over from the previous fixture
+        while not module.audio_queue.empty():
+            module.audio_queue.get()
+
+        module.SOURCE_LANG, module.TARGET_LANG = "fr", "en"
+        module.SOURCE_LANG_CODE = "fr-FR"
+        module.SOURCE_LANG_NAME, module.TARGET_LANG_NAME = "French", "English"
+        module.AUTO_DETECT = direction == "auto"
+        module.run_streaming()
+    else:
+        session = module.device_session
+        session.state['active'] = True
+        session.stop.clear()
+        session.replace_lane(module.Lane(direction))
+        module.run_streaming(session)
+
+    # Translations run on background threads - wait for the last playback
+    cloud.wait_for("playbacks_finished", cloud.counters.get("speech_finals", 0))
+
+    if module_name != "chitrp":
+        module.stop_session(session)
+
+    return len(cloud.source) / RATE
+
+
+def run_local(cloud, fixture, direction="fr-en"):
+    """opensource.py with fake local models: fixture plays into the fake microphone"""
+    cloud.reset(load_pcm(fixture, RATE), RATE)
+    module = importlib.import_module("opensource")
+
+    while not module.audio_queue.empty():
+        module.audio_queue.get()
+
+    module.backends = fake_local_backends(cloud)
+    module.AUTO_DETECT = direction == "auto"
+
+    # run_streaming() keeps listening until stopped, then waits for its queued jobs
+    stop = threading.Event()
+
+    def stop_when_finished():
+        cloud.input_finished.wait()
+        stop.set()
+
+    threading.Thread(target=stop_when_finished, daemon=True).start()
+    module.run_streaming(stop)
+
+    return len(cloud.source) / RATE
+
+
+def browser_uplink(cloud, session, jitter_ms, loss):
+    """
+    Plays cloud.source as a browser would: numbered 20 ms frames stamped
+    with their capture time, each delayed by up to jitter_ms (so some
+    arrive out of order) and a fraction `loss` never arriving.
+    """
+    rng = random.Random(0)
+    source = cloud.source
+    interval = BROWSER_FRAME / RATE / cloud.speed
+    in_flight = []   # (arrives_at, seq, captured_at, pcm)
+    start = time.monotonic()
+    seq = 0
+
+    # Like a real microphone, silence keeps coming after the fixture ends
+    while not session.stop.is_set():
+        due = start + seq * interval
+        if time.monotonic() >= due:
+            block = source[seq * BROWSER_FRAME:(seq + 1) * BROWSER_FRAME]
+            if len(block) < BROWSER_FRAME:
+                block = np.concatenate([block, np.zeros(BROWSER_FRAME - len(block), np.int16)])
+                if seq * BROWSER_FRAME >= len(source) + RATE:
+                    cloud.input_finished.set()
+            if rng.random() >= loss:
+                in_flight.append((due + rng.uniform(0, jitter_ms / 1000), seq, time.time(), block.tobytes()))
+            seq += 1
+
+        now = time.monotonic()
+        for frame in sorted(f for f in in_flight if f[0] <= now):
+            in_flight.remove(frame)
+            session.buffer.push(*frame[1:])
+        time.sleep(0.002)
+
+
+def run_browser(cloud, fixture, jitter_ms, loss, direction="fr-en"):
+    """web_translator.py with a BrowserSession fed over a simulated network"""
+    cloud.reset(load_pcm(fixture, RATE), RATE)
+    module = importlib.import_module("web_translator")
+
+    session = module.BrowserSession("bench")
+    session.state['active'] = True
+    session.stop.clear()
+    session.replace_lane(module.Lane(direction))
+
+    uplink = threading.Thread(target=browser_uplink, args=(cloud, session, jitter_ms, loss), daemon=True)
+    uplink.start()
+    module.run_streaming(session)
+
+    cloud.wait_for("playbacks_finished", cloud.counters.get("speech_finals", 0))
+    module.stop_session(session)
+    uplink.join(timeout=2)
+    print(f"   jitter buffer: {session.buffer.stats}, jitter estimate {session.buffer.jitter * 1000:.1f} ms")
+
+    return len(cloud.source) / RATE
+
+
+def run_batch(module_name, cloud, fixture, workdir):
+    """test.py / demo.py: full extract -> recognize -> translate -> TTS job"""
+    cloud.reset()
+    module = importlib.import_module(module_name)
+
+    # Streaming recognition sessions are paced at the fake clock's real time
+    original_pace, recognition.STREAM_PACE = recognition.STREAM_PACE, cloud.speed
+
+    module.INPUT_VIDEO = os.path.abspath(fixture)
+    module.TEMP_AUDIO = os.path.join(workdir, "source_audio.wav")
+    module.OUTPUT_AUDIO = os.path.join(workdir, "output_audio.mp3")
+
+    # WAV fixtures skip moviepy's video extraction
+    original_extract = module.extract_audio
+    if fixture.lower().endswith(".wav"):
+        module.extract_audio = lambda video, audio: write_wav(audio, load_pcm(video, RATE))
+
+    cwd = os.getcwd()
+    os.chdir(workdir)   # relative output paths land here
+    try:
+        entry = module.process_video if hasattr(module, "process_video") else module.process
+        entry()
+    finally:
+        os.chdir(cwd)
+        module.extract_audio = original_extract
+        recognition.STREAM_PACE = original_pace
+
+    return len(load_pcm(module.TEMP_AUDIO, RATE)) / RATE
+
+
+def run_one(name, cloud, fixture, uplink=(20.0, 0.0), direction="fr-en"):
+    workdir = tempfile.mkdtemp(prefix=f"bench_{name}_")
+    tracer.reset()
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    try:
+        if name == "chitrp":
+            audio_seconds = run_live("chitrp", cloud, fixture, direction)
+        elif name == "web":
+            audio_seconds = run_live("web_translator", cloud, fixture, direction)
+        elif name == "web-browser":
+            audio_seconds = run_browser(cloud, fixture, *uplink, direction)
+        elif name == "opensource":
+            audio_seconds = run_local(cloud, fixture, direction)
+        else:
+            audio_seconds = run_batch(name, cloud, fixture, workdir)
+    finally:
+        wall = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    stages = tracer.histograms()
+    e2e = stages.get("end_to_end", {})
+    return {
+        "pipeline": name,
+        "fixture": os.path.basename(fixture),
+        "audio_seconds": audio_seconds,
+        "wall_seconds": wall,
+        "throughput_x_realtime": audio_seconds / wall if wall else 0.0,
+        "utterances": e2e.get("count", 0),
+        "e2e_p50": e2e.get("p50", 0.0),
+        "e2e_p95": e2e.get("p95", 0.0),
+        "e2e_p99": e2e.get("p99", 0.0),
+        "peak_traced_mb": peak / 1e6,
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "stages": stages,
+        "api_calls": dict(cloud.counters),
+    }
+
+
+# ==============================
+# REPORT
+# ==============================
+def print_report(results):
+    print("\n" + "=" * 115)
+    print(f"  {'PIPELINE':<13}{'FIXTURE':<18}{'AUDIO s':>9}{'WALL s':>9}{'x RT':>7}"
+          f"{'UTT':>5}{'E2E p50':>9}{'p95':>8}{'p99':>8}{'PEAK MB':>9}{'RSS MB':>9}")
+    print("=" * 115)
+    for r in results:
+        print(f"  {r['pipeline']:<13}{r['fixture']:<18}{r['audio_seconds']:>9.1f}{r['wall_seconds']:>9.2f}"
+              f"{r['throughput_x_realtime']:>7.2f}{r['utterances']:>5}{r['e2e_p50']:>9.3f}"
+              f"{r['e2e_p95']:>8.3f}{r['e2e_p99']:>8.3f}{r['peak_traced_mb']:>9.1f}{r['max_rss_mb']:>9.1f}")
+
+    print("\n⏱ Stage p50 / p95 (seconds):")
+    for r in results:
+        stages = "  ".join(f"{stage}={s['p50']:.3f}/{s['p95']:.3f}" for stage, s in sorted(r["stages"].items()))
+        print(f"  {r['pipeline']:<13}{r['fixture']:<18}{stages}")
+
+
+def parse_latency(values):
+    latencies = {}
+    for value in values:
+        name, _, spec = value.partition("=")
+        latencies[name] = Latency.parse(spec)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline pipeline benchmark with fake cloud backends")
+    parser.add_argument("--fixtures", nargs="+", help="WAV/MP4 files (default: generated)")
+    parser.add_argument("--fixture-dir", default=os.path.join(tempfile.gettempdir(), "translator_fixtures"))
+    parser.add_argument("--pipelines", nargs="+", default=list(PIPELINES), choices=PIPELINES)
+    parser.add_argument("--latency", action="append", default=[], metavar="API=SPEC",
+                        help="e.g. translate=lognormal:0.12,0.3 (APIs: speech_final, speech_lro, translate, tts, storage, whisper, nllb, coqui)")
+    parser.add_argument("--speed", type=float, default=1.0, help="fake clock speed-up: capture, playback and streaming recognition pace")
+    parser.add_argument("--upload-mbps", type=float, default=20.0)
+    parser.add_argument("--uplink-jitter-ms", type=float, default=20.0, help="web-browser: max frame delay")
+    parser.add_argument("--uplink-loss", type=float, default=0.0, help="web-browser: fraction of frames dropped")
+    parser.add_argument("--direction", default="fr-en", choices=["fr-en", "auto"],
+                        help="live pipelines: fixed direction or auto-detect (fake speakers alternate fr/en)")
+    parser.add_argument("--json", help="write full results here")
+    args = parser.parse_args()
+
+    fixtures = args.fixtures or ensure_fixtures(args.fixture_dir)
+
+    cloud = FakeCloud(latencies=parse_latency(args.latency), upload_mbps=args.upload_mbps)
+    cloud.speed = args.speed
+    restore = install(cloud)
+
+    results = []
+    try:
+        for name in args.pipelines:
+            for fixture in fixtures:
+                print(f"\n▶️  {name} ← {os.path.basename(fixture)}")
+                results.append(run_one(name, cloud, fixture, (args.uplink_jitter_ms, args.uplink_loss),
+                                       args.direction))
+    finally:
+        restore()
+        cloud.close()
+
+    print_report(results)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n📝 Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
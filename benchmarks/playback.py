@@ -0,0 +1,189 @@
+"""
+Playback Latency Benchmark
+Runs web_translator.py against the fake clients on a local port and
+drives it with a headless Socket.IO client that behaves like
+translator.html: it syncs clocks, sends the fixture as browser mic
+frames, schedules tts_audio chunks back to back the way Web Audio does
+and reports playback_started.
+
+Compares time-to-first-sound (utterance start -> first translated audio
+ready to play where the listener is) for server-device playback vs
+clause-by-clause browser playback. Browser playback also reports the
+downlink (server send -> page) and how long chunks waited behind audio
+that was still playing.
+
+Usage:
+    python -m benchmarks.playback
+    python -m benchmarks.playback --modes browser --speed 2 --latency tts=const:0.4
+    python -m benchmarks.playback --tts-seconds-per-kchar 10   # slow synthesis, long sentences
+"""
+
+import argparse
+import logging
+import os
+import struct
+import tempfile
+import threading
+import time
+
+from benchmarks.fakes import FakeCloud, install, load_pcm
+from benchmarks.fixtures import RATE, ensure_fixtures
+from benchmarks.pipelines import BROWSER_FRAME, parse_latency
+from tracing import tracer
+
+MODES = ("device", "browser")
+
+
+class HeadlessPage:
+    """The parts of translator.html that matter for latency"""
+
+    def __init__(self, url, speed=1.0):
+        import socketio
+
+        self.speed = speed
+        self.sio = socketio.Client()
+        self.clock_offset = 0.0   # server - local, ms
+        self.play_at = 0.0        # local monotonic time the queued audio runs out
+        self.chunks = 0
+        self.gaps = 0             # chunks that found the queue empty (audible pause)
+        self.sio.on("tts_audio", self.on_audio)
+        self.sio.connect(url, wait_timeout=10)
+
+    def sync_clock(self):
+        sent = time.time() * 1000
+        server = self.sio.call("clock_sync", sent)
+        self.clock_offset = server - (sent + time.time() * 1000) / 2
+
+    def now_ms(self):
+        return time.time() * 1000 + self.clock_offset
+
+    def on_audio(self, data):
+        received_at = self.now_ms()
+        now = time.monotonic()
+        seconds = len(data["pcm"]) / 2 / data["rate"] / self.speed
+
+        if data["index"] > 0 and self.play_at < now:
+            self.gaps += 1
+        start_at = max(now, self.play_at)
+        self.play_at = start_at + seconds
+        self.chunks += 1
+
+        self.sio.emit("playback_started", {
+            "utterance": data["utterance"],
+            "index": data["index"],
+            "started_at": data["started_at"],
+            "sent_at": data["sent_at"],
+            "received_at": received_at,
+            "plays_at": received_at + (start_at - now) * 1000,
+        })
+
+    def speak(self, samples):
+        """Send samples as 20 ms frames in (scaled) real time, then a second of silence"""
+        padded = list(range(0, len(samples) + RATE, BROWSER_FRAME))
+        interval = BROWSER_FRAME / RATE / self.speed
+        start = time.monotonic()
+
+        for seq, offset in enumerate(padded):
+            block = samples[offset:offset + BROWSER_FRAME].tobytes()
+            block += bytes(BROWSER_FRAME * 2 - len(block))
+            self.sio.emit("audio_frame", struct.pack("<Id", seq, self.now_ms()) + block)
+            time.sleep(max(0.0, start + (seq + 1) * interval - time.monotonic()))
+
+    def close(self):
+        self.sio.disconnect()
+
+
+def serve(module, port):
+    thread = threading.Thread(
+        target=module.socketio.run,
+        args=(module.app,),
+        kwargs={"host": "127.0.0.1", "port": port, "allow_unsafe_werkzeug": True},
+        daemon=True,
+    )
+    thread.start()
+    time.sleep(1.0)
+
+
+def run_mode(module, cloud, url, fixture, mode, speed):
+    samples = load_pcm(fixture, RATE)
+    cloud.reset(samples, RATE)
+    tracer.reset()
+
+    page = HeadlessPage(url, speed)
+    page.sync_clock()
+    page.sio.emit("start_translation", {"direction": "fr-en", "source": "browser", "playback": mode})
+    page.speak(samples)
+    cloud.input_finished.set()
+
+    # Let the last utterance finish translating and playing
+    finals = cloud.counters.get("speech_finals", 0)
+    if mode == "device":
+        cloud.wait_for("playbacks_finished", finals)
+    else:
+        deadline = time.monotonic() + 30
+        while tracer.histograms().get("first_sound", {}).get("count", 0) < finals and time.monotonic() < deadline:
+            time.sleep(0.1)
+
+    page.sio.emit("stop_translation", {"source": "browser"})
+    page.close()
+
+    stages = tracer.histograms()
+    return {
+        "mode": mode,
+        "fixture": os.path.basename(fixture),
+        "utterances": finals,
+        "first_sound": stages.get("first_sound", {}),
+        "downlink": stages.get("downlink", {}),
+        "playout_wait": stages.get("playout_wait", {}),
+        "tts_requests": cloud.counters.get("tts_requests", 0),
+        "gaps": page.gaps,
+        "chunks": page.chunks,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Server-to-playback latency benchmark")
+    parser.add_argument("--fixtures", nargs="+", help="WAV files (default: generated)")
+    parser.add_argument("--fixture-dir", default=os.path.join(tempfile.gettempdir(), "translator_fixtures"))
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=MODES)
+    parser.add_argument("--latency", action="append", default=[], metavar="API=SPEC")
+    parser.add_argument("--speed", type=float, default=1.0, help="mic/playback speed-up")
+    parser.add_argument("--tts-seconds-per-kchar", type=float, default=2.0, help="fake synthesis time per 1000 chars")
+    parser.add_argument("--port", type=int, default=5055)
+    args = parser.parse_args()
+
+    fixtures = args.fixtures or [f for f in ensure_fixtures(args.fixture_dir) if f.endswith(".wav")]
+
+    cloud = FakeCloud(latencies=parse_latency(args.latency), tts_seconds_per_kchar=args.tts_seconds_per_kchar)
+    cloud.speed = args.speed
+    restore = install(cloud)
+
+    import web_translator
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    serve(web_translator, args.port)
+
+    results = []
+    try:
+        for fixture in fixtures:
+            for mode in args.modes:
+                print(f"\n▶️  {mode} playback ← {os.path.basename(fixture)}")
+                results.append(run_mode(web_translator, cloud, f"http://127.0.0.1:{args.port}",
+                                        fixture, mode, args.speed))
+    finally:
+        restore()
+        cloud.close()
+
+    print("\n" + "=" * 108)
+    print(f"  {'MODE':<9}{'FIXTURE':<18}{'UTT':>5}{'FIRST p50':>11}{'p95':>8}"
+          f"{'DOWNLINK p50':>14}{'p95':>8}{'QUEUED p50':>12}{'TTS CALLS':>11}{'GAPS':>6}")
+    print("=" * 108)
+    for r in results:
+        first, down, queued = r["first_sound"], r["downlink"], r["playout_wait"]
+        print(f"  {r['mode']:<9}{r['fixture']:<18}{r['utterances']:>5}"
+              f"{first.get('p50', 0):>11.3f}{first.get('p95', 0):>8.3f}"
+              f"{down.get('p50', 0):>14.3f}{down.get('p95', 0):>8.3f}"
+              f"{queued.get('p50', 0):>12.3f}{r['tts_requests']:>11}{r['gaps']:>6}")
+
+
+if __name__ == "__main__":
+    main()
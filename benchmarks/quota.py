@@ -0,0 +1,207 @@
+"""
+Quota Scheduler Benchmark
+Live utterances (translate + synthesize every --live-interval seconds)
+compete with a batch dubbing job (--batch-workers threads translating and
+voicing long chunks back to back) against fake Translate / TTS servers
+that answer 429 above --server-rps requests per second:
+
+  unthrottled   QUOTA_ENABLED=0: every request goes straight out, errors surface
+  scheduled     token buckets at 90% of the server quota, live lane first, retries
+  outage        scheduled, with Translate answering 503 for the middle third
+                (the circuit breaker should make live calls fail fast)
+
+First, the circuit breaker's half-open trial is checked on its own: a
+trial answered OK or 429 must close the circuit, a 503 must re-open it
+until the next cooldown.
+
+Usage:
+    python -m benchmarks.quota
+    python -m benchmarks.quota --seconds 20 --batch-workers 32 --server-rps 10
+"""
+
+import argparse
+import threading
+import time
+
+from benchmarks.fakes import FakeCloud, install
+from quota import BATCH, LIVE, CircuitOpenError, QuotaScheduler, quotas
+from tracing import percentile, tracer
+
+SCENARIOS = ("unthrottled", "scheduled", "outage")
+LIVE_TEXT = "Bonjour à tous, merci d'être venus à la réunion de cette semaine."
+BATCH_TEXT = " ".join([LIVE_TEXT] * 5)
+
+
+def breaker_trial(outcome, cooldown=0.05):
+    """Open the circuit, let the trial end with `outcome`, then see what later calls get"""
+    from google.api_core import exceptions
+
+    errors = {"ok": None, "429": exceptions.TooManyRequests("quota"), "503": exceptions.ServiceUnavailable("down")}
+    scheduler = QuotaScheduler({"translate": (0, 0)}, enabled=True, attempts=1)
+    breaker = scheduler.quota("translate").breaker
+    breaker.failures, breaker.cooldown = 1, cooldown
+
+    def request(error):
+        if error:
+            raise error
+        return "ok"
+
+    def call(error=None):
+        try:
+            return scheduler.call("translate", lambda: request(error))
+        except CircuitOpenError:
+            return "refused"
+        except Exception as e:
+            return type(e).__name__
+
+    call(errors["503"])   # opens
+    time.sleep(cooldown)
+    call(errors[outcome])   # the half-open trial
+    state = breaker.state
+    right_after = call()
+    time.sleep(cooldown)
+    return state, right_after, call()
+
+
+# trial outcome -> (state after the trial, next call, next call after a cooldown)
+BREAKER_EXPECTED = {
+    "ok": ("closed", "ok", "ok"),
+    "429": ("closed", "ok", "ok"),
+    "503": ("open", "refused", "ok"),
+}
+
+
+def check_breaker():
+    print("\n" + "=" * 64)
+    print(f"  {'TRIAL':<8}{'STATE':<10}{'NEXT CALL':<12}{'AFTER COOLDOWN':<16}")
+    print("=" * 64)
+    passed = True
+    for outcome, expected in BREAKER_EXPECTED.items():
+        result = breaker_trial(outcome)
+        passed &= result == expected
+        print(f"  {outcome:<8}{result[0]:<10}{result[1]:<12}{result[2]:<16}{'✅' if result == expected else '❌'}")
+    return passed
+
+
+def run(scenario, cloud, translator, tts, seconds, live_interval, batch_workers, server_rps):
+    cloud.reset()
+    tracer.reset()
+    quotas.enabled = scenario != "unthrottled"
+    quotas.configure(
+        {api: (rps * 60 * 0.9, 0) for api, rps in server_rps.items()},
+        burst_seconds=1.0
+    )
+    quotas.quota("translate").breaker.cooldown = 1.0
+
+    stop = threading.Event()
+    lock = threading.Lock()
+    live = {"ok": [], "failed": []}   # seconds per utterance
+    batch = {"ok": 0, "failed": 0}
+
+    def utterance():
+        start = time.monotonic()
+        try:
+            with quotas.lane(LIVE):
+                tts.synthesize(translator.translate(LIVE_TEXT, "fr", "en"), "en")
+            outcome = "ok"
+        except Exception:
+            outcome = "failed"
+        with lock:
+            live[outcome].append(time.monotonic() - start)
+
+    def dub():
+        with quotas.lane(BATCH):
+            while not stop.is_set():
+                try:
+                    tts.synthesize(translator.translate(BATCH_TEXT, "fr", "en"), "en")
+                    outcome = "ok"
+                except Exception:
+                    outcome = "failed"
+                    time.sleep(0.05)   # what a retry-less caller would do at best
+                with lock:
+                    batch[outcome] += 1
+
+    def outage():
+        if stop.wait(seconds / 3):
+            return
+        cloud.failing.add("translate")
+        stop.wait(seconds / 3)
+        cloud.failing.discard("translate")
+
+    workers = [threading.Thread(target=dub, daemon=True) for _ in range(batch_workers)]
+    if scenario == "outage":
+        workers.append(threading.Thread(target=outage, daemon=True))
+    for worker in workers:
+        worker.start()
+
+    speakers = []
+    start = time.monotonic()
+    while time.monotonic() - start < seconds:
+        speaker = threading.Thread(target=utterance, daemon=True)
+        speaker.start()
+        speakers.append(speaker)
+        time.sleep(live_interval)
+
+    stop.set()
+    for thread in speakers + workers:
+        thread.join(timeout=30)
+
+    stages = tracer.histograms()
+    snapshot = quotas.snapshot()
+    return {
+        "scenario": scenario,
+        "live_ok": sorted(live["ok"]),
+        "live_failed": sorted(live["failed"]),
+        "batch_ok_per_second": batch["ok"] / seconds,
+        "batch_failed": batch["failed"],
+        "server_429": sum(cloud.counters.get(f"{api}_quota_exceeded", 0) for api in server_rps),
+        "retries": sum(stats["retries"] for stats in snapshot.values()),
+        "rejected": sum(stats["rejected"] for stats in snapshot.values()),
+        "live_wait_p95": max(stages.get(f"{api}_live_queue_wait", {}).get("p95", 0.0) for api in server_rps),
+        "batch_wait_p50": max(stages.get(f"{api}_batch_queue_wait", {}).get("p50", 0.0) for api in server_rps),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quota scheduler benchmark")
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=SCENARIOS)
+    parser.add_argument("--seconds", type=float, default=15.0)
+    parser.add_argument("--live-interval", type=float, default=0.5, help="seconds between live utterances")
+    parser.add_argument("--batch-workers", type=int, default=16)
+    parser.add_argument("--server-rps", type=float, default=20.0, help="fake per-API quota, requests/s")
+    args = parser.parse_args()
+
+    if not check_breaker():
+        raise SystemExit("❌ circuit breaker trial check failed")
+
+    server_rps = {"translate": args.server_rps, "tts": args.server_rps}
+    cloud = FakeCloud(server_quotas=server_rps, tts_seconds_per_kchar=0.5)
+    restore = install(cloud)
+
+    from backends import GoogleTextToSpeech, GoogleTranslator
+
+    try:
+        translator, tts = GoogleTranslator(), GoogleTextToSpeech()
+        results = []
+        for scenario in args.scenarios:
+            print(f"\n▶️  {scenario}")
+            results.append(run(scenario, cloud, translator, tts, args.seconds,
+                               args.live_interval, args.batch_workers, server_rps))
+    finally:
+        restore()
+        cloud.close()
+
+    print("\n" + "=" * 118)
+    print(f"  {'SCENARIO':<13}{'LIVE OK':>8}{'FAILED':>8}{'LIVE p50':>10}{'p95':>8}{'FAIL p50':>10}"
+          f"{'LIVE WAIT p95':>15}{'BATCH/s':>9}{'B FAILED':>10}{'429s':>7}{'RETRIES':>9}{'REJECTED':>10}")
+    print("=" * 118)
+    for r in results:
+        ok, failed = r["live_ok"], r["live_failed"]
+        print(f"  {r['scenario']:<13}{len(ok):>8}{len(failed):>8}"
+              f"{percentile(ok, 0.5):>10.3f}{percentile(ok, 0.95):>8.3f}{percentile(failed, 0.5):>10.3f}"
+              f"{r['live_wait_p95']:>15.3f}{r['batch_ok_per_second']:>9.1f}{r['batch_failed']:>10}"
+              f"{r['server_429']:>7}{r['retries']:>9}{r['rejected']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Batch Recognition Engine Benchmark
+Time-to-transcript for the engines in recognition.py against the fake
+Speech/Storage clients:
+
+  long_running   upload + one long_running_recognize operation
+  streaming xN   silence-cut slices on N parallel streaming sessions, each
+                 paced at real time (the fake rejects faster streams)
+  sharded xN     N silence-cut shards, each its own long-running operation
+
+Usage:
+    python -m benchmarks.recognition
+    python -m benchmarks.recognition --seconds 60 600 --workers 1 4 8 --lro-rtf 0.3
+    python -m benchmarks.recognition --seconds 3600 --workers --shards 1 2 4 8 16
+
+--speed runs the fake clock faster: "real time" for a streaming session
+is then --speed audio seconds per second.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.fakes import FakeCloud, Latency, install
+from benchmarks.fixtures import speech_like, write_wav
+from benchmarks.pipelines import parse_latency
+from recognition import recognize_long_running, recognize_sharded, recognize_streaming
+
+BUCKET = "bench-bucket"
+
+
+def fixture(directory, seconds):
+    path = os.path.join(directory, f"speech_{seconds}s.wav")
+    if not os.path.exists(path):
+        write_wav(path, speech_like(seconds, seed=seconds))
+    return path
+
+
+def timed(run):
+    start = time.perf_counter()
+    segments = run()
+    return segments, time.perf_counter() - start
+
+
+def check(segments, seconds):
+    """Merged segments must be on the file's timeline and in order"""
+    starts = [s.start for s in segments]
+    ordered = starts == sorted(starts) and all(0 <= s.start <= s.end <= seconds + 1 for s in segments)
+    return "ok" if ordered else "BAD ORDER"
+
+
+def report(label, seconds, wall, segments, baseline):
+    words = sum(len(s.words) for s in segments)
+    print(f"  {seconds:>7}  {label:<15}{wall:>9.2f}{baseline / wall:>10.1f}x"
+          f"{len(segments):>10}{words:>8}  {check(segments, seconds)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch recognition engine benchmark")
+    parser.add_argument("--seconds", type=int, nargs="+", default=[60, 300])
+    parser.add_argument("--workers", type=int, nargs="*", default=[1, 2, 4], help="streaming sessions")
+    parser.add_argument("--shards", type=int, nargs="*", default=[2, 4, 8], help="long-running shards")
+    parser.add_argument("--slice-seconds", type=float, default=60,
+                        help="streaming slice length (production: 240)")
+    parser.add_argument("--lro-rtf", type=float, default=0.05, help="fake LRO seconds per audio second")
+    parser.add_argument("--stream-rtf", type=float, default=0.02, help="fake streaming seconds per audio second")
+    parser.add_argument("--upload-mbps", type=float, default=20.0)
+    parser.add_argument("--speed", type=float, default=10.0, help="fake clock speed-up for streaming sessions")
+    parser.add_argument("--latency", action="append", default=[], metavar="API=SPEC")
+    parser.add_argument("--fixture-dir", default=os.path.join(tempfile.gettempdir(), "translator_fixtures"))
+    args = parser.parse_args()
+
+    os.makedirs(args.fixture_dir, exist_ok=True)
+    cloud = FakeCloud(
+        latencies=dict(parse_latency(args.latency), connect=Latency()),
+        lro_rtf=args.lro_rtf,
+        stream_rtf=args.stream_rtf,
+        upload_mbps=args.upload_mbps
+    )
+    cloud.speed = args.speed
+    restore = install(cloud)
+
+    try:
+        print("=" * 72)
+        print(f"  {'AUDIO s':>7}  {'ENGINE':<15}{'WALL s':>9}{'SPEED-UP':>11}{'SEGMENTS':>10}{'WORDS':>8}  ORDER")
+        print("=" * 72)
+
+        for seconds in args.seconds:
+            path = fixture(args.fixture_dir, seconds)
+
+            cloud.reset()
+            segments, baseline = timed(lambda: recognize_long_running(path, "ta-IN", BUCKET, "bench.wav"))
+            report("long_running", seconds, baseline, segments, baseline)
+
+            for workers in args.workers:
+                cloud.reset()
+                segments, wall = timed(lambda: recognize_streaming(
+                    path, "ta-IN", slice_seconds=args.slice_seconds, max_workers=workers, pace=args.speed
+                ))
+                report(f"streaming x{workers}", seconds, wall, segments, baseline)
+
+            for shards in args.shards:
+                cloud.reset()
+                segments, wall = timed(lambda: recognize_sharded(
+                    path, "ta-IN", BUCKET, "bench.wav", shards=shards, poll_seconds=0.1
+                ))
+                report(f"sharded x{shards}", seconds, wall, segments, baseline)
+            print("-" * 72)
+    finally:
+        restore()
+        cloud.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Resampling Benchmark
+CPU milliseconds per second of audio for the conversions the live
+translators do - capture (48 kHz stereo / 44.1 kHz -> 16 kHz, fed in
+100 ms device blocks like the input callback) and playback (Google 24 kHz
+/ Coqui 22.05 kHz -> a 48 kHz output device) - for:
+
+  polyphase   resample.CaptureConverter / resample.resample()
+  interp      np.interp (linear) - cheap, but aliases
+
+ALIAS is the level of a tone 1 kHz above the output's Nyquist frequency
+that leaks through (lower is better; only meaningful when downsampling).
+
+Usage:
+    python -m benchmarks.resample
+    python -m benchmarks.resample --seconds 30
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from resample import CaptureConverter, resample
+
+# (name, in rate, channels, out rate, streamed in device blocks)
+CONVERSIONS = [
+    ("capture 48k stereo", 48000, 2, 16000, True),
+    ("capture 44.1k", 44100, 1, 16000, True),
+    ("playback 24k", 24000, 1, 48000, False),
+    ("playback 22.05k", 22050, 1, 48000, False),
+]
+
+
+def polyphase(samples, in_rate, channels, out_rate, streamed):
+    if not streamed:
+        return resample(samples, in_rate, out_rate)
+    converter = CaptureConverter(in_rate, channels, out_rate)
+    block = in_rate // 10
+    return np.concatenate([converter.convert(samples[i:i + block]) for i in range(0, len(samples), block)])
+
+
+def interp(samples, in_rate, channels, out_rate, streamed):
+    flat = samples.mean(axis=1) if samples.ndim == 2 else samples.astype(np.float32)
+    times = np.arange(int(len(flat) * out_rate / in_rate)) / out_rate
+    return np.interp(times, np.arange(len(flat)) / in_rate, flat)
+
+
+METHODS = [("polyphase", polyphase), ("interp", interp)]
+
+
+def tone(frequency, rate, channels, seconds):
+    t = np.arange(int(rate * seconds)) / rate
+    wave = (np.sin(2 * np.pi * frequency * t) * 16000).astype(np.int16)
+    return np.repeat(wave.reshape(-1, 1), channels, axis=1) if channels > 1 else wave
+
+
+def cpu_ms_per_second(method, conversion, seconds, repeats):
+    _, in_rate, channels, out_rate, streamed = conversion
+    samples = tone(440, in_rate, channels, seconds)
+    method(samples, in_rate, channels, out_rate, streamed)   # filter design is a one-off, not per second
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.process_time()
+        method(samples, in_rate, channels, out_rate, streamed)
+        best = min(best, time.process_time() - start)
+    return best / seconds * 1000
+
+
+def alias_db(method, conversion):
+    _, in_rate, channels, out_rate, streamed = conversion
+    if out_rate >= in_rate:
+        return None
+    out = np.asarray(method(tone(out_rate / 2 + 1000, in_rate, channels, 2.0), in_rate, channels, out_rate, streamed),
+                     dtype=np.float64)
+    middle = out[len(out) // 4:3 * len(out) // 4]
+    # int16 output: below about -90 dB it rounds to silence
+    return 20 * np.log10(max(np.sqrt(np.mean(middle ** 2)), 0.5) / (16000 / np.sqrt(2)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resampler CPU cost per second of audio")
+    parser.add_argument("--seconds", type=float, default=10.0, help="audio per run")
+    parser.add_argument("--repeats", type=int, default=3, help="best of")
+    args = parser.parse_args()
+
+    print("\n" + "=" * 64)
+    print(f"  {'CONVERSION':<22}{'METHOD':<12}{'CPU ms/s':>10}{'x RT':>10}{'ALIAS dB':>10}")
+    print("=" * 64)
+    for conversion in CONVERSIONS:
+        for name, method in METHODS:
+            ms = cpu_ms_per_second(method, conversion, args.seconds, args.repeats)
+            alias = alias_db(method, conversion)
+            print(f"  {conversion[0]:<22}{name:<12}{ms:>10.2f}{1000 / ms:>10.0f}"
+                  f"{'-' if alias is None else f'{alias:.1f}':>10}")
+
+
+if __name__ == "__main__":
+    main()
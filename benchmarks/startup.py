@@ -0,0 +1,142 @@
+"""
+Startup Benchmark
+Measures how fast the entry points become usable:
+
+  * import time per module (`python -X importtime`), with the slowest imports
+  * time-to-menu for chitrp.py (until the direction prompt is printed)
+  * time-to-first-HTTP-response for web_translator.py (GET /)
+
+Usage:
+    python -m benchmarks.startup
+    python -m benchmarks.startup --modules chitrp web_translator test demo --runs 5
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# ==============================
+# IMPORT TIME
+# ==============================
+def import_time(module, top=5):
+    """-> (total seconds, [(cumulative seconds, module name), ...] slowest first)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    entries = []
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        entries.append((int(cumulative) / 1e6, name.rstrip()))
+
+    # Children are listed before their parent, indented two spaces per level
+    end = max(i for i, (_, name) in enumerate(entries) if name == f" {module}")
+    start = end
+    while start > 0 and entries[start - 1][1].startswith("   "):
+        start -= 1
+
+    direct = [(t, name.strip()) for t, name in entries[start:end]
+              if not name.startswith("     ")]
+    return entries[end][0], sorted(direct, reverse=True)[:top]
+
+
+# ==============================
+# TIME TO MENU
+# ==============================
+def time_to_menu(timeout=60):
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-u", "chitrp.py"],
+        cwd=ROOT, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+    )
+    try:
+        while True:
+            line = proc.stdout.readline()
+            if not line:
+                raise RuntimeError(proc.stderr.read().strip().splitlines()[-1])
+            if "Choose translation direction" in line:
+                return time.perf_counter() - start
+            if time.perf_counter() - start > timeout:
+                raise TimeoutError("menu never appeared")
+    finally:
+        proc.kill()
+        proc.wait()
+
+
+# ==============================
+# TIME TO FIRST HTTP RESPONSE
+# ==============================
+def time_to_first_response(port=5000, timeout=60):
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "web_translator.py"],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError(proc.stderr.read().decode().strip().splitlines()[-1])
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as response:
+                    response.read()
+                    return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.02)
+        raise TimeoutError("server never answered")
+    finally:
+        proc.kill()
+        proc.wait()
+
+
+def measure(label, fn, runs):
+    try:
+        samples = [fn() for _ in range(runs)]
+    except Exception as e:
+        print(f"  {label:<34} ❌ {e}")
+        return
+    print(f"  {label:<34} median {statistics.median(samples) * 1000:8.1f} ms   "
+          f"min {min(samples) * 1000:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Entry point startup benchmark")
+    parser.add_argument("--modules", nargs="+", default=["chitrp", "web_translator", "test", "demo", "opensource"])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--port", type=int, default=5000)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("  IMPORT TIME (python -X importtime)")
+    print("=" * 70)
+    for module in args.modules:
+        try:
+            total, slowest = import_time(module)
+        except RuntimeError as e:
+            print(f"  {module:<16} ❌ {e}")
+            continue
+        print(f"  {module:<16} {total * 1000:8.1f} ms")
+        for seconds, name in slowest:
+            print(f"      {seconds * 1000:8.1f} ms  {name}")
+
+    print("\n" + "=" * 70)
+    print("  ENTRY POINTS")
+    print("=" * 70)
+    measure("chitrp.py time-to-menu", time_to_menu, args.runs)
+    measure("web_translator.py first response", lambda: time_to_first_response(args.port), args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Transcript Artifact Benchmark
+Synthetic long transcripts (~2 words/second of audio) saved as the
+columnar .npz index and as JSON, reporting file size, save time, load
+time and time-range query latency.
+
+Usage:
+    python -m benchmarks.transcripts
+    python -m benchmarks.transcripts --hours 1 10 --queries 5000
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from recognition import Segment, Word
+from transcripts import load_transcript, save_transcript, write_json
+
+WORDS = "வணக்கம் நன்றி கூட்டம் திட்டம் வாடிக்கையாளர் வாரம் குழு கேள்வி பதில் அறிக்கை".split()
+
+
+def synthetic_segments(hours, seed=0):
+    rng = random.Random(seed)
+    segments = []
+    t = 0.0
+    end_of_audio = hours * 3600
+
+    while t < end_of_audio:
+        words = []
+        for _ in range(rng.randint(5, 25)):
+            length = rng.uniform(0.2, 0.6)
+            words.append(Word(rng.choice(WORDS), t, t + length, rng.uniform(0.6, 1.0)))
+            t += length
+        segments.append(Segment(words[0].start, t, " ".join(w.word for w in words) + ".",
+                                rng.uniform(0.7, 1.0), words))
+        t += rng.uniform(0.3, 1.5)
+
+    return segments
+
+
+def timed(run):
+    start = time.perf_counter()
+    result = run()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcript artifact benchmark")
+    parser.add_argument("--hours", type=float, nargs="+", default=[0.2, 1, 5])
+    parser.add_argument("--queries", type=int, default=1000, help="random 15 s windows per transcript")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_transcripts_")
+    try:
+        print("=" * 92)
+        print(f"  {'HOURS':>5}{'WORDS':>10}  {'FORMAT':<7}{'MB':>8}{'SAVE s':>9}{'LOAD s':>9}"
+              f"{'REBUILD s':>11}{'QUERY µs':>10}")
+        print("=" * 92)
+
+        for hours in args.hours:
+            segments = synthetic_segments(hours)
+            words = sum(len(s.words) for s in segments)
+            npz = os.path.join(workdir, "t.npz")
+            js = os.path.join(workdir, "t.json")
+
+            _, save = timed(lambda: save_transcript(npz, segments, language="ta-IN"))
+            transcript, load = timed(lambda: load_transcript(npz))
+            _, rebuild = timed(transcript.segments)
+
+            rng = random.Random(1)
+            windows = [rng.uniform(0, hours * 3600 - 15) for _ in range(args.queries)]
+            _, query = timed(lambda: [transcript.words_between(t, t + 15) for t in windows])
+            print(f"  {hours:>5}{words:>10}  {'npz':<7}{os.path.getsize(npz) / 1e6:>8.2f}{save:>9.3f}"
+                  f"{load:>9.3f}{rebuild:>11.3f}{query / args.queries * 1e6:>10.1f}")
+
+            _, save = timed(lambda: write_json(js, segments, language="ta-IN"))
+
+            def load_json():
+                with open(js, encoding="utf-8") as f:
+                    return json.load(f)
+
+            data, load = timed(load_json)
+            _, rebuild = timed(lambda: [
+                Segment(s["start"], s["end"], s["transcript"], s["confidence"],
+                        [Word(**w) for w in s["words"]])
+                for s in data["segments"]
+            ])
+            print(f"  {'':>5}{'':>10}  {'json':<7}{os.path.getsize(js) / 1e6:>8.2f}{save:>9.3f}"
+                  f"{load:>9.3f}{rebuild:>11.3f}{'-':>10}")
+            print("-" * 92)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Upload Encoding Benchmark
+Encodes fixture audio as LINEAR16 / FLAC / OGG_OPUS, uploads it to the fake
+GCS bucket at a simulated bandwidth and reports bytes, encode time, upload
+time and what each format saves over raw WAV. Each format is then run
+through recognize_long_running to confirm its RecognitionConfig.encoding
+is accepted.
+
+Usage:
+    python -m benchmarks.upload
+    python -m benchmarks.upload --seconds 600 3600 --upload-mbps 10
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.fakes import FakeCloud, Latency, install
+from benchmarks.recognition import fixture
+from recognition import UPLOAD_FORMATS, open_pcm, recognize_long_running, upload_to_gcs, write_audio
+
+BUCKET = "bench-bucket"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Upload encoding benchmark")
+    parser.add_argument("--seconds", type=int, nargs="+", default=[60, 600])
+    parser.add_argument("--encodings", nargs="+", default=list(UPLOAD_FORMATS), choices=list(UPLOAD_FORMATS))
+    parser.add_argument("--upload-mbps", type=float, default=20.0)
+    parser.add_argument("--fixture-dir", default=os.path.join(tempfile.gettempdir(), "translator_fixtures"))
+    args = parser.parse_args()
+
+    os.makedirs(args.fixture_dir, exist_ok=True)
+    workdir = tempfile.mkdtemp(prefix="bench_upload_")
+    cloud = FakeCloud(
+        latencies={"connect": Latency(), "speech_lro": Latency()},
+        lro_rtf=0.0,
+        upload_mbps=args.upload_mbps
+    )
+    restore = install(cloud)
+
+    try:
+        print("=" * 88)
+        print(f"  {'AUDIO s':>7}  {'ENCODING':<10}{'MB':>9}{'ENCODE s':>10}{'UPLOAD s':>10}"
+              f"{'TOTAL s':>9}{'SAVED MB':>10}{'SAVED s':>9}  RECOGNIZE")
+        print("=" * 88)
+
+        for seconds in args.seconds:
+            path = fixture(args.fixture_dir, seconds)
+            samples, rate = open_pcm(path)
+            baseline = None
+
+            for encoding in args.encodings:
+                target = os.path.join(workdir, "audio" + UPLOAD_FORMATS[encoding][0])
+                start = time.perf_counter()
+                if encoding == "LINEAR16":
+                    target = path   # the extracted WAV is uploaded as-is
+                else:
+                    write_audio(target, samples, rate, encoding)
+                encode = time.perf_counter() - start
+
+                cloud.reset()
+                upload_to_gcs(BUCKET, target, "bench" + UPLOAD_FORMATS[encoding][0])
+                upload = cloud.counters["storage_upload_ms"] / 1000
+                size = cloud.counters["storage_bytes"] / 1e6
+                baseline = baseline or (size, encode + upload)
+
+                try:
+                    segments = recognize_long_running(path, "ta-IN", BUCKET, "bench.wav", encoding=encoding)
+                    status = f"{len(segments)} segments"
+                except Exception as e:
+                    status = type(e).__name__
+
+                print(f"  {seconds:>7}  {encoding:<10}{size:>9.2f}{encode:>10.2f}{upload:>10.2f}"
+                      f"{encode + upload:>9.2f}{baseline[0] - size:>10.2f}"
+                      f"{baseline[1] - encode - upload:>9.2f}  {status}")
+            print("-" * 88)
+    finally:
+        restore()
+        cloud.close()
+
+
+if __name__ == "__main__":
+    main()
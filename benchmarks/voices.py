@@ -0,0 +1,63 @@
+"""
+Voice Selection Benchmark
+Per-utterance cost of getting synthesize_speech()'s voice and audio
+config: building VoiceSelectionParams + AudioConfig on every call (the
+old if/else in GoogleTextToSpeech) vs the registry's cached objects.
+
+Usage:
+    python -m benchmarks.voices
+    python -m benchmarks.voices --calls 100000
+"""
+
+import argparse
+import time
+
+from voices import registry
+
+LANGUAGES = ("fr", "en")
+
+
+def per_call(language, rate):
+    """What GoogleTextToSpeech.synthesize() used to do for every utterance"""
+    from google.cloud import texttospeech
+
+    if language == "fr":
+        voice = texttospeech.VoiceSelectionParams(language_code="fr-FR", name="fr-FR-Neural2-B")
+    else:
+        voice = texttospeech.VoiceSelectionParams(language_code="en-US", name="en-US-Neural2-D")
+    audio_config = texttospeech.AudioConfig(
+        audio_encoding=texttospeech.AudioEncoding.LINEAR16,
+        sample_rate_hertz=rate
+    )
+    return voice, audio_config
+
+
+def cached(language, rate):
+    return registry.google_params(language, sample_rate=rate)
+
+
+def run(select, calls, rate=16000):
+    select("fr", rate)   # imports + first build are startup cost, not per utterance
+    start = time.perf_counter()
+    for i in range(calls):
+        select(LANGUAGES[i % 2], rate)
+    return (time.perf_counter() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Voice selection cost per utterance")
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args()
+
+    results = [("per-call", run(per_call, args.calls)), ("registry", run(cached, args.calls))]
+    baseline = results[0][1]
+
+    print("\n" + "=" * 44)
+    print(f"  {'SELECTION':<12}{'us/utterance':>16}{'SPEEDUP':>12}")
+    print("=" * 44)
+    for name, seconds in results:
+        print(f"  {name:<12}{seconds * 1e6:>16.2f}{baseline / seconds:>11.1f}x")
+
+
+if __name__ == "__main__":
+    main()
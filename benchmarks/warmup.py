@@ -0,0 +1,84 @@
+"""
+Connection Reuse / Pre-warm Benchmark
+First-request vs steady-state latency of Translate and Text-to-Speech for:
+
+  per-call   a new client for every request (old test.py behaviour)
+  shared     one shared client, cold start
+  prewarmed  shared client warmed with a no-op request before use
+
+Runs against the in-process fakes (a client's first call pays a simulated
+connection cost, see --connect) unless --live is given.
+
+Usage:
+    python -m benchmarks.warmup
+    python -m benchmarks.warmup --requests 20 --connect const:0.5
+    python -m benchmarks.warmup --live      # real Google APIs (needs credentials)
+"""
+
+import argparse
+import statistics
+import time
+
+import clients
+from backends import GoogleTextToSpeech, GoogleTranslator, prewarm
+from benchmarks.fakes import FakeCloud, Latency, install
+
+TEXT = "Bonjour à tous, merci d'être venus aujourd'hui."
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def run_mode(mode, requests):
+    clients.reset()
+    backends = (GoogleTranslator(), GoogleTextToSpeech())
+
+    if mode == "prewarmed":
+        for thread in prewarm(backends):
+            thread.join()
+
+    results = {}
+    for backend in backends:
+        calls = []
+        for _ in range(requests):
+            if mode == "per-call":
+                clients.reset()   # what constructing a client per call amounts to
+            if isinstance(backend, GoogleTranslator):
+                calls.append(timed(lambda: backend.translate(TEXT, "fr", "en")))
+            else:
+                calls.append(timed(lambda: backend.synthesize(TEXT, "fr")))
+        results[type(backend).__name__] = calls
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="First-request vs steady-state latency")
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--connect", default="const:0.35", help="fake connection setup latency")
+    parser.add_argument("--live", action="store_true", help="use real Google APIs")
+    args = parser.parse_args()
+
+    restore = None
+    if not args.live:
+        cloud = FakeCloud(latencies={"connect": Latency.parse(args.connect)})
+        restore = install(cloud)
+
+    try:
+        print("=" * 72)
+        print(f"  {'MODE':<11}{'API':<22}{'FIRST ms':>12}{'STEADY p50 ms':>15}{'TOTAL ms':>12}")
+        print("=" * 72)
+        for mode in ("per-call", "shared", "prewarmed"):
+            for api, calls in run_mode(mode, args.requests).items():
+                steady = statistics.median(calls[1:]) if len(calls) > 1 else calls[0]
+                print(f"  {mode:<11}{api:<22}{calls[0] * 1000:>12.1f}{steady * 1000:>15.1f}"
+                      f"{sum(calls) * 1000:>12.1f}")
+    finally:
+        if restore:
+            restore()
+
+
+if __name__ == "__main__":
+    main()
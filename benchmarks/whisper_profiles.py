@@ -0,0 +1,130 @@
+"""
+Whisper Profile Benchmark
+Measures real-time factor (RTF) and word error rate (WER) of each latency
+profile against reference transcripts.
+
+Reference data: a folder of audio files, each with a same-named .txt
+containing the reference transcript, e.g.
+
+    refs/meeting_01.wav
+    refs/meeting_01.txt
+
+Usage:
+    python -m benchmarks.whisper_profiles refs/ --language fr
+    python -m benchmarks.whisper_profiles refs/ --profiles realtime accurate
+"""
+
+import argparse
+import glob
+import os
+import re
+import time
+
+from faster_whisper import WhisperModel
+
+from profiles import WHISPER_PROFILES, get_whisper_profile, whisper_transcribe_options
+
+AUDIO_EXTENSIONS = (".wav", ".flac", ".mp3", ".ogg", ".m4a")
+
+
+# ==============================
+# WER
+# ==============================
+def normalize_words(text):
+    text = re.sub(r"[^\w\s']", " ", text.lower())
+    return text.split()
+
+
+def word_error_rate(reference, hypothesis):
+    """Levenshtein distance over words / reference length"""
+    ref = normalize_words(reference)
+    hyp = normalize_words(hypothesis)
+
+    if not ref:
+        return 0.0 if not hyp else 1.0
+
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, start=1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, start=1):
+            current[j] = min(
+                previous[j] + 1,                           # deletion
+                current[j - 1] + 1,                        # insertion
+                previous[j - 1] + (ref_word != hyp_word),  # substitution
+            )
+        previous = current
+
+    return previous[-1] / len(ref)
+
+
+# ==============================
+# BENCHMARK
+# ==============================
+def load_references(data_dir):
+    pairs = []
+    for path in sorted(glob.glob(os.path.join(data_dir, "*"))):
+        base, ext = os.path.splitext(path)
+        if ext.lower() in AUDIO_EXTENSIONS and os.path.exists(base + ".txt"):
+            with open(base + ".txt", encoding="utf-8") as f:
+                pairs.append((path, f.read()))
+    return pairs
+
+
+def run_profile(name, references, model_size, language):
+    profile = get_whisper_profile(name)
+    options = whisper_transcribe_options(profile)
+
+    model = WhisperModel(model_size, compute_type=profile["compute_type"])
+
+    total_audio = 0.0
+    total_elapsed = 0.0
+    errors = []
+
+    for audio_path, reference in references:
+        start = time.perf_counter()
+        segments, info = model.transcribe(audio_path, language=language, **options)
+        hypothesis = " ".join(seg.text for seg in segments)  # segments are lazy
+        elapsed = time.perf_counter() - start
+
+        total_audio += info.duration
+        total_elapsed += elapsed
+        wer = word_error_rate(reference, hypothesis)
+        errors.append(wer)
+
+        print(f"  {os.path.basename(audio_path)}: "
+              f"RTF {elapsed / max(info.duration, 1e-9):.3f}  WER {wer:.1%}")
+
+    return {
+        "profile": name,
+        "rtf": total_elapsed / max(total_audio, 1e-9),
+        "wer": sum(errors) / len(errors),
+        "audio_seconds": total_audio,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Whisper latency profile benchmark")
+    parser.add_argument("data_dir", help="folder of audio files + .txt references")
+    parser.add_argument("--profiles", nargs="+", default=list(WHISPER_PROFILES))
+    parser.add_argument("--model", default="large-v2")
+    parser.add_argument("--language", default="fr")
+    args = parser.parse_args()
+
+    references = load_references(args.data_dir)
+    if not references:
+        raise SystemExit(f"❌ No audio/.txt pairs found in {args.data_dir}")
+
+    results = []
+    for name in args.profiles:
+        print(f"\n⏱ Profile: {name}")
+        results.append(run_profile(name, references, args.model, args.language))
+
+    print("\n" + "=" * 60)
+    print(f"  {'PROFILE':<12}{'RTF':>10}{'WER':>10}{'AUDIO (s)':>14}")
+    print("=" * 60)
+    for r in results:
+        print(f"  {r['profile']:<12}{r['rtf']:>10.3f}{r['wer']:>10.1%}{r['audio_seconds']:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,18 +3,26 @@ import numpy as np
 import queue
 import threading
 import time
-from google.cloud import speech
-from google.cloud import texttospeech
-from google.cloud import translate_v2 as translate
+
+import config
+
+if __name__ == "__main__":
+    # --stt-backend / --profile / --config ... before the modules below read their settings
+    config.parse_args("Live meeting translator (terminal)")
+
+from backends import make_backends, prewarm
+from resample import CaptureConverter, input_format, play
+from tracing import tracer
+
+settings = config.settings
 
 RATE = 16000
-CHUNK = int(RATE / 10)  # 100ms chunks
 
-speech_client = speech.SpeechClient()
-translate_client = translate.Client()
-tts_client = texttospeech.TextToSpeechClient()
+# Google for every stage unless the stt_backend / mt_backend / tts_backend settings say otherwise
+backends = make_backends()
 
 audio_queue = queue.Queue()
+capture = None   # CaptureConverter for the open input stream
 
 # Translation settings (will be set by user)
 SOURCE_LANG = None
@@ -23,153 +31,132 @@ SOURCE_LANG_CODE = None
 TARGET_LANG_NAME = None
 SOURCE_LANG_NAME = None
 
+# Auto-detect: one stream hears either language and translates it the other way
+AUTO_DETECT = False
+DETECT_LANGUAGES = {
+    # language code -> (source, target, source name, target name)
+    "fr-FR": ("fr", "en", "French", "English"),
+    "en-US": ("en", "fr", "English", "French"),
+}
+
 
 # ==============================
 # AUDIO INPUT STREAM
 # ==============================
-def audio_callback(indata, frames, time, status):
+def audio_callback(indata, frames, time_info, status):
     if status:
         print(status)
-    audio_queue.put(indata.copy())
+    audio_queue.put((time.monotonic(), indata.copy()))
 
 
 def audio_generator():
     while True:
-        chunk = audio_queue.get()
-        yield speech.StreamingRecognizeRequest(
-            audio_content=chunk.tobytes()
-        )
+        queued_at, chunk = audio_queue.get()
+        tracer.record("capture", time.monotonic() - queued_at)
+        yield capture.convert(chunk).tobytes()
 
 
 # ==============================
 # TTS + PLAY AUDIO
 # ==============================
-def speak_text(text, lang_code):
-    synthesis_input = texttospeech.SynthesisInput(text=text)
-
-    # Choose voice based on target language
-    if lang_code == "fr":
-        voice = texttospeech.VoiceSelectionParams(
-            language_code="fr-FR",
-            name="fr-FR-Neural2-B"  # French male voice
-        )
-    else:  # English
-        voice = texttospeech.VoiceSelectionParams(
-            language_code="en-US",
-            name="en-US-Neural2-D"  # English male voice
-        )
-
-    audio_config = texttospeech.AudioConfig(
-        audio_encoding=texttospeech.AudioEncoding.LINEAR16,
-        sample_rate_hertz=RATE
-    )
-
-    response = tts_client.synthesize_speech(
-        input=synthesis_input,
-        voice=voice,
-        audio_config=audio_config
-    )
-
-    audio_data = np.frombuffer(response.audio_content, dtype=np.int16)
-
-    sd.play(audio_data, RATE)
-    sd.wait()
+def speak_text(text, lang_code, source=None):
+    with tracer.span("synthesize"):
+        audio_data, rate = backends.tts.synthesize(text, lang_code, source)
+
+    with tracer.span("playback"):
+        play(audio_data, rate)
 
 
 # ==============================
 # STREAMING PIPELINE
 # ==============================
-def run_streaming():
+def recognize():
+    """(transcript, is_final, (source, target, source name, target name)) per result"""
+    if AUTO_DETECT:
+        responses = backends.stt.stream_detect(audio_generator(), list(DETECT_LANGUAGES), RATE)
+        for transcript, is_final, language_code in responses:
+            yield transcript, is_final, DETECT_LANGUAGES[language_code]
+    else:
+        route = (SOURCE_LANG, TARGET_LANG, SOURCE_LANG_NAME, TARGET_LANG_NAME)
+        for transcript, is_final in backends.stt.stream(audio_generator(), SOURCE_LANG_CODE, RATE):
+            yield transcript, is_final, route
 
-    config = speech.RecognitionConfig(
-        encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
-        sample_rate_hertz=RATE,
-        language_code=SOURCE_LANG_CODE,
-        model="default",
-        enable_automatic_punctuation=True,
-    )
 
-    streaming_config = speech.StreamingRecognitionConfig(
-        config=config,
-        interim_results=True,
-        single_utterance=False
-    )
+def run_streaming():
 
     print(f"\n🎤 Live translator started ({SOURCE_LANG_NAME} → {TARGET_LANG_NAME})")
     print("🔴 Speak now - translation happens immediately after you stop speaking")
     print("💡 Press Ctrl+C to stop\n")
 
     last_transcript = ""
+    utterance_id = None
+    utterance_start = None
 
-    def translate_and_speak(text):
+    def translate_and_speak(text, route, utterance_id, utterance_start):
         """Translate in background thread for faster response"""
+        source, target, source_name, target_name = route
         try:
-            print(f"\n📝 {SOURCE_LANG_NAME}: {text}")
-            print("🌍 Translating...", end='', flush=True)
-            
-            translated = translate_client.translate(
-                text,
-                source_language=SOURCE_LANG,
-                target_language=TARGET_LANG
-            )
+            with tracer.bind(utterance_id):
+                print(f"\n📝 {source_name}: {text}")
+                print("🌍 Translating...", end='', flush=True)
+
+                with tracer.span("translate"):
+                    translated_text = backends.mt.translate(text, source, target)
 
-            translated_text = translated["translatedText"]
-            print(f"\r🗣️  {TARGET_LANG_NAME}: {translated_text}")
+                print(f"\r🗣️  {target_name}: {translated_text}")
 
-            speak_text(translated_text, TARGET_LANG)
-            print()  # New line after speaking
+                speak_text(translated_text, target, source)
+                tracer.record("end_to_end", time.monotonic() - utterance_start)
+                print()  # New line after speaking
             
         except Exception as e:
             print(f"\n❌ Translation error: {e}\n")
 
+    # Capture at the device's own rate and channels; audio_generator() converts to RATE mono
+    global capture
+    rate, channels = input_format()
+    capture = CaptureConverter(rate, channels, RATE)
+
     with sd.InputStream(
-        samplerate=RATE,
-        blocksize=CHUNK,
+        samplerate=rate,
+        blocksize=rate * settings.chunk_ms // 1000,
         dtype="int16",
-        channels=1,
+        channels=channels,
         callback=audio_callback,
     ):
 
-        requests = audio_generator()
-
         try:
-            responses = speech_client.streaming_recognize(
-                streaming_config,
-                requests,
-            )
-
-            for response in responses:
-                if not response.results:
+            for transcript, is_final, route in recognize():
+                if not transcript.strip():
                     continue
+
+                # First result of a new utterance starts its trace
+                if utterance_id is None:
+                    utterance_id = tracer.new_utterance()
+                    utterance_start = time.monotonic()
+
+                if is_final:
+                    # Got final result - translate immediately!
+                    print(f"\n✅ {transcript}")
+                    tracer.record("recognize", time.monotonic() - utterance_start, utterance_id)
                     
-                for result in response.results:
-                    if not result.alternatives:
-                        continue
+                    if transcript.strip() and transcript != last_transcript:
+                        last_transcript = transcript
                         
-                    transcript = result.alternatives[0].transcript
+                        # Translate in background thread for speed
+                        thread = threading.Thread(
+                            target=translate_and_speak, 
+                            args=(transcript, route, utterance_id, utterance_start),
+                            daemon=True
+                        )
+                        thread.start()
+
+                    utterance_id = None
+                    
+                else:
+                    # Interim result - show live transcription
+                    print(f"🟡 {transcript}                    ", end='\r', flush=True)
                     
-                    if not transcript.strip():
-                        continue
-
-                    if result.is_final:
-                        # Got final result - translate immediately!
-                        print(f"\n✅ {transcript}")
-                        
-                        if transcript.strip() and transcript != last_transcript:
-                            last_transcript = transcript
-                            
-                            # Translate in background thread for speed
-                            thread = threading.Thread(
-                                target=translate_and_speak, 
-                                args=(transcript,),
-                                daemon=True
-                            )
-                            thread.start()
-                        
-                    else:
-                        # Interim result - show live transcription
-                        print(f"🟡 {transcript}                    ", end='\r', flush=True)
-                        
         except Exception as e:
             print(f"\n❌ Streaming error: {e}")
             print("Possible issues:")
@@ -183,7 +170,7 @@ def run_streaming():
 # MENU SYSTEM
 # ==============================
 def show_menu():
-    global SOURCE_LANG, TARGET_LANG, SOURCE_LANG_CODE, TARGET_LANG_NAME, SOURCE_LANG_NAME
+    global SOURCE_LANG, TARGET_LANG, SOURCE_LANG_CODE, TARGET_LANG_NAME, SOURCE_LANG_NAME, AUTO_DETECT
     
     print("=" * 60)
     print("         LIVE MEETING TRANSLATOR")
@@ -191,11 +178,12 @@ def show_menu():
     print("\nChoose translation direction:\n")
     print("  1. French → English  (Client speaks French)")
     print("  2. English → French  (You speak English)")
-    print("  3. Exit")
+    print("  3. Auto-detect       (Either language - no restart when the speaker changes)")
+    print("  4. Exit")
     print()
     
     while True:
-        choice = input("Enter your choice (1, 2, or 3): ").strip()
+        choice = input("Enter your choice (1, 2, 3 or 4): ").strip()
         
         if choice == "1":
             SOURCE_LANG = "fr"
@@ -212,10 +200,16 @@ def show_menu():
             TARGET_LANG_NAME = "French"
             return True
         elif choice == "3":
+            AUTO_DETECT = True
+            SOURCE_LANG_CODE = next(iter(DETECT_LANGUAGES))
+            SOURCE_LANG_NAME = " / ".join(route[2] for route in DETECT_LANGUAGES.values())
+            TARGET_LANG_NAME = "the other"
+            return True
+        elif choice == "4":
             print("\n👋 Goodbye!")
             return False
         else:
-            print("❌ Invalid choice. Please enter 1, 2, or 3.")
+            print("❌ Invalid choice. Please enter 1, 2, 3 or 4.")
 
 
 # ==============================
@@ -230,6 +224,9 @@ if __name__ == "__main__":
     print("\n" + "=" * 60)
     print(f"Mode: {SOURCE_LANG_NAME} → {TARGET_LANG_NAME}")
     print("=" * 60)
+    # Open connections while the microphone test runs
+    prewarm(backends)
+
     print("\nTesting microphone...")
     
     # Test microphone
@@ -241,7 +238,8 @@ if __name__ == "__main__":
         
         # Quick audio level test
         print(f"\nTesting audio levels (speak in {SOURCE_LANG_NAME} for 3 seconds)...")
-        test_audio = sd.rec(int(3 * RATE), samplerate=RATE, channels=1, dtype='int16')
+        rate, channels = input_format()
+        test_audio = sd.rec(int(3 * rate), samplerate=rate, channels=channels, dtype='int16')
         sd.wait()
         
         max_level = np.max(np.abs(test_audio))
@@ -267,7 +265,7 @@ if __name__ == "__main__":
         run_streaming()
     except KeyboardInterrupt:
         print("\n\n👋 Translation stopped")
-        print("\nRestart the program to change translation direction.")
+        print("\nRestart the program to change translation direction (or pick Auto-detect).")
     except Exception as e:
         print(f"\n❌ Error: {e}")
         import traceback
@@ -0,0 +1,142 @@
+"""
+Shared Google Cloud Clients
+Each client is created on first use (importing its google.cloud module
+only then) and shared by every caller in the process, so TLS, channel
+and auth-token setup is paid once instead of per request.
+
+gRPC clients (Speech, Text-to-Speech) get keep-alive channels; REST
+clients (Translate, Storage) reuse one pooled HTTP session. Latency of
+each API call is recorded as `<api>_first_request` or `<api>_steady`.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+from config import settings
+from tracing import tracer
+
+# Keep idle channels open between utterances instead of re-handshaking
+KEEPALIVE_OPTIONS = [
+    ("grpc.keepalive_time_ms", 30000),
+    ("grpc.keepalive_timeout_ms", 10000),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.max_pings_without_data", 0),
+]
+HTTP_POOL_SIZE = settings.http_pool_size   # concurrent translate threads share one session
+
+_clients = {}
+_called = set()
+_lock = threading.Lock()
+
+
+def _shared(name, create):
+    client = _clients.get(name)
+    if client is None:
+        with _lock:
+            client = _clients.get(name)
+            if client is None:
+                client = create()
+                _clients[name] = client
+    return client
+
+
+def _keepalive_transport(client_class):
+    transport_class = client_class.get_transport_class("grpc")
+    channel = transport_class.create_channel(options=KEEPALIVE_OPTIONS)
+    return transport_class(channel=channel)
+
+
+def _pooled_session():
+    import google.auth
+    import requests
+    from google.auth.transport.requests import AuthorizedSession
+
+    credentials, _ = google.auth.default(scopes=["https://www.googleapis.com/auth/cloud-platform"])
+    session = AuthorizedSession(credentials)
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_SIZE)
+    session.mount("https://", adapter)
+    return session
+
+
+# ==============================
+# CLIENTS
+# ==============================
+def speech_client(rest=False):
+    """gRPC by default; rest=True for networks that block gRPC"""
+    def create():
+        from google.cloud import speech
+        if rest:
+            from google.cloud.speech_v1.services.speech.transports import SpeechRestTransport
+            return speech.SpeechClient(transport=SpeechRestTransport())
+        return speech.SpeechClient(transport=_keepalive_transport(speech.SpeechClient))
+    return _shared("speech_rest" if rest else "speech", create)
+
+
+def translate_client():
+    def create():
+        from google.cloud import translate_v2 as translate
+        return translate.Client(_http=_pooled_session())
+    return _shared("translate", create)
+
+
+def tts_client():
+    def create():
+        from google.cloud import texttospeech
+        return texttospeech.TextToSpeechClient(
+            transport=_keepalive_transport(texttospeech.TextToSpeechClient)
+        )
+    return _shared("tts", create)
+
+
+def storage_client():
+    def create():
+        from google.cloud import storage
+        return storage.Client(project=settings.project_id or None, _http=_pooled_session())
+    return _shared("storage", create)
+
+
+def reset():
+    """Forget every client (next call creates a fresh one)"""
+    with _lock:
+        _clients.clear()
+        _called.clear()
+
+
+# ==============================
+# METRICS
+# ==============================
+@contextmanager
+def measure(api):
+    """Time one API call, split into first-request vs steady-state"""
+    with _lock:
+        first = api not in _called
+        _called.add(api)
+
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        stage = f"{api}_first_request" if first else f"{api}_steady"
+        tracer.record(stage, time.monotonic() - start)
+
+
+# ==============================
+# PRE-WARM
+# ==============================
+def prewarm(api, timeout=10):
+    """
+    Pay connection + auth setup with a cheap request before the user
+    speaks. Speech has no free no-op RPC, so only its channel is opened.
+    """
+    with measure(api):
+        if api == "translate":
+            translate_client().get_languages(target_language="en")
+        elif api == "tts":
+            tts_client().list_voices(language_code="en-US")
+        elif api == "speech":
+            import grpc
+            channel = speech_client().transport.grpc_channel
+            grpc.channel_ready_future(channel).result(timeout=timeout)
+        else:
+            raise ValueError(f"Unknown API '{api}' (choose from: speech, translate, tts)")
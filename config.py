@@ -0,0 +1,319 @@
+"""
+Configuration
+Every setting the scripts and modules read, typed, in one place. Each is
+resolved in this order (later wins):
+
+    defaults below < tuning profile < config file < environment < command line
+
+    python test.py --profile throughput --input-video talk.mp4 --dub-targets en,fr
+    CONFIG_FILE=meet_room.json python web_translator.py
+    python web_translator.py --set output_device="CABLE Input" --print-config
+
+A setting `name` is also the environment variable NAME (so the ones read
+before - TRANSLATE_MAX_WORKERS, STT_ENGINE, QUOTA_* ... - still work) and
+the flag --name-with-dashes. A config file is JSON: setting names to
+values, plus an optional "profile". Profiles are the tuning presets in
+profiles.py (--profile / TUNING_PROFILE).
+
+Modules read `settings` when they are imported or when they run, so the
+scripts call parse_args() under `if __name__ == "__main__"` before
+importing anything else.
+"""
+
+import argparse
+import difflib
+import json
+import os
+from collections import namedtuple
+
+from profiles import TUNING_PROFILES, WHISPER_PROFILES, get_tuning_profile
+
+Setting = namedtuple("Setting", ["name", "type", "default", "help"])
+
+
+# ==============================
+# TYPES
+# ==============================
+# Each turns a default, a JSON value or an environment / command-line
+# string into the setting's value, raising ValueError if it can't
+def boolean(value):
+    if isinstance(value, str):
+        text = value.strip().lower()
+        if text in ("1", "true", "yes", "on"):
+            return True
+        if text in ("0", "false", "no", "off", ""):
+            return False
+        raise ValueError(f"expected true or false, got '{value}'")
+    return bool(value)
+
+
+def optional(value):
+    """Text, or None for '' / null"""
+    return None if value is None or value == "" else str(value)
+
+
+def device(value):
+    """A sounddevice device: index, name (or part of one), or None for the system default"""
+    if value is None or str(value).strip().lower() in ("", "none", "default"):
+        return None
+    text = str(value).strip()
+    return int(text) if text.isdigit() else text
+
+
+def choice(*options):
+    def parse(value):
+        if value not in options:
+            raise ValueError(f"'{value}' (choose from: {', '.join(options)})")
+        return value
+    return parse
+
+
+def upper_choice(*options):
+    parse = choice(*options)
+    return lambda value: parse(str(value).upper())
+
+
+# ==============================
+# SETTINGS
+# ==============================
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# api -> (requests per minute, characters per minute) - 0 = unlimited.
+# Placeholders near Google's default project quotas; set them a little
+# under the values on the project's Quotas page.
+API_QUOTAS = {
+    "speech": (900, 0),
+    "translate": (6000, 6_000_000),
+    "tts": (1000, 500_000),
+}
+
+SECTIONS = {
+    # test.py / demo.py: what to dub and where the results go
+    "job": [
+        Setting("project_id", str, "", "Google Cloud project for Storage ('' = the credentials' project)"),
+        Setting("input_video", str, "videoplayback.mp4", "video to dub"),
+        Setting("temp_audio", str, "temp_tamil_audio.wav", "16 kHz mono WAV extracted from the video"),
+        Setting("output_audio", str, "english_output_audio.mp3", "English dub; other languages go next to it"),
+        Setting("output_video", optional, None, "also write one video carrying every dubbed track"),
+        Setting("dub_targets", str, "en", "languages to dub into, e.g. en:en-US-Neural2-D,fr,hi"),
+        Setting("voice_name", optional, None, "demo.py's English voice instead of voices.json's"),
+        Setting("upload_bucket", str, "ilios-speech-audio", "GCS bucket long recordings are uploaded to"),
+        Setting("upload_blob", str, "temp_audio.wav", "object name of the upload"),
+        Setting("dub_mode", choice("auto", "batch", "stream"), "auto",
+                "batch = whole transcript at once, stream = stream_window segments at a time"),
+        Setting("stream_min_seconds", float, 20 * 60, "auto mode streams inputs longer than this"),
+        Setting("stream_window", int, 256, "segments translated, subtitled and voiced together in stream mode"),
+        Setting("tts_max_chars", int, 4000, "characters per speech synthesis request (API limit 5000 bytes)"),
+    ],
+    # Audio devices on this machine - run setup_audio_devices.py to find them
+    "devices": [
+        Setting("input_device", device, 2, "meeting audio in (CABLE Output)"),
+        Setting("output_device", device, 15, "translated speech out to the meeting (CABLE Input)"),
+        Setting("local_input_device", device, None, "duplex: your microphone"),
+        Setting("listen_device", device, None, "duplex: your headphones"),
+        Setting("capture_rate", int, 0, "force the input's sample rate (0 = what the device reports)"),
+        Setting("capture_channels", int, 0, "force the input's channel count (0 = what the device reports)"),
+        Setting("playback_rate", int, 0, "force the output's sample rate (0 = what the device reports)"),
+    ],
+    # The live translators (web_translator.py, chitrp.py, opensource.py)
+    "live": [
+        Setting("web_host", str, "0.0.0.0", "web_translator.py listens here"),
+        Setting("web_port", int, 5000, "... on this port"),
+        Setting("audio_source", choice("device", "browser", "local"), "device",
+                "where a session's audio comes from unless the client asks"),
+        Setting("playback", choice("device", "browser"), "device",
+                "where translated speech plays unless the client asks"),
+        Setting("chunk_ms", int, 100, "audio per capture block / recognizer request"),
+        Setting("jitter_target_ms", int, 60, "browser audio held back to absorb network jitter"),
+        Setting("transcript_fps", float, 10, "transcript updates a second per session (0 = every result)"),
+        Setting("stt_backend", optional, None, "google / whisper ('' = the script's default)"),
+        Setting("mt_backend", optional, None, "google / nllb ('' = the script's default)"),
+        Setting("tts_backend", optional, None, "google / coqui ('' = the script's default)"),
+        Setting("whisper_profile", choice(*WHISPER_PROFILES), "realtime",
+                "local Whisper decoding preset (profiles.py)"),
+        Setting("auto_detect", boolean, False, "opensource.py: detect French / English per utterance"),
+        Setting("vad_threshold", float, 0.01, "opensource.py: RMS level treated as speech"),
+        Setting("pause_seconds", float, 0.6, "opensource.py: silence that ends an utterance"),
+        Setting("transcribe_interval_seconds", float, 1.5,
+                "opensource.py: re-transcribe ongoing speech this often to catch finished sentences"),
+        Setting("max_utterance_seconds", float, 6, "opensource.py: cut long monologues at their quietest moment"),
+    ],
+    # Concurrency, request sizes and caches
+    "throughput": [
+        Setting("translate_max_workers", int, 8, "threads translate_many() sends requests on"),
+        Setting("translate_batch_window_ms", float, 0,
+                "coalesce concurrent translate() calls for this long (0 = off)"),
+        Setting("http_pool_size", int, 32, "pooled HTTP connections shared by the REST clients"),
+        Setting("stt_engine", choice("auto", "streaming", "long_running", "sharded"), "auto",
+                "file recognition engine (auto = by duration)"),
+        Setting("upload_encoding", upper_choice("LINEAR16", "FLAC", "OGG_OPUS"), "FLAC",
+                "format audio is uploaded to GCS in"),
+        Setting("stream_workers", int, 4, "streaming recognition sessions run at once"),
+        Setting("stream_slice_seconds", float, 240, "audio per streaming session (the API takes ~5 min)"),
+        Setting("stream_chunk_seconds", float, 0.5, "audio per streaming request (API limit 25 kB)"),
+        Setting("stream_pace", float, 1.0,
+                "seconds of audio each streaming session sends per second (Speech rejects much over 1)"),
+        Setting("lro_shards", int, 0, "long-running operations per file (0 = one per shard_seconds)"),
+        Setting("shard_seconds", float, 10 * 60, "target shard length when lro_shards is 0"),
+        Setting("max_shards", int, 16, "... and at most this many"),
+        Setting("filter_cache_size", int, 32, "resampling filter banks kept (one per rate pair)"),
+        Setting("trace_samples", int, 10000, "latency samples kept per stage for percentiles"),
+    ],
+    # quota.py - per-API buckets, retries and circuit breakers
+    "quota": [
+        Setting("quota_enabled", boolean, True, "schedule Google API calls through the token buckets"),
+        Setting("quota_burst_seconds", float, 5, "seconds of quota a bucket can hold"),
+        Setting("quota_live_reserve", float, 0.2, "share of each bucket batch calls may not use"),
+        *[Setting(f"quota_{api}_{unit}", float, limit, f"{api} {label} per minute (0 = unlimited)")
+          for api, limits in API_QUOTAS.items()
+          for unit, label, limit in zip(("rpm", "cpm"), ("requests", "characters"), limits)],
+        Setting("retry_attempts", int, 6, "tries per call on 429 / 5xx / timeouts"),
+        Setting("retry_base_seconds", float, 0.2, "first backoff"),
+        Setting("retry_max_seconds", float, 10, "longest single backoff"),
+        Setting("breaker_failures", int, 5, "consecutive server failures that open an API's circuit"),
+        Setting("breaker_cooldown_seconds", float, 30, "how long an open circuit refuses calls"),
+    ],
+    "files": [
+        Setting("voices_file", str, os.path.join(HERE, "voices.json"), "voice registry"),
+        Setting("trace_log", optional, None, "append per-stage latency records here (JSON lines)"),
+    ],
+}
+
+SETTINGS = {setting.name: setting for section in SECTIONS.values() for setting in section}
+
+
+def env_name(name):
+    return name.upper()
+
+
+def flag(name):
+    return "--" + name.replace("_", "-")
+
+
+class Settings:
+    """
+    The resolved values, by attribute (settings.stream_workers) or key
+    (settings["quota_tts_rpm"]). source(name) says where one came from.
+    """
+
+    def __init__(self):
+        self._values = {}
+        self._sources = {}
+        self.profile = None
+        self.config_file = None
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__["_values"][name]
+        except KeyError:
+            raise AttributeError(f"No setting '{name}'") from None
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+    def source(self, name):
+        return self._sources[name]
+
+    def resolve(self, profile=None, config_file=None, overrides=None, environ=None):
+        """Start again from the defaults and apply every layer"""
+        environ = os.environ if environ is None else environ
+        file_values = load_file(config_file) if config_file else {}
+        profile = profile or environ.get("TUNING_PROFILE") or file_values.pop("profile", None)
+        file_values.pop("profile", None)
+
+        self._values = {name: setting.type(setting.default) for name, setting in SETTINGS.items()}
+        self._sources = dict.fromkeys(SETTINGS, "default")
+        self.profile = profile
+        self.config_file = config_file
+
+        if profile:
+            self._apply(get_tuning_profile(profile), f"profile {profile}")
+        self._apply(file_values, config_file)
+        self._apply({name: environ[env_name(name)] for name in SETTINGS if env_name(name) in environ},
+                    "environment")
+        self._apply(overrides or {}, "command line")
+        return self
+
+    def update(self, **values):
+        """Set values from code (benchmarks, notebooks); modules that read at import won't see them"""
+        self._apply(values, "code")
+
+    def _apply(self, values, source):
+        for name, value in values.items():
+            if name not in SETTINGS:
+                close = difflib.get_close_matches(name, SETTINGS, n=1)
+                hint = f" - did you mean '{close[0]}'?" if close else ""
+                raise ValueError(f"Unknown setting '{name}' from {source}{hint}")
+            try:
+                self._values[name] = SETTINGS[name].type(value)
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"Bad value for {name} from {source}: {e}") from None
+            self._sources[name] = source
+
+    def describe(self):
+        """One line per setting, grouped by section, with where each value came from"""
+        lines = [f"profile: {self.profile or '-'}   config file: {self.config_file or '-'}"]
+        for section, entries in SECTIONS.items():
+            lines.append(f"[{section}]")
+            for setting in entries:
+                value = self._values[setting.name]
+                lines.append(f"  {setting.name:<28}{value!r:<36}{self._sources[setting.name]}")
+        return "\n".join(lines)
+
+
+def load_file(path):
+    with open(path, encoding="utf-8") as f:
+        values = json.load(f)
+    if not isinstance(values, dict):
+        raise ValueError(f"{path} must hold a JSON object of setting names to values")
+    return values
+
+
+# ==============================
+# COMMAND LINE
+# ==============================
+def parse_args(description=None, argv=None):
+    """
+    Re-resolve `settings` with the command line on top:
+    --config FILE, --profile NAME, --<setting> VALUE, --set NAME=VALUE.
+    --print-config shows the result and exits.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--config", default=os.environ.get("CONFIG_FILE"),
+                        help="JSON file of settings (CONFIG_FILE)")
+    parser.add_argument("--profile", choices=list(TUNING_PROFILES),
+                        help="tuning preset from profiles.py (TUNING_PROFILE)")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE",
+                        help="any setting by name; repeatable")
+    parser.add_argument("--print-config", action="store_true", help="show every setting and where it came from")
+    for section, entries in SECTIONS.items():
+        group = parser.add_argument_group(section)
+        for setting in entries:
+            group.add_argument(flag(setting.name), dest=setting.name, metavar="VALUE", default=argparse.SUPPRESS,
+                               help=f"{setting.help} [{env_name(setting.name)}, default {setting.default!r}]")
+
+    args = vars(parser.parse_args(argv))
+    config_file, profile, assignments = args.pop("config"), args.pop("profile"), args.pop("set")
+    print_config = args.pop("print_config")
+
+    overrides = {}
+    for assignment in assignments:
+        name, sep, value = assignment.partition("=")
+        if not sep:
+            parser.error(f"--set takes NAME=VALUE, got '{assignment}'")
+        overrides[name.strip()] = value
+    overrides.update(args)   # explicit flags win over --set
+
+    try:
+        settings.resolve(profile, config_file, overrides)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    if print_config:
+        print(settings.describe())
+        parser.exit()
+    return settings
+
+
+# Environment and CONFIG_FILE; scripts add their command line via parse_args()
+settings = Settings().resolve(config_file=os.environ.get("CONFIG_FILE"))
@@ -1,34 +1,35 @@
-import vertexai
-from moviepy import VideoFileClip, AudioFileClip
-from google.cloud import texttospeech_v1 as texttospeech
-from google.cloud import speech_v1 as speech
-from google.cloud import translate_v2 as translate
-import os
-import html
+import config
+
+if __name__ == "__main__":
+    # --input-video / --voice-name / --config ... before the modules below read their settings
+    config.parse_args("Dub a video into English")
+
+import clients
+from quota import BATCH, quotas
+from voices import registry as voice_registry
 
 # ========================
 # CONFIG
 # ========================
 
-PROJECT_ID = "iliosdigital-ai-poc"
-LOCATION = "us-central1"
+# The job spec - config.py's "job" settings, shared with test.py
+settings = config.settings
 
-INPUT_VIDEO = "videoplayback.mp4"
-TEMP_AUDIO = "tamil_audio.wav"
+INPUT_VIDEO = settings.input_video
+TEMP_AUDIO = settings.temp_audio
 
-OUTPUT_AUDIO = "english_audio.mp3"
+OUTPUT_AUDIO = settings.output_audio
 
-# Male voice options:
-# "en-US-Neural2-D" - Standard male
-# "en-US-Neural2-J" - Deep male
-# "en-US-Studio-M" - Studio quality male
-VOICE_NAME = "en-US-Neural2-D"
+UPLOAD_BUCKET = settings.upload_bucket
+UPLOAD_BLOB = settings.upload_blob
 
-# ========================
-# INIT Vertex AI
-# ========================
+# The English voice comes from voices.json ("dub" profile); voice_name
+# tries another, e.g. "en-US-Neural2-J" (deep male) or "en-US-Studio-M"
+VOICE_NAME = settings.voice_name
+TTS_MAX_CHARS = settings.tts_max_chars
 
-vertexai.init(project=PROJECT_ID, location=LOCATION)
+# Heavy imports (moviepy, google.cloud.*) are deferred to the step that
+# needs them so `import demo` stays fast.
 
 
 # ========================
@@ -39,6 +40,8 @@ def extract_audio(video_path, audio_path):
 
     print("Extracting Tamil audio...")
 
+    from moviepy import VideoFileClip
+
     with VideoFileClip(video_path) as video:
 
         video.audio.write_audiofile(
@@ -57,52 +60,21 @@ def extract_audio(video_path, audio_path):
 
 def speech_to_text(audio_file):
     print("Transcribing Tamil audio...")
-    
-    from google.cloud import storage
-    
-    # Upload to GCS for long audio files
-    storage_client = storage.Client()
-    bucket_name = "ilios-speech-audio"
-    blob_name = "temp_tamil_audio.wav"
-    
-    bucket = storage_client.bucket(bucket_name)
-    blob = bucket.blob(blob_name)
-    blob.upload_from_filename(audio_file)
-    
-    gcs_uri = f"gs://{bucket_name}/{blob_name}"
-    print(f"Uploaded to {gcs_uri}")
-    
-    # Use standard speech client
-    speech_client = speech.SpeechClient()
-    
-    audio = speech.RecognitionAudio(uri=gcs_uri)
-    
-    config = speech.RecognitionConfig(
-        encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
-        language_code="ta-IN",
-        enable_automatic_punctuation=True,
-        model="latest_long",
-        use_enhanced=True,
-        audio_channel_count=1,
-        enable_word_time_offsets=True,
-        enable_word_confidence=True,
-        max_alternatives=1,
+
+    from recognition import recognize_file
+
+    # Streaming sessions for short/medium audio; GCS + long_running_recognize
+    # for long audio (this will take several minutes)
+    segments = recognize_file(
+        audio_file,
+        "ta-IN",
+        bucket_name=UPLOAD_BUCKET,
+        blob_name=UPLOAD_BLOB
     )
-    
-    print("Processing audio from GCS (this will take several minutes)...")
-    
-    operation = speech_client.long_running_recognize(config=config, audio=audio)
-    
-    print("Waiting for transcription... (be patient, 12-min audio takes time)")
-    response = operation.result(timeout=3600)
-    
-    full_text = ""
-    word_count = 0
-    for result in response.results:
-        transcript = result.alternatives[0].transcript
-        full_text += transcript + " "
-        word_count += len(transcript.split())
-    
+
+    full_text = " ".join(segment.transcript for segment in segments)
+    word_count = len(full_text.split())
+
     print(f"✅ Transcribed {word_count} words ({len(full_text)} characters)")
     return full_text.strip()
 
@@ -113,15 +85,12 @@ def speech_to_text(audio_file):
 
 def translate_text(tamil_text):
     print("Translating to English...")
-    
-    translate_client = translate.Client()
-    result = translate_client.translate(
-        tamil_text,
-        source_language="ta",
-        target_language="en"
-    )
-    
-    english_text = html.unescape(result["translatedText"])
+
+    from backends import make_translator
+
+    # One request for a whole transcript breaks the payload limits - split
+    # at sentence boundaries, batched, rejoined in order
+    english_text = make_translator().translate_long(tamil_text, "ta", "en")
     print(f"Translated {len(english_text)} characters")
     return english_text
 
@@ -132,11 +101,14 @@ def translate_text(tamil_text):
 
 def text_to_speech(text, output_audio):
     print("Generating English audio...")
+
+    from google.cloud import texttospeech
+    from media import AudioAppender
     
-    tts_client = texttospeech.TextToSpeechClient()
+    tts_client = clients.tts_client()
     
     # Split into chunks if text is too long
-    max_chars = 4000
+    max_chars = TTS_MAX_CHARS
     chunks = []
     current = ""
     
@@ -154,50 +126,25 @@ def text_to_speech(text, output_audio):
     
     print(f"Processing {len(chunks)} audio chunks...")
     
-    voice = texttospeech.VoiceSelectionParams(
-        language_code="en-US",
-        name=VOICE_NAME
-    )
-    
-    audio_config = texttospeech.AudioConfig(
-        audio_encoding=texttospeech.AudioEncoding.MP3,
-        speaking_rate=0.95,
-        pitch=-2.0
-    )
-    
-    audio_clips = []
-    
-    for i, chunk in enumerate(chunks):
-        print(f"  Chunk {i+1}/{len(chunks)}")
-        
-        synthesis_input = texttospeech.SynthesisInput(text=chunk)
-        response = tts_client.synthesize_speech(
-            input=synthesis_input,
-            voice=voice,
-            audio_config=audio_config
-        )
-        
-        temp_file = f"temp_chunk_{i}.mp3"
-        with open(temp_file, "wb") as out:
-            out.write(response.audio_content)
-        
-        audio_clips.append(AudioFileClip(temp_file))
-    
-    # Concatenate if multiple chunks
-    if len(audio_clips) > 1:
-        from moviepy import concatenate_audioclips
-        final_audio = concatenate_audioclips(audio_clips)
-        final_audio.write_audiofile(output_audio, codec='libmp3lame')
-        final_audio.close()
-    else:
-        audio_clips[0].write_audiofile(output_audio, codec='libmp3lame')
-        audio_clips[0].close()
-    
-    # Cleanup
-    for i in range(len(chunks)):
-        temp_file = f"temp_chunk_{i}.mp3"
-        if os.path.exists(temp_file):
-            os.remove(temp_file)
+    voice, audio_config = voice_registry.google_params("en", "ta", "dub", name=VOICE_NAME)
+    
+    # Each chunk is appended to the output as it arrives - no temp files
+    with AudioAppender(output_audio) as audio:
+        for i, chunk in enumerate(chunks):
+            print(f"  Chunk {i+1}/{len(chunks)}")
+            
+            synthesis_input = texttospeech.SynthesisInput(text=chunk)
+            response = quotas.call(
+                "tts",
+                lambda: tts_client.synthesize_speech(
+                    input=synthesis_input,
+                    voice=voice,
+                    audio_config=audio_config
+                ),
+                chars=len(chunk)
+            )
+            
+            audio.write(response.audio_content)
     
     print(f"English audio saved: {output_audio}")
 
@@ -206,10 +153,30 @@ def text_to_speech(text, output_audio):
 # STEP 5: Merge audio with video
 # ========================
 
-def merge_audio_video(input_video, new_audio, output_video):
+def merge_audio_video(input_video, new_audio, output_video, keep_original=False, reencode=False):
+    """
+    Swap in the English audio track. The video stream is copied as-is
+    (no re-encode); only the new audio is encoded. keep_original=True adds
+    the Tamil track as a second, non-default audio stream.
+    reencode=True is the old moviepy libx264 path.
+    """
 
     print("Merging English audio with video...")
 
+    if reencode:
+        return reencode_audio_video(input_video, new_audio, output_video)
+
+    from media import mux_audio_tracks
+
+    mux_audio_tracks(input_video, [(new_audio, "en")], output_video, keep_original=keep_original)
+
+    print("Final video saved:", output_video)
+
+
+def reencode_audio_video(input_video, new_audio, output_video):
+
+    from moviepy import VideoFileClip, AudioFileClip
+
     video = VideoFileClip(input_video)
     audio = AudioFileClip(new_audio)
 
@@ -233,6 +200,11 @@ def merge_audio_video(input_video, new_audio, output_video):
 # ========================
 
 def process():
+
+    from moviepy import AudioFileClip
+
+    # Live translators in the same project go first
+    quotas.default_priority = BATCH
     
     # Extract audio from video
     extract_audio(INPUT_VIDEO, TEMP_AUDIO)
@@ -0,0 +1,185 @@
+"""
+Transcript Emission
+Recognizers produce interim transcripts many times a second per stream.
+Instead of one Socket.IO message per result, each session keeps only
+its latest interim per direction; one scheduler thread flushes every
+session TRANSCRIPT_FPS times a second, sending the interim as a delta
+against what the client already shows and batching finals into the
+same message:
+
+    {"finals":  [{"direction": "fr-en", "text": "Bonjour à tous."}],
+     "interim": [{"direction": "fr-en", "keep": 12, "append": "merci"}]}
+
+Counters compare what per-result emission would have sent ("before")
+with what was sent ("after"). TRANSCRIPT_FPS=0 sends every result as it
+arrives (same message format).
+"""
+
+import json
+import os
+import threading
+import time
+
+from config import settings
+from tracing import tracer
+
+TRANSCRIPT_FPS = settings.transcript_fps
+
+
+def payload_bytes(payload):
+    return len(json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+
+
+def delta(sent, text):
+    """(characters of `sent` to keep, text to append) to turn `sent` into `text`"""
+    keep = len(os.path.commonprefix([sent, text]))
+    return keep, text[keep:]
+
+
+# ==============================
+# METRICS
+# ==============================
+class EmissionStats:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+        self.counts = {"before": [0, 0], "after": [0, 0]}   # mode -> [messages, bytes]
+
+    def add(self, mode, payload):
+        size = payload_bytes(payload)
+        with self._lock:
+            self.counts[mode][0] += 1
+            self.counts[mode][1] += size
+
+    def snapshot(self):
+        """{mode: {messages, bytes, messages_per_second, bytes_per_second}}"""
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        with self._lock:
+            return {
+                mode: {
+                    "messages": messages,
+                    "bytes": size,
+                    "messages_per_second": messages / elapsed,
+                    "bytes_per_second": size / elapsed,
+                }
+                for mode, (messages, size) in self.counts.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self.started = time.monotonic()
+            self.counts = {"before": [0, 0], "after": [0, 0]}
+
+    def prometheus_text(self, metric="translator_transcript_emit"):
+        lines = [
+            f"# HELP {metric}_messages_total Transcript messages: per-result (before) vs coalesced (after)",
+            f"# TYPE {metric}_messages_total counter",
+        ]
+        snapshot = self.snapshot()
+        for mode, stats in snapshot.items():
+            lines.append(f'{metric}_messages_total{{mode="{mode}"}} {stats["messages"]}')
+        lines += [
+            f"# HELP {metric}_bytes_total Transcript payload bytes: per-result (before) vs coalesced (after)",
+            f"# TYPE {metric}_bytes_total counter",
+        ]
+        for mode, stats in snapshot.items():
+            lines.append(f'{metric}_bytes_total{{mode="{mode}"}} {stats["bytes"]}')
+        return "\n".join(lines) + "\n"
+
+
+stats = EmissionStats()
+
+
+# ==============================
+# EMITTERS
+# ==============================
+class TranscriptEmitter:
+    """One session's pending transcripts; send(event, payload) delivers a batch"""
+
+    def __init__(self, send, scheduler=None):
+        self.send = send
+        self.scheduler = scheduler or emission_scheduler
+        self._lock = threading.Lock()
+        self._interim = {}   # direction -> (latest text, received_at)
+        self._sent = {}      # direction -> interim text the client shows
+        self._finals = []
+        self.scheduler.register(self)
+
+    def interim(self, direction, text):
+        stats.add("before", {'text': text, 'is_final': False, 'direction': direction})
+        with self._lock:
+            self._interim[direction] = (text, time.monotonic())
+        if self.scheduler.fps <= 0:
+            self.flush()
+
+    def final(self, direction, text):
+        stats.add("before", {'text': text, 'is_final': True, 'direction': direction})
+        with self._lock:
+            # The client replaces its interim line with the final
+            self._finals.append({'direction': direction, 'text': text})
+            self._interim.pop(direction, None)
+            self._sent[direction] = ""
+        if self.scheduler.fps <= 0:
+            self.flush()
+
+    def flush(self):
+        now = time.monotonic()
+        with self._lock:
+            updates = []
+            for direction, (text, received_at) in self._interim.items():
+                keep, append = delta(self._sent.get(direction, ""), text)
+                updates.append({'direction': direction, 'keep': keep, 'append': append})
+                self._sent[direction] = text
+                tracer.record("interim_delay", now - received_at)
+            self._interim.clear()
+            finals, self._finals = self._finals, []
+
+        if not updates and not finals:
+            return
+        payload = {'finals': finals, 'interim': updates}
+        self.send('transcripts', payload)
+        stats.add("after", payload)
+
+    def close(self):
+        self.scheduler.unregister(self)
+        self.flush()
+
+
+class EmissionScheduler:
+    """One thread flushes every registered emitter `fps` times a second"""
+
+    def __init__(self, fps=TRANSCRIPT_FPS):
+        self.fps = fps
+        self._emitters = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def register(self, emitter):
+        with self._lock:
+            self._emitters.add(emitter)
+            if self.fps > 0 and self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def unregister(self, emitter):
+        with self._lock:
+            self._emitters.discard(emitter)
+
+    def _run(self):
+        next_tick = time.monotonic()
+        while True:
+            with self._lock:
+                emitters = list(self._emitters)
+            for emitter in emitters:
+                try:
+                    emitter.flush()
+                except Exception as e:
+                    print(f"⚠️  Transcript emit failed: {e}")
+
+            # Fixed cadence; skip ticks rather than bursting after a stall
+            next_tick = max(next_tick + 1 / self.fps, time.monotonic())
+            time.sleep(next_tick - time.monotonic())
+
+
+emission_scheduler = EmissionScheduler()
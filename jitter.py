@@ -0,0 +1,123 @@
+"""
+Jitter Buffer
+Audio frames sent by a browser arrive over the network out of order, in
+bursts, or not at all. The buffer reorders them by sequence number, holds
+a small delay (target_ms) to absorb arrival jitter, conceals lost frames
+with silence and drops frames that arrive after their slot was played.
+
+Each frame carries its capture time (server clock, seconds since epoch),
+so uplink latency is recorded per frame as the "uplink" stage.
+"""
+
+import struct
+import threading
+import time
+
+from tracing import tracer
+
+# Frame header: uint32 sequence number, float64 capture time in ms (server clock)
+FRAME_HEADER = struct.Struct("<Id")
+
+
+def parse_frame(packet):
+    """Binary Socket.IO payload -> (seq, captured_at seconds, int16 PCM bytes)"""
+    seq, captured_ms = FRAME_HEADER.unpack_from(packet)
+    return seq, captured_ms / 1000.0, bytes(packet[FRAME_HEADER.size:])
+
+
+class JitterBuffer:
+
+    def __init__(self, target_ms=60, max_frames=500):
+        self.target = target_ms / 1000.0
+        self.max_frames = max_frames
+        self.frames = {}          # seq -> (received_at monotonic, pcm bytes)
+        self.next_seq = None
+        self.frame_bytes = 0
+        self.jitter = 0.0         # RFC 3550 interarrival jitter estimate, seconds
+        self.stats = {"received": 0, "late": 0, "lost": 0, "overflow": 0}
+        self._last = None
+        self._cond = threading.Condition()
+
+    def push(self, seq, captured_at, pcm):
+        """Called from the Socket.IO handler for every frame"""
+        arrived = time.time()
+        tracer.record("uplink", max(0.0, arrived - captured_at))
+
+        with self._cond:
+            if self._last is not None:
+                transit = (arrived - self._last[0]) - (captured_at - self._last[1])
+                self.jitter += (abs(transit) - self.jitter) / 16
+            self._last = (arrived, captured_at)
+
+            if self.next_seq is not None and seq < self.next_seq:
+                self.stats["late"] += 1
+                return
+            if len(self.frames) >= self.max_frames:
+                self.stats["overflow"] += 1
+                return
+
+            self.stats["received"] += 1
+            self.frame_bytes = self.frame_bytes or len(pcm)
+            self.frames[seq] = (time.monotonic(), pcm)
+            self._cond.notify()
+
+    def pop(self, stop, timeout=0.5):
+        """
+        Next frame in sequence order -> (received_at, pcm), silence for a
+        lost frame, or None if nothing arrived within `timeout`.
+        """
+        deadline = time.monotonic() + timeout
+
+        with self._cond:
+            while not stop.is_set():
+                now = time.monotonic()
+
+                if self.frames:
+                    oldest = min(self.frames)
+                    if self.next_seq is None:
+                        # Prefill: let target_ms of audio gather before playing out
+                        if now - self.frames[oldest][0] >= self.target:
+                            self.next_seq = oldest
+                            continue
+                    elif self.next_seq in self.frames:
+                        self.next_seq += 1
+                        return self.frames.pop(self.next_seq - 1)
+                    elif now - self.frames[oldest][0] >= self.target:
+                        # A later frame has waited long enough - give up on this one
+                        self.stats["lost"] += 1
+                        self.next_seq += 1
+                        return now, bytes(self.frame_bytes)
+
+                remaining = deadline - now
+                if remaining <= 0:
+                    return None
+                self._cond.wait(min(remaining, self.target / 2 or 0.01))
+
+        return None
+
+    def chunks(self, chunk_bytes, stop):
+        """Yield (received_at of the first frame, pcm) blocks of ~chunk_bytes"""
+        block = []
+        size = 0
+        first = None
+
+        while not stop.is_set():
+            frame = self.pop(stop)
+            if frame is None:
+                continue
+            received_at, pcm = frame
+            first = first or received_at
+            block.append(pcm)
+            size += len(pcm)
+
+            if size >= chunk_bytes:
+                yield first, b"".join(block)
+                block = []
+                size = 0
+                first = None
+
+    def reset(self):
+        with self._cond:
+            self.frames.clear()
+            self.next_seq = None
+            self._last = None
@@ -0,0 +1,128 @@
+"""
+Media Helpers
+ffmpeg lookup, audio-track muxing and appending synthesized audio to one
+file. The video stream is always copied, never re-encoded; only the new
+audio tracks are encoded (AAC).
+"""
+
+import re
+import shutil
+import subprocess
+
+# ISO 639-1 (Translate / TTS) -> ISO 639-2 (container language tags)
+LANGUAGE_TAGS = {
+    "en": "eng",
+    "fr": "fra",
+    "hi": "hin",
+    "ta": "tam",
+    "es": "spa",
+    "de": "deu",
+}
+
+
+def ffmpeg_exe():
+    try:
+        from imageio_ffmpeg import get_ffmpeg_exe   # ships with moviepy
+        return get_ffmpeg_exe()
+    except ImportError:
+        return shutil.which("ffmpeg") or "ffmpeg"
+
+
+def media_duration(path):
+    """Seconds of a media file, from the container header ffmpeg reports (None if it has none)"""
+    result = subprocess.run([ffmpeg_exe(), "-hide_banner", "-i", path], capture_output=True, text=True)
+    match = re.search(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)", result.stderr)
+    if not match:
+        return None
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def strip_id3(data):
+    """MP3 bytes without a leading ID3v2 tag, so files can be appended into one stream"""
+    if data[:3] != b"ID3" or len(data) < 10:
+        return data
+    size = 0
+    for byte in data[6:10]:   # syncsafe: 7 bits per byte
+        size = (size << 7) | (byte & 0x7F)
+    footer = 10 if data[5] & 0x10 else 0
+    return data[10 + size + footer:]
+
+
+class AudioAppender:
+    """
+    One output file built from encoded chunks (Text-to-Speech MP3) as they
+    arrive: each write() goes straight into an ffmpeg encoder, so nothing
+    is kept in memory or left open per chunk.
+    """
+
+    def __init__(self, path, input_format="mp3", codec="libmp3lame"):
+        self.path = path
+        self.input_format = input_format
+        self.process = subprocess.Popen(
+            [ffmpeg_exe(), "-v", "error", "-y", "-f", input_format, "-i", "-", "-c:a", codec, path],
+            stdin=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+
+    def write(self, data):
+        if self.input_format == "mp3":
+            data = strip_id3(data)
+        self.process.stdin.write(data)
+
+    def close(self):
+        self.process.stdin.close()
+        if self.process.wait():
+            raise Exception(f"❌ Writing {self.path} failed: {self.process.stderr.read().decode().strip()}")
+
+    def abort(self):
+        self.process.kill()
+        self.process.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type:
+            self.abort()
+        else:
+            self.close()
+
+
+def mux_audio_tracks(input_video, tracks, output_video, keep_original=False, original_language="ta"):
+    """
+    tracks: [(audio_file, language)] - the first one is the default track.
+    keep_original=True appends the source audio as a non-default track.
+    The output ends with the video, like moviepy's with_audio() did: a
+    dubbed track that runs longer is cut there.
+    """
+    command = [ffmpeg_exe(), "-v", "error", "-y", "-i", input_video]
+    for audio_file, _ in tracks:
+        command += ["-i", audio_file]
+
+    command += ["-map", "0:v:0"]
+    for i in range(len(tracks)):
+        command += ["-map", f"{i + 1}:a:0"]
+    if keep_original:
+        command += ["-map", "0:a:0?"]
+
+    command += ["-c:v", "copy"]
+    languages = [language for _, language in tracks] + ([original_language] if keep_original else [])
+    for i, language in enumerate(languages):
+        original = keep_original and i == len(tracks)
+        command += [
+            f"-c:a:{i}", "copy" if original else "aac",
+            f"-metadata:s:a:{i}", f"language={LANGUAGE_TAGS.get(language, language)}",
+            f"-disposition:a:{i}", "default" if i == 0 else "0",
+        ]
+        if not original:
+            command += [f"-b:a:{i}", "128k"]
+
+    duration = media_duration(input_video)
+    if duration:
+        command += ["-t", f"{duration:.3f}"]
+
+    command += ["-movflags", "+faststart", output_video]
+
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode:
+        raise Exception(f"❌ Merge failed: {result.stderr.strip()}")
@@ -3,14 +3,37 @@ import numpy as np
 import queue
 import threading
 import time
-import torch
 
-from faster_whisper import WhisperModel
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
-from TTS.api import TTS
+import config
+
+if __name__ == "__main__":
+    # --whisper-profile / --auto-detect / --config ... before the modules below read their settings
+    config.parse_args("Live translator on local models")
+
+from backends import make_backends
+from resample import CaptureConverter, input_format, play
+from segmenter import EnergyVAD, TranscriptLog, UtteranceSegmenter, quietest_cut, split_sentences, unsent_text
+from tracing import tracer
+
+settings = config.settings
 
 RATE = 16000
-CHUNK = int(RATE / 10)
+
+# Segmentation - a translation job is emitted on each sentence end or pause
+VAD_THRESHOLD = settings.vad_threshold                   # RMS level treated as speech
+PAUSE_SECONDS = settings.pause_seconds                   # silence that ends an utterance
+TRANSCRIBE_INTERVAL_SECONDS = settings.transcribe_interval_seconds   # re-read the speech so far this often
+MAX_UTTERANCE_SECONDS = settings.max_utterance_seconds   # cut long monologues at their quietest moment
+
+# Latency profile: realtime / balanced / accurate (see profiles.py)
+WHISPER_PROFILE = settings.whisper_profile
+
+# auto_detect: Whisper's language ID picks French or English per
+# utterance and each is translated into the other
+AUTO_DETECT = settings.auto_detect
+SOURCE_LANG, TARGET_LANG = "fr", "en"
+DETECT_LANGUAGES = {"fr": "en", "en": "fr"}
+LANGUAGE_NAMES = {"fr": "French", "en": "English"}
 
 audio_queue = queue.Queue()
 
@@ -18,16 +41,9 @@ audio_queue = queue.Queue()
 # LOAD MODELS (LOCAL)
 # ==============================
 
-# Whisper STT
-whisper_model = WhisperModel("large-v2", compute_type="int8")
-
-# NLLB Translator
-translator_name = "facebook/nllb-200-distilled-600M"
-tokenizer = AutoTokenizer.from_pretrained(translator_name)
-translation_model = AutoModelForSeq2SeqLM.from_pretrained(translator_name)
-
-# Coqui TTS
-tts = TTS(model_name="tts_models/en/ljspeech/tacotron2-DDC", progress_bar=False)
+# Whisper STT + NLLB translator + Coqui TTS by default; any stage can be
+# swapped for a cloud backend via STT_BACKEND / MT_BACKEND / TTS_BACKEND
+backends = make_backends(default="local")
 
 
 # ==============================
@@ -42,84 +58,164 @@ def audio_callback(indata, frames, time_info, status):
 # TTS + PLAY AUDIO
 # ==============================
 
-def speak_text(text):
-    wav = tts.tts(text)
-    sd.play(np.array(wav), samplerate=22050)
-    sd.wait()
+def speak_text(text, lang_code=TARGET_LANG, source=SOURCE_LANG):
+    with tracer.span("synthesize"):
+        wav, rate = backends.tts.synthesize(text, lang_code, source)
+
+    with tracer.span("playback"):
+        play(wav, rate)
 
 
 # ==============================
 # TRANSLATE FUNCTION
 # ==============================
 
-def translate_text(text):
-    inputs = tokenizer(text, return_tensors="pt")
-    translated_tokens = translation_model.generate(**inputs)
-    return tokenizer.decode(translated_tokens[0], skip_special_tokens=True)
+def translate_text(text, source=SOURCE_LANG, target=TARGET_LANG):
+    return backends.mt.translate(text, source, target)
 
 
 # ==============================
 # STREAMING PIPELINE
 # ==============================
 
-def run_streaming():
+def run_streaming(stop=None):
+    """Translate the microphone until `stop` is set (never, by default), then finish the queued jobs"""
 
     print("🎤 Live translator started (FREE open-source version)...")
+    print(f"⚙️  Whisper profile: {WHISPER_PROFILE}")
+    if AUTO_DETECT:
+        print(f"🌐 Auto-detecting {' / '.join(LANGUAGE_NAMES[l] for l in DETECT_LANGUAGES)}")
 
-    transcript_buffer = {"text": ""}
-    lock = threading.Lock()
+    transcript_log = TranscriptLog()
+    job_queue = queue.Queue()
 
-    # 🔥 Timer thread (10 sec window)
-    def window_processor():
+    # 🔥 Translation worker - runs one job per finished sentence / pause
+    def translation_worker():
         while True:
-            time.sleep(10)
+            job = job_queue.get()
+            if job is None:
+                return
+            utterance_id, text, source, captured_at = job
+            target = DETECT_LANGUAGES[source] if AUTO_DETECT else TARGET_LANG
 
-            with lock:
-                text = transcript_buffer["text"]
-                transcript_buffer["text"] = ""
+            try:
+                with tracer.bind(utterance_id):
+                    print(f"📝 {LANGUAGE_NAMES[source]}:", text)
 
-            if text.strip():
-                print("⏱ 10-sec window triggered")
-                print("📝 French:", text)
+                    with tracer.span("translate"):
+                        translated_text = translate_text(text, source, target)
+                    print(f"🌍 {LANGUAGE_NAMES[target]}:", translated_text)
+
+                    speak_text(translated_text, target, source)
+                    tracer.record("end_to_end", time.monotonic() - captured_at)
+            except Exception as e:
+                print(f"❌ Translation error: {e}")
+            finally:
+                job_queue.task_done()
 
-                english_text = translate_text(text)
-                print("🌍 English:", english_text)
+    threading.Thread(target=translation_worker, daemon=True).start()
 
-                speak_text(english_text)
+    # Segments inherit the time their audio finished being captured, and its language
+    capture = {"ended_at": None, "language": SOURCE_LANG}
 
-    threading.Thread(target=window_processor, daemon=True).start()
+    def enqueue(text):
+        job_queue.put((tracer.new_utterance(), text, capture["language"], capture["ended_at"]))
+
+    segmenter = UtteranceSegmenter(enqueue, log=transcript_log)
+    vad = EnergyVAD(RATE, threshold=VAD_THRESHOLD, pause_seconds=PAUSE_SECONDS)
+
+    # Capture at the device's own rate and channels, converted to RATE mono below
+    rate, channels = input_format()
+    converter = CaptureConverter(rate, channels, RATE)
 
     with sd.InputStream(
-        samplerate=RATE,
-        blocksize=CHUNK,
+        samplerate=rate,
+        blocksize=rate * settings.chunk_ms // 1000,
         dtype="float32",
-        channels=1,
+        channels=channels,
         callback=audio_callback,
     ):
 
-        audio_buffer = np.zeros((0,), dtype=np.float32)
-
-        while True:
-            chunk = audio_queue.get().flatten()
-            audio_buffer = np.concatenate((audio_buffer, chunk))
-
-            # Process every ~3 sec for Whisper
-            if len(audio_buffer) > RATE * 3:
-
-                segments, _ = whisper_model.transcribe(
-                    audio_buffer,
-                    language="fr"
-                )
-
-                text = " ".join([seg.text for seg in segments])
-
-                if text.strip():
-                    with lock:
-                        transcript_buffer["text"] = text
-
-                    print("🟡 LIVE:", text)
-
-                audio_buffer = np.zeros((0,), dtype=np.float32)
+        utterance = []            # speech since the last cut
+        utterance_samples = 0
+        utterance_start = None
+        transcribed_samples = 0   # how much of it the last transcription covered
+        handed_over = ""          # its text already given to the segmenter
+
+        def recognize(audio):
+            with tracer.span("recognize"):
+                if AUTO_DETECT:
+                    text, language = backends.stt.transcribe_detect(audio, list(DETECT_LANGUAGES), RATE)
+                else:
+                    text, language = backends.stt.transcribe(audio, SOURCE_LANG, RATE), SOURCE_LANG
+            if text.strip():
+                print("🟡 LIVE:", text)
+            return text, language
+
+        def hand_over(text, language):
+            if not text.strip():
+                return
+            capture["ended_at"] = time.monotonic()
+            tracer.record("capture", capture["ended_at"] - utterance_start)
+
+            if language != capture["language"]:
+                # Speaker changed language - don't let a sentence span both
+                segmenter.pause()
+                capture["language"] = language
+            segmenter.feed(text)
+
+        while not (stop and stop.is_set()):
+            try:
+                chunk = converter.convert(audio_queue.get(timeout=0.5))
+            except queue.Empty:
+                continue
+            paused = vad.update(chunk)
+
+            # Skip leading silence, keep trailing silence inside the utterance
+            if not vad.heard_speech and not paused and not utterance:
+                continue
+
+            if not utterance:
+                utterance_start = time.monotonic()
+            utterance.append(chunk)
+            utterance_samples += len(chunk)
+
+            if paused:
+                # Speaker stopped - whatever Whisper hears now is finished
+                text, language = recognize(np.concatenate(utterance))
+                hand_over(unsent_text(handed_over, text), language)
+                segmenter.pause()
+                utterance, utterance_samples, transcribed_samples, handed_over = [], 0, 0, ""
+
+            elif utterance_samples >= RATE * MAX_UTTERANCE_SECONDS:
+                # Long monologue - cut at the quietest moment of the second half,
+                # the unfinished sentence stays pending in the segmenter
+                audio = np.concatenate(utterance)
+                cut = quietest_cut(audio, RATE, start=len(audio) // 2)
+                text, language = recognize(audio[:cut])
+                hand_over(unsent_text(handed_over, text), language)
+                utterance = [audio[cut:]]
+                utterance_samples, transcribed_samples, handed_over = len(audio) - cut, 0, ""
+                utterance_start = time.monotonic()
+
+            elif utterance_samples - transcribed_samples >= RATE * TRANSCRIBE_INTERVAL_SECONDS:
+                # Still talking - pass on each sentence Whisper has closed since.
+                # Each decode may re-punctuate the earlier text, so what's new is
+                # found by aligning words with what was handed over, not by counting
+                # sentences. The last one may only look closed because the audio stops there.
+                text, language = recognize(np.concatenate(utterance))
+                transcribed_samples = utterance_samples
+                sentences, tail = split_sentences(unsent_text(handed_over, text))
+                closed = sentences if tail else sentences[:-1]
+                if closed:
+                    hand_over(" ".join(closed), language)
+                    handed_over = f"{handed_over} {' '.join(closed)}".strip()
+                    utterance_start = capture["ended_at"]
+
+    # Stopped: hand over what's pending and wait for it to be spoken
+    segmenter.pause()
+    job_queue.join()
+    job_queue.put(None)
 
 
 if __name__ == "__main__":
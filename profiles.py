@@ -0,0 +1,108 @@
+"""
+Latency Profiles
+Named tuning presets: decoding settings for the local Whisper recognizer
+(opensource.py), and whole-deployment presets for config.py's --profile
+"""
+
+# ==============================
+# WHISPER PRESETS
+# ==============================
+# realtime - greedy decoding, no temperature fallback, aggressive VAD
+# balanced - small beam, short fallback ladder
+# accurate - faster_whisper defaults (full beam + fallback), full precision
+WHISPER_PROFILES = {
+    "realtime": {
+        "compute_type": "int8",
+        "beam_size": 1,
+        "temperature": 0.0,
+        "vad_filter": True,
+        "vad_parameters": {"min_silence_duration_ms": 300},
+        "condition_on_previous_text": False,
+    },
+    "balanced": {
+        "compute_type": "int8",
+        "beam_size": 3,
+        "temperature": (0.0, 0.2, 0.4),
+        "vad_filter": True,
+        "vad_parameters": {"min_silence_duration_ms": 500},
+        "condition_on_previous_text": False,
+    },
+    "accurate": {
+        "compute_type": "float32",
+        "beam_size": 5,
+        "temperature": (0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+        "vad_filter": True,
+        "vad_parameters": {"min_silence_duration_ms": 1000},
+        "condition_on_previous_text": True,
+    },
+}
+
+DEFAULT_WHISPER_PROFILE = "realtime"
+
+
+def get_whisper_profile(name=None):
+    """Look up a preset by name (defaults to realtime)"""
+    name = name or DEFAULT_WHISPER_PROFILE
+    if name not in WHISPER_PROFILES:
+        raise ValueError(
+            f"Unknown Whisper profile '{name}' "
+            f"(choose from: {', '.join(WHISPER_PROFILES)})"
+        )
+    return WHISPER_PROFILES[name]
+
+
+def whisper_transcribe_options(profile):
+    """kwargs for WhisperModel.transcribe() - everything except compute_type"""
+    return {k: v for k, v in profile.items() if k != "compute_type"}
+
+
+# ==============================
+# DEPLOYMENT PRESETS
+# ==============================
+# Settings (config.py) a deployment starts from; a config file, env var
+# or flag still overrides any one of them.
+# live       - meeting translators: first sound soonest, quota held back for live calls
+# throughput - batch dubbing hosts: wide fan-out, shorter shards, no live reserve
+# low-memory - small hosts: long jobs streamed in small windows on few threads
+TUNING_PROFILES = {
+    "live": {
+        "whisper_profile": "realtime",
+        "chunk_ms": 50,
+        "jitter_target_ms": 40,
+        "transcript_fps": 20,
+        "translate_batch_window_ms": 0,
+        "quota_live_reserve": 0.3,
+        "retry_attempts": 3,
+    },
+    "throughput": {
+        "translate_max_workers": 16,
+        "translate_batch_window_ms": 10,
+        "http_pool_size": 64,
+        "stream_workers": 8,
+        "shard_seconds": 5 * 60,
+        "max_shards": 32,
+        "stream_window": 1024,
+        "quota_burst_seconds": 10,
+        "quota_live_reserve": 0.0,
+        "retry_attempts": 8,
+    },
+    "low-memory": {
+        "dub_mode": "stream",
+        "stream_window": 64,
+        "stream_workers": 2,
+        "translate_max_workers": 2,
+        "http_pool_size": 8,
+        "filter_cache_size": 4,
+        "trace_samples": 1000,
+    },
+}
+
+
+def get_tuning_profile(name):
+    """Settings for a deployment preset"""
+    if name not in TUNING_PROFILES:
+        raise ValueError(
+            f"Unknown tuning profile '{name}' "
+            f"(choose from: {', '.join(TUNING_PROFILES)})"
+        )
+    return TUNING_PROFILES[name]
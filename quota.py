@@ -0,0 +1,339 @@
+"""
+API Quota Scheduler
+Every Google Speech / Translate / Text-to-Speech request goes through
+one process-wide scheduler:
+
+    text = quotas.call("translate", lambda: client.translate(...), chars=len(text))
+
+  * token buckets per API for requests/min and characters/min
+    (QUOTA_<API>_RPM, QUOTA_<API>_CPM; 0 = unlimited), holding at most
+    QUOTA_BURST_SECONDS worth of tokens
+  * priority lanes: waiting live requests go ahead of batch ones, and
+    batch may not dip into the last QUOTA_LIVE_RESERVE of a bucket.
+    Scripts doing batch dubbing set `quotas.default_priority = BATCH`;
+    `with quotas.lane(LIVE):` overrides it for one thread
+  * retry with full-jitter exponential backoff on 429 / 5xx / timeouts,
+    within a per-lane time budget (a live utterance is stale after a
+    couple of seconds, a batch job can wait)
+  * a circuit breaker per API: after BREAKER_FAILURES consecutive
+    server failures calls fail fast with CircuitOpenError for
+    BREAKER_COOLDOWN_SECONDS, then one trial call decides
+
+Time spent waiting for tokens is traced as `<api>_<lane>_queue_wait`.
+Every limit is a setting in config.py (defaults in its API_QUOTAS).
+"""
+
+import heapq
+import itertools
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+import clients
+from config import API_QUOTAS, settings
+from tracing import tracer
+
+LIVE, BATCH = 0, 1
+LANES = {LIVE: "live", BATCH: "batch"}
+
+QUOTA_ENABLED = settings.quota_enabled
+BURST_SECONDS = settings.quota_burst_seconds
+LIVE_RESERVE = settings.quota_live_reserve
+
+RETRY_ATTEMPTS = settings.retry_attempts
+RETRY_BASE_SECONDS = settings.retry_base_seconds
+RETRY_MAX_SECONDS = settings.retry_max_seconds
+RETRY_BUDGET_SECONDS = {LIVE: 2.0, BATCH: 120.0}   # total backoff per call
+
+BREAKER_FAILURES = settings.breaker_failures
+BREAKER_COOLDOWN_SECONDS = settings.breaker_cooldown_seconds
+
+
+def configured_quotas():
+    """api -> (rpm, cpm) from the quota_<api>_rpm / quota_<api>_cpm settings"""
+    return {api: (settings[f"quota_{api}_rpm"], settings[f"quota_{api}_cpm"]) for api in API_QUOTAS}
+
+
+class CircuitOpenError(RuntimeError):
+    """The API failed repeatedly; calls are refused until the cooldown ends"""
+
+
+def error_kind(error):
+    """'quota' (429), 'transient' (5xx, timeout, connection) or None (don't retry)"""
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return "transient"
+    try:
+        from google.api_core import exceptions
+    except ImportError:
+        return None
+
+    if isinstance(error, exceptions.TooManyRequests):   # includes ResourceExhausted
+        return "quota"
+    if isinstance(error, (exceptions.ServiceUnavailable, exceptions.DeadlineExceeded,
+                          exceptions.InternalServerError, exceptions.BadGateway,
+                          exceptions.GatewayTimeout)):
+        return "transient"
+    return None
+
+
+def backoff(attempt, base=RETRY_BASE_SECONDS, cap=RETRY_MAX_SECONDS):
+    """Full jitter: uniform in [0, min(cap, base * 2^attempt)]"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+# ==============================
+# BUILDING BLOCKS
+# ==============================
+class TokenBucket:
+    """`per_minute` tokens refilled continuously, at most `burst_seconds` worth held"""
+
+    def __init__(self, per_minute, burst_seconds=BURST_SECONDS):
+        self.rate = per_minute / 60
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def shortfall(self, amount, reserve=0.0, now=None):
+        """Seconds until `amount` can be taken leaving `reserve` of capacity (0 = now)"""
+        self._refill(now or time.monotonic())
+        # A request bigger than the bucket waits for a full bucket, not forever
+        needed = min(amount + reserve * self.capacity, self.capacity)
+        return max(0.0, needed - self.tokens) / self.rate
+
+    def take(self, amount):
+        self.tokens -= min(amount, self.capacity)
+
+    def drain(self):
+        """The server said 429: assume the quota is spent"""
+        self._refill(time.monotonic())
+        self.tokens = min(self.tokens, 0.0)
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `failures` in a row -> half-open trial after
+    `cooldown`. The trial's outcome closes or re-opens it; a trial that
+    never reports back is replaced by another one after `cooldown`.
+    """
+
+    def __init__(self, api, failures=BREAKER_FAILURES, cooldown=BREAKER_COOLDOWN_SECONDS):
+        self.api = api
+        self.failures = failures
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.consecutive = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def check(self):
+        with self._lock:
+            if self.state == "closed":
+                return
+            now = time.monotonic()
+            if self.state != "closed" and now - self.opened_at >= self.cooldown:
+                self.state = "half_open"   # this caller is the trial
+                self.opened_at = now
+                return
+            raise CircuitOpenError(f"{self.api} circuit open after {self.consecutive} failures")
+
+    def success(self):
+        with self._lock:
+            self.state = "closed"
+            self.consecutive = 0
+
+    def failure(self):
+        with self._lock:
+            self.consecutive += 1
+            if self.state == "half_open" or self.consecutive >= self.failures:
+                if self.state != "open":
+                    print(f"🔌 {self.api} circuit open after {self.consecutive} failures "
+                          f"(failing fast for {self.cooldown:.0f}s)")
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+
+class ApiQuota:
+    """One API's buckets and the requests queued for them, served by priority then arrival"""
+
+    def __init__(self, api, rpm, cpm, burst_seconds=BURST_SECONDS, live_reserve=LIVE_RESERVE):
+        self.api = api
+        self.requests = TokenBucket(rpm, burst_seconds) if rpm > 0 else None
+        self.chars = TokenBucket(cpm, burst_seconds) if cpm > 0 else None
+        self.live_reserve = live_reserve
+        self.breaker = CircuitBreaker(api)
+        self.counters = {"calls": 0, "retries": 0, "quota_errors": 0, "transient_errors": 0, "rejected": 0}
+        self._waiting = []   # heap of (priority, ticket)
+        self._tickets = itertools.count()
+        self._cond = threading.Condition()
+
+    def _shortfall(self, chars, priority):
+        reserve = self.live_reserve if priority > LIVE else 0.0
+        now = time.monotonic()
+        waits = [bucket.shortfall(amount, reserve, now)
+                 for bucket, amount in ((self.requests, 1), (self.chars, chars))
+                 if bucket and amount]
+        return max(waits, default=0.0)
+
+    def acquire(self, chars, priority):
+        """Block until it's this request's turn and the buckets cover it"""
+        entry = (priority, next(self._tickets))
+        start = time.monotonic()
+        with self._cond:
+            heapq.heappush(self._waiting, entry)
+            self._cond.notify_all()   # a live request may now be ahead of a sleeping batch one
+            while True:
+                wait = None
+                if self._waiting[0] == entry:
+                    wait = self._shortfall(chars, priority)
+                    if wait == 0:
+                        break
+                self._cond.wait(wait)
+
+            heapq.heappop(self._waiting)
+            if self.requests:
+                self.requests.take(1)
+            if self.chars and chars:
+                self.chars.take(chars)
+            self.counters["calls"] += 1
+            self._cond.notify_all()
+
+        tracer.record(f"{self.api}_{LANES[priority]}_queue_wait", time.monotonic() - start)
+
+    def throttled(self):
+        with self._cond:
+            for bucket in (self.requests, self.chars):
+                if bucket:
+                    bucket.drain()
+            self.counters["quota_errors"] += 1
+
+    def count(self, name):
+        with self._cond:
+            self.counters[name] += 1
+
+    def queued(self):
+        with self._cond:
+            return len(self._waiting)
+
+
+# ==============================
+# SCHEDULER
+# ==============================
+class QuotaScheduler:
+
+    def __init__(self, quotas=None, enabled=QUOTA_ENABLED, burst_seconds=BURST_SECONDS,
+                 live_reserve=LIVE_RESERVE, attempts=RETRY_ATTEMPTS):
+        self.enabled = enabled
+        self.attempts = attempts
+        self.default_priority = LIVE
+        self._local = threading.local()
+        self.configure(quotas, burst_seconds, live_reserve)
+
+    def configure(self, quotas=None, burst_seconds=BURST_SECONDS, live_reserve=LIVE_RESERVE):
+        """Replace every API's buckets (and reset its counters and circuit)"""
+        self._apis = {
+            api: ApiQuota(api, rpm, cpm, burst_seconds, live_reserve)
+            for api, (rpm, cpm) in (quotas or configured_quotas()).items()
+        }
+
+    def quota(self, api):
+        return self._apis[api]
+
+    # ------------------------------
+    # Priority lanes
+    # ------------------------------
+    @contextmanager
+    def lane(self, priority):
+        """Calls made in this thread use `priority`"""
+        previous = getattr(self._local, "priority", None)
+        self._local.priority = priority
+        try:
+            yield priority
+        finally:
+            self._local.priority = previous
+
+    def current_priority(self):
+        priority = getattr(self._local, "priority", None)
+        return self.default_priority if priority is None else priority
+
+    # ------------------------------
+    # Calls
+    # ------------------------------
+    def call(self, api, request, chars=0, priority=None):
+        """Run `request()` once the quota allows it, retrying transient failures"""
+        if not self.enabled:
+            with clients.measure(api):
+                return request()
+
+        quota = self._apis[api]
+        priority = self.current_priority() if priority is None else priority
+        budget = RETRY_BUDGET_SECONDS[priority]
+        slept = 0.0
+
+        for attempt in itertools.count():
+            try:
+                quota.breaker.check()
+            except CircuitOpenError:
+                quota.count("rejected")
+                raise
+            quota.acquire(chars, priority)
+
+            try:
+                with clients.measure(api):
+                    result = request()
+            except Exception as e:
+                kind = error_kind(e)
+                if kind is None:
+                    quota.breaker.success()   # the service answered; the request was wrong
+                    raise
+                if kind == "quota":
+                    quota.throttled()
+                    quota.breaker.success()   # a 429 is an answer, not a server failure
+                else:
+                    quota.count("transient_errors")
+                    quota.breaker.failure()
+
+                delay = backoff(attempt)
+                if attempt + 1 >= self.attempts or slept + delay > budget:
+                    raise
+                quota.count("retries")
+                print(f"⚠️  {api} {type(e).__name__}, retry {attempt + 1} in {delay:.2f}s")
+                time.sleep(delay)
+                slept += delay
+            else:
+                quota.breaker.success()
+                return result
+
+    # ------------------------------
+    # Metrics
+    # ------------------------------
+    def snapshot(self):
+        """{api: counters + queued + circuit state}"""
+        return {
+            api: dict(quota.counters, queued=quota.queued(), circuit=quota.breaker.state)
+            for api, quota in self._apis.items()
+        }
+
+    def prometheus_text(self, metric="translator_api"):
+        snapshot = self.snapshot()
+        lines = []
+        for name, help_text in (("calls", "Requests admitted by the quota scheduler"),
+                                ("retries", "Requests retried after a 429 or server failure"),
+                                ("quota_errors", "429 / RESOURCE_EXHAUSTED responses"),
+                                ("transient_errors", "5xx, timeout and connection failures"),
+                                ("rejected", "Calls refused by an open circuit")):
+            lines += [f"# HELP {metric}_{name}_total {help_text}", f"# TYPE {metric}_{name}_total counter"]
+            lines += [f'{metric}_{name}_total{{api="{api}"}} {stats[name]}' for api, stats in snapshot.items()]
+        lines += [f"# HELP {metric}_queued Requests waiting for quota", f"# TYPE {metric}_queued gauge"]
+        lines += [f'{metric}_queued{{api="{api}"}} {stats["queued"]}' for api, stats in snapshot.items()]
+        lines += [f"# HELP {metric}_circuit_open 1 while the API's circuit is open", f"# TYPE {metric}_circuit_open gauge"]
+        lines += [f'{metric}_circuit_open{{api="{api}"}} {int(stats["circuit"] == "open")}'
+                  for api, stats in snapshot.items()]
+        return "\n".join(lines) + "\n"
+
+
+quotas = QuotaScheduler()
@@ -0,0 +1,493 @@
+"""
+Batch Speech Recognition
+Turns an extracted mono 16-bit WAV into timestamped segments with one of
+three engines:
+
+  streaming     the file is cut at silence into slices of a few minutes,
+                each fed to its own streaming_recognize session in parallel
+                (read from the WAV a request at a time, no upload)
+  long_running  upload to GCS + one long_running_recognize operation
+  sharded       the file is cut at silence into N shards, uploaded and
+                submitted concurrently as separate operations, polled
+                together and stitched back on the file's timeline
+
+choose_engine() picks by duration; the stt_engine setting forces one.
+iter_file_segments() yields segments in timeline order as slices / shards
+finish, for callers that write them out instead of holding the list.
+Uploaded audio is FLAC by default (lossless, ~2x smaller than WAV);
+upload_encoding=LINEAR16|FLAC|OGG_OPUS selects the format and the matching
+RecognitionConfig.encoding. Workers, slice / shard sizes and the engine
+are settings (config.py).
+"""
+
+import hashlib
+import math
+import os
+import shutil
+import struct
+import subprocess
+import tempfile
+import time
+import wave
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import clients
+from config import settings
+from media import ffmpeg_exe
+from quota import quotas
+from tracing import tracer
+
+Word = namedtuple("Word", ["word", "start", "end", "confidence"])
+Segment = namedtuple("Segment", ["start", "end", "transcript", "confidence", "words"])
+
+ENGINES = ("auto", "streaming", "long_running", "sharded")
+STREAMING_MAX_SECONDS = 15 * 60   # longer files go to long_running_recognize
+SHARDED_MIN_SECONDS = 30 * 60     # ... and longer still are sharded
+SHARD_SECONDS = settings.shard_seconds   # target shard length when no count is given
+MAX_SHARDS = settings.max_shards
+POLL_SECONDS = 2.0
+
+# encoding -> (file extension, ffmpeg codec arguments)
+UPLOAD_FORMATS = {
+    "LINEAR16": (".wav", None),
+    "FLAC": (".flac", ["-c:a", "flac", "-compression_level", "5"]),
+    "OGG_OPUS": (".ogg", ["-c:a", "libopus", "-b:a", "32k", "-application", "voip", "-compression_level", "5"]),
+}
+OPUS_RATES = (8000, 12000, 16000, 24000, 48000)
+STREAM_SLICE_SECONDS = settings.stream_slice_seconds   # a streaming session accepts ~5 min of audio
+STREAM_CHUNK_SECONDS = settings.stream_chunk_seconds   # 0.5 s = 16 kB requests at 16 kHz (API limit 25 kB)
+STREAM_WORKERS = settings.stream_workers
+STREAM_PACE = settings.stream_pace   # Speech rejects a stream sent much faster than real time
+SEARCH_SECONDS = 5                # how far a cut may move to land in silence
+
+
+# ==============================
+# AUDIO
+# ==============================
+class PcmFile:
+    """
+    The int16 samples of a WAV, read on demand: samples[a:b] reads just
+    that range into an array. Unlike np.memmap, what was read doesn't stay
+    resident, so an hour of audio doesn't add ~115 MB to the process.
+    Each read opens the file for itself, so no handle outlives it however
+    many PcmFiles / sections a job creates, and threads never share one.
+    """
+
+    def __init__(self, path, offset, count):
+        self.path = path
+        self.offset = offset   # byte offset of sample 0
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        start, stop, step = index.indices(self.count)
+        if step != 1:
+            raise ValueError("PcmFile only supports contiguous slices")
+        with open(self.path, "rb") as f:
+            f.seek(self.offset + 2 * start)
+            data = f.read(2 * max(0, stop - start))
+        return np.frombuffer(data, dtype=np.int16)
+
+    def section(self, start, stop):
+        """Samples [start, stop) as their own PcmFile, still unread"""
+        start, stop, _ = slice(start, stop).indices(self.count)
+        return PcmFile(self.path, self.offset + 2 * start, max(0, stop - start))
+
+
+def open_pcm(path):
+    """Open the samples of a mono 16-bit WAV for chunked reads -> (PcmFile, rate)"""
+    with open(path, "rb") as f:
+        header = f.read(12)
+        if header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+            raise ValueError(f"{path} is not a WAV file")
+
+        rate = None
+        while True:
+            chunk = f.read(8)
+            if len(chunk) < 8:
+                raise ValueError(f"No audio data in {path}")
+            name, size = chunk[:4], struct.unpack("<I", chunk[4:])[0]
+
+            if name == b"fmt ":
+                fmt = f.read(size + (size & 1))
+                _, channels, rate, _, _, bits = struct.unpack("<HHIIHH", fmt[:16])
+                if channels != 1 or bits != 16:
+                    raise ValueError(f"{path} must be mono 16-bit PCM ({channels} ch, {bits} bit)")
+            elif name == b"data":
+                offset, data_size = f.tell(), size
+                break
+            else:
+                f.seek(size + (size & 1), 1)
+
+    # Anything after the data chunk (LIST, id3 ...) isn't audio. Streamed
+    # WAVs may carry a placeholder size - then the data runs to the end.
+    available = os.path.getsize(path) - offset
+    if data_size in (0, 0xFFFFFFFF):
+        data_size = available
+    count = min(data_size, available) // 2
+    return PcmFile(path, offset, count), rate
+
+
+def file_digest(path, block_size=1 << 20):
+    """SHA-1 of a file, read a block at a time - identifies extracted audio across runs"""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cut_at_silence(samples, rate, pieces, search_seconds=SEARCH_SECONDS, frame_seconds=0.05):
+    """
+    Boundaries [0, ..., len(samples)] splitting the audio into `pieces`
+    parts of similar length, each cut moved to the quietest frame within
+    search_seconds of its even-split position. Only the search windows
+    are read.
+    """
+    total = len(samples)
+    frame = int(rate * frame_seconds)
+    search = int(rate * search_seconds)
+    bounds = [0]
+
+    for i in range(1, pieces):
+        target = total * i // pieces
+        lo = max(bounds[-1] + frame, target - search)
+        hi = min(total - frame, target + search)
+        if hi - lo < frame:
+            continue
+
+        count = (hi - lo) // frame
+        window = np.asarray(samples[lo:lo + count * frame], dtype=np.float32).reshape(count, frame)
+        quietest = int(np.argmin(np.mean(window ** 2, axis=1)))
+        bounds.append(lo + quietest * frame + frame // 2)
+
+    bounds.append(total)
+    return bounds
+
+
+def write_wav(path, samples, rate, chunk_seconds=30):
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        step = int(rate * chunk_seconds)
+        for i in range(0, len(samples), step):
+            wf.writeframes(np.asarray(samples[i:i + step]).tobytes())
+
+
+def upload_encoding(encoding=None):
+    encoding = (encoding or settings.upload_encoding).upper()
+    if encoding not in UPLOAD_FORMATS:
+        raise ValueError(f"Unknown upload encoding '{encoding}' (choose from: {', '.join(UPLOAD_FORMATS)})")
+    return encoding
+
+
+def write_audio(path, samples, rate, encoding, chunk_seconds=30):
+    """
+    Write int16 samples (an array or a PcmFile) as `encoding`, a chunk at
+    a time, so a PcmFile is never fully loaded.
+    """
+    _, codec = UPLOAD_FORMATS[encoding]
+    if codec is None:
+        write_wav(path, samples, rate, chunk_seconds)
+        return
+    if encoding == "OGG_OPUS" and rate not in OPUS_RATES:
+        raise ValueError(f"OGG_OPUS needs one of {OPUS_RATES} Hz (got {rate})")
+
+    process = subprocess.Popen(
+        [ffmpeg_exe(), "-v", "error", "-y", "-f", "s16le", "-ar", str(rate), "-ac", "1", "-i", "-",
+         *codec, path],
+        stdin=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    step = int(rate * chunk_seconds)
+    for i in range(0, len(samples), step):
+        process.stdin.write(np.asarray(samples[i:i + step]).tobytes())
+    process.stdin.close()
+
+    if process.wait():
+        raise RuntimeError(f"❌ {encoding} encoding failed: {process.stderr.read().decode().strip()}")
+
+
+def upload_to_gcs(bucket_name, source_file, destination_blob):
+
+    bucket = clients.storage_client().bucket(bucket_name)
+    bucket.blob(destination_blob).upload_from_filename(source_file)
+
+    print(f"Uploaded to gs://{bucket_name}/{destination_blob}")
+    return f"gs://{bucket_name}/{destination_blob}"
+
+
+# ==============================
+# CONFIG / RESULTS
+# ==============================
+def recognition_config(language_code, rate, **overrides):
+    from google.cloud import speech
+
+    options = dict(
+        encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
+        sample_rate_hertz=rate,
+        language_code=language_code,
+        enable_automatic_punctuation=True,
+        model="latest_long",
+        use_enhanced=True,
+        audio_channel_count=1,
+        enable_word_time_offsets=True,
+        enable_word_confidence=True,
+        max_alternatives=1,
+    )
+    options.update(overrides)
+    return speech.RecognitionConfig(**options)
+
+
+def _seconds(duration):
+    return duration.total_seconds() if duration is not None else 0.0
+
+
+def to_segments(results, offset=0.0):
+    """API results -> Segments on the file's timeline (shifted by `offset` seconds)"""
+    segments = []
+    previous_end = offset
+
+    for result in results:
+        if not result.alternatives:
+            continue
+        best = result.alternatives[0]
+        words = [
+            Word(w.word, offset + _seconds(w.start_time), offset + _seconds(w.end_time),
+                 getattr(w, "confidence", 0.0))
+            for w in getattr(best, "words", [])
+        ]
+        result_end = getattr(result, "result_end_time", None)
+        start = words[0].start if words else previous_end
+        end = offset + _seconds(result_end) if result_end else (words[-1].end if words else start)
+        end = max(end, start)
+
+        segments.append(Segment(start, end, best.transcript.strip(),
+                                getattr(best, "confidence", 0.0), words))
+        previous_end = end
+
+    return segments
+
+
+# ==============================
+# ENGINES
+# ==============================
+def choose_engine(duration_seconds, engine=None):
+    engine = engine or settings.stt_engine
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown STT engine '{engine}' (choose from: {', '.join(ENGINES)})")
+    if engine == "auto":
+        if duration_seconds <= STREAMING_MAX_SECONDS:
+            return "streaming"
+        return "long_running" if duration_seconds < SHARDED_MIN_SECONDS else "sharded"
+    return engine
+
+
+def ordered_map(pool, fn, *iterables, ahead):
+    """pool.map() that keeps at most `ahead` calls in flight: results are yielded in order as they're needed"""
+    pending = deque()
+    for args in zip(*iterables):
+        if len(pending) >= ahead:
+            yield pending.popleft().result()
+        pending.append(pool.submit(fn, *args))
+    while pending:
+        yield pending.popleft().result()
+
+
+def recognize_streaming(audio_file, language_code, **kwargs):
+    """Parallel streaming sessions over silence-cut slices, merged by timestamp"""
+    return list(iter_streaming(audio_file, language_code, **kwargs))
+
+
+def iter_streaming(audio_file, language_code, client=None,
+                   slice_seconds=STREAM_SLICE_SECONDS, max_workers=STREAM_WORKERS, pace=None, **config):
+    """
+    recognize_streaming() a slice at a time: only `max_workers` slices'
+    results are held. Each session sends its audio at `pace` x real time
+    (STREAM_PACE), so the speed-up comes from the parallel slices alone.
+    """
+    from google.cloud import speech
+
+    client = client or clients.speech_client()
+    samples, rate = open_pcm(audio_file)
+
+    # Leave room for each cut to move by up to SEARCH_SECONDS either way
+    usable = max(1, slice_seconds - 2 * SEARCH_SECONDS)
+    pieces = max(1, int(np.ceil(len(samples) / (rate * usable))))
+    bounds = cut_at_silence(samples, rate, pieces)
+
+    streaming_config = speech.StreamingRecognitionConfig(
+        config=recognition_config(language_code, rate, **config),
+        interim_results=False
+    )
+    step = int(rate * STREAM_CHUNK_SECONDS)
+    pace = pace or STREAM_PACE
+    priority = quotas.current_priority()   # pool threads don't inherit the caller's lane
+
+    def recognize_slice(start, end):
+        def requests():
+            started = time.monotonic()
+            for i in range(start, end, step):
+                # Request n goes out when n chunks' worth of (paced) time has passed
+                time.sleep(max(0.0, started + (i - start) / rate / pace - time.monotonic()))
+                yield speech.StreamingRecognizeRequest(audio_content=samples[i:min(i + step, end)].tobytes())
+
+        responses = quotas.call("speech", lambda: client.streaming_recognize(streaming_config, requests()),
+                                priority=priority)
+        finals = [
+            result
+            for response in responses
+            for result in response.results
+            if result.is_final
+        ]
+        return to_segments(finals, offset=start / rate)
+
+    # Slices follow each other on the timeline, so in-order slices are in-order segments
+    with tracer.span("recognize"):
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for part in ordered_map(pool, recognize_slice, bounds[:-1], bounds[1:], ahead=max_workers):
+                yield from part
+
+
+def _upload_config(language_code, rate, encoding, config):
+    from google.cloud import speech
+
+    return recognition_config(
+        language_code, rate,
+        encoding=speech.RecognitionConfig.AudioEncoding[encoding],
+        **config
+    )
+
+
+def _blob_name(blob_name, encoding, suffix=""):
+    stem, _ = os.path.splitext(blob_name)
+    return stem + suffix + UPLOAD_FORMATS[encoding][0]
+
+
+def recognize_long_running(audio_file, language_code, bucket_name, blob_name,
+                           client=None, timeout=3600, encoding=None, **config):
+    """Upload to GCS and wait on one long_running_recognize operation"""
+    from google.cloud import speech
+
+    client = client or clients.speech_client(rest=True)
+    encoding = upload_encoding(encoding)
+    samples, rate = open_pcm(audio_file)
+    workdir = tempfile.mkdtemp(prefix="upload_")
+
+    try:
+        with tracer.span("encode"):
+            if encoding == "LINEAR16":
+                upload_file = audio_file
+            else:
+                upload_file = os.path.join(workdir, "audio" + UPLOAD_FORMATS[encoding][0])
+                write_audio(upload_file, samples, rate, encoding)
+
+        with tracer.span("upload"):
+            gcs_uri = upload_to_gcs(bucket_name, upload_file, _blob_name(blob_name, encoding))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    with tracer.span("recognize"):
+        recognition = _upload_config(language_code, rate, encoding, config)
+        operation = quotas.call("speech", lambda: client.long_running_recognize(
+            config=recognition,
+            audio=speech.RecognitionAudio(uri=gcs_uri)
+        ))
+        response = operation.result(timeout=timeout)
+
+    return to_segments(response.results)
+
+
+def wait_all(operations, timeout=3600, poll_seconds=POLL_SECONDS):
+    """Poll every operation in one loop; results in submission order"""
+    results = [None] * len(operations)
+    waiting = set(range(len(operations)))
+    deadline = time.monotonic() + timeout
+
+    while waiting:
+        for i in [i for i in waiting if operations[i].done()]:
+            results[i] = operations[i].result()
+            waiting.discard(i)
+        if not waiting:
+            break
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"{len(waiting)} of {len(operations)} recognition operations still running")
+        time.sleep(poll_seconds)
+
+    return results
+
+
+def recognize_sharded(audio_file, language_code, bucket_name, blob_name, shards=None,
+                      client=None, timeout=3600, poll_seconds=POLL_SECONDS, encoding=None, **config):
+    """
+    One long_running_recognize operation per silence-cut shard, all in
+    flight at once; word offsets are shifted back onto the file's timeline.
+    """
+    from google.cloud import speech
+
+    client = client or clients.speech_client(rest=True)
+    samples, rate = open_pcm(audio_file)
+    if shards is None:
+        shards = settings.lro_shards or \
+            min(MAX_SHARDS, math.ceil(len(samples) / (rate * SHARD_SECONDS)))
+    bounds = cut_at_silence(samples, rate, max(1, shards))
+
+    encoding = upload_encoding(encoding)
+    recognition = _upload_config(language_code, rate, encoding, config)
+    workdir = tempfile.mkdtemp(prefix="shards_")
+    priority = quotas.current_priority()
+
+    def submit(i):
+        path = os.path.join(workdir, f"shard_{i}" + UPLOAD_FORMATS[encoding][0])
+        write_audio(path, samples.section(bounds[i], bounds[i + 1]), rate, encoding)
+        uri = upload_to_gcs(bucket_name, path, _blob_name(blob_name, encoding, f"_shard{i}"))
+        return quotas.call(
+            "speech",
+            lambda: client.long_running_recognize(config=recognition, audio=speech.RecognitionAudio(uri=uri)),
+            priority=priority
+        )
+
+    try:
+        with tracer.span("upload"):
+            with ThreadPoolExecutor(max_workers=len(bounds) - 1) as pool:
+                operations = list(pool.map(submit, range(len(bounds) - 1)))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"⏳ {len(operations)} recognition operations submitted")
+    with tracer.span("recognize"):
+        responses = wait_all(operations, timeout, poll_seconds)
+
+    return [
+        segment
+        for start, response in zip(bounds, responses)
+        for segment in to_segments(response.results, offset=start / rate)
+    ]
+
+
+def recognize_file(audio_file, language_code, bucket_name, blob_name, engine=None, **config):
+    """Transcribe a WAV with the engine choose_engine() picks for its length"""
+    return list(iter_file_segments(audio_file, language_code, bucket_name, blob_name, engine, **config))
+
+
+def iter_file_segments(audio_file, language_code, bucket_name, blob_name, engine=None, **config):
+    """
+    recognize_file() as a generator. The streaming engine yields each slice
+    as it finishes; the operation engines get every result in one response
+    and yield from that.
+    """
+    samples, rate = open_pcm(audio_file)
+    engine = choose_engine(len(samples) / rate, engine)
+    print(f"🎧 {len(samples) / rate / 60:.1f} min of audio → {engine} recognition")
+
+    if engine == "streaming":
+        yield from iter_streaming(audio_file, language_code, **config)
+    elif engine == "sharded":
+        yield from recognize_sharded(audio_file, language_code, bucket_name, blob_name, **config)
+    else:
+        yield from recognize_long_running(audio_file, language_code, bucket_name, blob_name, **config)
@@ -0,0 +1,229 @@
+"""
+Sample-Rate Conversion
+Devices are opened at their own rate and channel count (a VB-Cable is
+usually 48 kHz stereo) and converted here: the recognizers get 16 kHz
+mono, and synthesized speech (16-24 kHz, Coqui 22.05 kHz) is resampled
+to the output device's rate instead of relying on the OS to do it.
+
+    capture = CaptureConverter(*input_format(device), RATE)
+    pcm = capture.convert(indata)        # (frames, channels) -> RATE mono, same dtype
+    play(audio, rate, device)            # at the device's default rate, one stream per device
+
+Resampler is a streaming polyphase FIR (Kaiser-windowed sinc): every
+output sample is one dot product of `taps` inputs with one of `up`
+sub-filters, computed for a whole block at once with numpy. Carrying
+the last taps-1 inputs between blocks makes chunked output identical to
+converting the whole signal.
+
+The capture_rate / capture_channels / playback_rate settings force a
+format when a driver reports one it can't actually open (0 = what the
+device reports).
+"""
+
+import functools
+import math
+import queue
+import threading
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from config import settings
+
+CAPTURE_RATE = settings.capture_rate
+CAPTURE_CHANNELS = settings.capture_channels
+PLAYBACK_RATE = settings.playback_rate
+
+ZERO_CROSSINGS = 16    # sinc lobes each side: filter length vs. transition width
+KAISER_BETA = 8.0      # ~80 dB stopband
+ROLLOFF = 0.94         # cutoff as a fraction of the lower Nyquist, so the transition band doesn't alias
+BLOCK = 16384          # one-shot conversions run in blocks to bound the working set
+
+
+@functools.lru_cache(maxsize=settings.filter_cache_size)
+def polyphase_bank(up, down, zero_crossings=ZERO_CROSSINGS, beta=KAISER_BETA, rolloff=ROLLOFF):
+    """(up, taps) sub-filters, each ordered oldest -> newest input"""
+    cutoff = rolloff * 0.5 / max(up, down)   # cycles per sample at the upsampled rate
+    half = filter_half_length(up, down, zero_crossings)
+    n = np.arange(-half, half + 1)
+    h = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(len(n), beta) * up
+
+    taps = math.ceil(len(h) / up)
+    h = np.pad(h, (0, taps * up - len(h)))
+    # bank[p, j] multiplies input base - (taps - 1 - j) for outputs of phase p
+    return np.ascontiguousarray(h.reshape(taps, up).T[:, ::-1], dtype=np.float32)
+
+
+def filter_half_length(up, down, zero_crossings=ZERO_CROSSINGS):
+    """Taps each side of the centre, at the upsampled rate (= the filter's delay)"""
+    return zero_crossings * max(up, down)
+
+
+class Resampler:
+    """
+    Streaming mono rate conversion; process() blocks of any size in order.
+    Output lags the input by the filter's half length (about a millisecond
+    at speech rates) unless `compensate` starts it that far ahead, which
+    needs that much input before the first sample comes out.
+    """
+
+    def __init__(self, in_rate, out_rate, compensate=False):
+        g = math.gcd(int(in_rate), int(out_rate))
+        self.in_rate, self.out_rate = int(in_rate), int(out_rate)
+        self.up, self.down = self.out_rate // g, self.in_rate // g
+        self.bank = polyphase_bank(self.up, self.down) if self.up != self.down else None
+        self.taps = self.bank.shape[1] if self.bank is not None else 1
+        self.offset = filter_half_length(self.up, self.down) if compensate else 0
+        self.reset()
+
+    def reset(self):
+        self.history = np.zeros(self.taps - 1, dtype=np.float32)
+        self.consumed = 0   # input samples seen
+        self.produced = 0   # output samples returned
+
+    def process(self, samples):
+        x = np.asarray(samples, dtype=np.float32).reshape(-1)
+        if self.bank is None:
+            return x
+
+        buffer = np.concatenate([self.history, x])
+        first = self.consumed - (self.taps - 1)   # input index of buffer[0]
+        self.consumed += len(x)
+
+        # Every output whose newest input has arrived
+        last = (self.consumed * self.up - 1 - self.offset) // self.down
+        n = np.arange(self.produced, last + 1, dtype=np.int64)
+        self.produced = max(self.produced, last + 1)
+
+        position = n * self.down + self.offset
+        newest = position // self.up - first
+        windows = sliding_window_view(buffer, self.taps)[newest - (self.taps - 1)]
+        out = np.einsum("nk,nk->n", windows, self.bank[position % self.up])
+
+        self.history = buffer[len(buffer) - (self.taps - 1):]
+        return out.astype(np.float32, copy=False)
+
+
+def to_dtype(samples, dtype):
+    """Float samples back to the caller's dtype (int16 is rounded and clipped)"""
+    if np.dtype(dtype) == np.int16:
+        return np.clip(np.rint(samples), -32768, 32767).astype(np.int16)
+    return samples.astype(dtype, copy=False)
+
+
+def downmix(block):
+    """(frames, channels) -> (frames,) float32 average of the channels"""
+    data = np.asarray(block)
+    if data.ndim == 2 and data.shape[1] > 1:
+        return data.mean(axis=1, dtype=np.float32)
+    return data.reshape(-1).astype(np.float32, copy=False)
+
+
+def resample(samples, in_rate, out_rate):
+    """Whole-signal conversion, delay-compensated; returns the input's dtype"""
+    samples = np.asarray(samples)
+    if int(in_rate) == int(out_rate):
+        return samples
+
+    resampler = Resampler(in_rate, out_rate, compensate=True)
+    flat = downmix(samples)
+    # Zeros push the filter's tail out
+    padded = np.concatenate([flat, np.zeros(resampler.taps + 1, dtype=np.float32)])
+    out = np.concatenate([resampler.process(padded[i:i + BLOCK]) for i in range(0, len(padded), BLOCK)])
+
+    length = len(flat) * resampler.up // resampler.down
+    return to_dtype(out[:length], samples.dtype)
+
+
+class CaptureConverter:
+    """Device blocks at their native rate/channels -> `out_rate` mono, block by block"""
+
+    def __init__(self, in_rate, channels, out_rate):
+        self.in_rate = int(in_rate)
+        self.channels = channels
+        self.out_rate = out_rate
+        self.resampler = Resampler(in_rate, out_rate)
+
+    def convert(self, block):
+        block = np.asarray(block)
+        if self.in_rate == self.out_rate and self.channels == 1:
+            return block.reshape(-1)
+        return to_dtype(self.resampler.process(downmix(block)), block.dtype)
+
+
+# ==============================
+# DEVICE FORMATS
+# ==============================
+def input_format(device=None):
+    """(rate, channels) to open an input at: what the device reports, at most stereo"""
+    import sounddevice as sd
+
+    info = sd.query_devices(device, "input")
+    rate = CAPTURE_RATE or int(info["default_samplerate"])
+    channels = CAPTURE_CHANNELS or max(1, min(int(info["max_input_channels"]), 2))
+    return rate, channels
+
+
+@functools.lru_cache(maxsize=16)
+def output_rate(device=None):
+    import sounddevice as sd
+
+    return PLAYBACK_RATE or int(sd.query_devices(device, "output")["default_samplerate"])
+
+
+# ==============================
+# PLAYBACK
+# ==============================
+class Player:
+    """
+    One output device's long-lived OutputStream, written by its own worker.
+    sd.play() first stops every stream sounddevice started, so two lanes
+    (or two overlapping utterances) would cut each other off; here clips
+    for one device play back to back and other devices are untouched.
+    """
+
+    def __init__(self, device=None):
+        import sounddevice as sd
+
+        self.device = device
+        self.rate = output_rate(device)
+        self.queue = queue.Queue()
+        self.stream = sd.OutputStream(samplerate=self.rate, channels=1, dtype="float32", device=device)
+        self.stream.start()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def play(self, samples, rate):
+        """Queue a clip at the device's rate; returns once it has been played out"""
+        samples = np.asarray(samples)
+        if samples.dtype == np.int16:
+            samples = samples.astype(np.float32) / 32768.0
+        done = threading.Event()
+        self.queue.put((resample(samples, rate, self.rate), done))
+        done.wait()
+
+    def _run(self):
+        while True:
+            samples, done = self.queue.get()
+            try:
+                self.stream.write(samples.astype(np.float32, copy=False).reshape(-1, 1))
+            except Exception as e:
+                print(f"⚠️  Playback on device {self.device} failed: {e}")
+            finally:
+                done.set()
+
+
+_players = {}
+_players_lock = threading.Lock()
+
+
+def player(device=None):
+    """The Player for `device`, opened on first use and kept for the process"""
+    with _players_lock:
+        if device not in _players:
+            _players[device] = Player(device)
+        return _players[device]
+
+
+def play(samples, rate, device=None):
+    """Play on `device` at its own rate, after what's already queued for it; blocks until played"""
+    player(device).play(samples, rate)
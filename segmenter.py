@@ -0,0 +1,172 @@
+"""
+Utterance Segmentation
+Turns a live stream of Whisper text into translation jobs as soon as a
+sentence ends or the speaker pauses, instead of on a fixed timer
+"""
+
+import difflib
+import re
+import threading
+
+import numpy as np
+
+# Sentence-final punctuation Whisper emits (incl. the ellipsis character)
+SENTENCE_END = re.compile(r'(?<=[.!?…])\s+')
+SENTENCE_END_TAIL = re.compile(r'[.!?…]\s*$')
+
+
+def split_sentences(text):
+    """(finished sentences, unfinished tail) of a piece of text"""
+    parts = [part for part in SENTENCE_END.split(text.strip()) if part]
+    if parts and not SENTENCE_END_TAIL.search(parts[-1]):
+        return parts[:-1], parts[-1]
+    return parts, ""
+
+
+def _word_key(word):
+    return re.sub(r"[^\w]", "", word.lower())
+
+
+def unsent_text(sent, text):
+    """
+    The part of `text` (a fresh decode of the whole buffer) past what
+    `sent` (text already handed over from an earlier decode) covered.
+    Words are aligned ignoring case and punctuation, so a decode that
+    re-punctuates or corrects a word neither repeats nor drops text.
+    """
+    sent_keys = [_word_key(word) for word in sent.split()]
+    words = text.split()
+    if not sent_keys:
+        return " ".join(words)
+
+    matcher = difflib.SequenceMatcher(None, sent_keys, [_word_key(word) for word in words], autojunk=False)
+    covered = 0
+    for a, b, size in matcher.get_matching_blocks():
+        if size:
+            # Sent words after the last match were decoded differently - skip as many
+            covered = b + size + (len(sent_keys) - (a + size))
+    return " ".join(words[min(covered, len(words)):])
+
+
+# ==============================
+# TRANSCRIPT LOG
+# ==============================
+class TranscriptLog:
+    """Append-only transcript; every recognized piece of text is kept"""
+
+    def __init__(self):
+        self._entries = []
+        self._lock = threading.Lock()
+
+    def append(self, text):
+        with self._lock:
+            self._entries.append(text)
+            return len(self._entries) - 1
+
+    def since(self, index):
+        with self._lock:
+            return list(self._entries[index:])
+
+    def text(self):
+        with self._lock:
+            return " ".join(self._entries)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+# ==============================
+# VOICE ACTIVITY (ENERGY BASED)
+# ==============================
+class EnergyVAD:
+    """
+    Cheap RMS voice-activity detector for float32 [-1, 1] chunks.
+    Reports a pause once `pause_seconds` of silence follow speech.
+    """
+
+    def __init__(self, rate, threshold=0.01, pause_seconds=0.6):
+        self.rate = rate
+        self.threshold = threshold
+        self.pause_samples = int(pause_seconds * rate)
+        self.silent_samples = 0
+        self.heard_speech = False
+
+    def is_speech(self, chunk):
+        if len(chunk) == 0:
+            return False
+        rms = float(np.sqrt(np.mean(np.square(chunk, dtype=np.float32))))
+        return rms >= self.threshold
+
+    def update(self, chunk):
+        """Feed one chunk, returns True when a pause after speech is reached"""
+        if self.is_speech(chunk):
+            self.heard_speech = True
+            self.silent_samples = 0
+            return False
+
+        self.silent_samples += len(chunk)
+        if self.heard_speech and self.silent_samples >= self.pause_samples:
+            self.heard_speech = False
+            return True
+        return False
+
+    def reset(self):
+        self.silent_samples = 0
+        self.heard_speech = False
+
+
+def quietest_cut(audio, rate, start=0, frame_seconds=0.02):
+    """
+    Sample index in audio[start:] at the start of its quietest frame -
+    where a forced cut is least likely to split a word.
+    """
+    frame = max(1, int(rate * frame_seconds))
+    frames = (len(audio) - start) // frame
+    if frames < 1:
+        return len(audio)
+    energy = np.square(audio[start:start + frames * frame], dtype=np.float32).reshape(frames, frame).mean(axis=1)
+    return start + int(np.argmin(energy)) * frame
+
+
+# ==============================
+# SEGMENTER
+# ==============================
+class UtteranceSegmenter:
+    """
+    Collects recognized text and calls `on_segment(text)` for every
+    complete sentence, or for whatever is pending when a pause is reported.
+    """
+
+    def __init__(self, on_segment, log=None):
+        self.on_segment = on_segment
+        self.log = log if log is not None else TranscriptLog()
+        self._pending = ""
+        self._lock = threading.Lock()
+
+    def feed(self, text):
+        text = text.strip()
+        if not text:
+            return
+
+        self.log.append(text)
+
+        with self._lock:
+            ready, self._pending = split_sentences(f"{self._pending} {text}")
+
+        for sentence in ready:
+            if sentence.strip():
+                self.on_segment(sentence.strip())
+
+    def pause(self):
+        """Speaker stopped talking - flush whatever is left"""
+        with self._lock:
+            text, self._pending = self._pending.strip(), ""
+
+        if text:
+            self.on_segment(text)
+
+    @property
+    def pending(self):
+        with self._lock:
+            return self._pending
@@ -45,14 +45,13 @@ print("   - Must have OUTPUT channels > 0")
 
 print("\n📝 Once you identify the devices:")
 print("   1. Note the device numbers [X]")
-print("   2. Open web_translator.py")
-print("   3. Update these lines:")
-print("      INPUT_DEVICE = X   # Your CABLE Output device number")
-print("      OUTPUT_DEVICE = Y  # Your CABLE Input device number")
+print("   2. Put them in a config file (read by web_translator.py and test_audio_routing.py):")
+print('      {"input_device": X, "output_device": Y}')
+print("   3. Run with CONFIG_FILE=that_file.json, or pass --input-device X --output-device Y")
 
 print("\n💡 Example:")
 print("   If CABLE Output is device [5] and CABLE Input is device [6]:")
-print("   INPUT_DEVICE = 5")
-print("   OUTPUT_DEVICE = 6")
+print("   python web_translator.py --input-device 5 --output-device 6")
+print("   (a part of the device name works too: --output-device \"CABLE Input\")")
 
 print("\n" + "=" * 70)
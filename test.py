@@ -1,49 +1,117 @@
-import vertexai
-from moviepy import VideoFileClip
-from moviepy import AudioFileClip, concatenate_audioclips
-from google.cloud import speech
-from google.cloud import texttospeech
-from google.cloud import translate_v2 as translate
-from google.cloud import storage
 import os
 import re
 import html
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+
+import config
+
+if __name__ == "__main__":
+    # --input-video / --profile / --config ... before the modules below read their settings
+    config.parse_args("Dub a video into one or more languages")
+
+import clients
+from backends import make_translator
+from media import AudioAppender
+from quota import BATCH, quotas
+from voices import registry as voice_registry
+from recognition import choose_engine, file_digest, iter_file_segments, open_pcm
+from tracing import tracer
 # -------------------------
 # CONFIG
 # -------------------------
-PROJECT_ID = "iliosdigital-ai-poc"  # Update this with your actual project ID
-LOCATION = "us-central1"
+# The job spec - config.py's "job" settings (config file, env or flags)
+settings = config.settings
 
-INPUT_VIDEO = "videoplayback.mp4"
-TEMP_AUDIO = "temp_tamil_audio.wav"
-OUTPUT_AUDIO = "english_output_audio.mp3"
+INPUT_VIDEO = settings.input_video
+TEMP_AUDIO = settings.temp_audio
+OUTPUT_AUDIO = settings.output_audio
 
+# Long recordings go through this bucket (see recognition.py)
+UPLOAD_BUCKET = settings.upload_bucket
+UPLOAD_BLOB = settings.upload_blob
+
+# Dub into several languages from one extraction + one transcript:
+#   --dub-targets "en:en-US-Neural2-D,fr:fr-FR-Neural2-B,hi"
+# A target without a voice uses its voice in voices.json ("dub" profile).
+# Set output_video to also write one video carrying every dubbed track
+# (plus the original).
+DUB_TARGETS = settings.dub_targets
+OUTPUT_VIDEO = settings.output_video
+
+# Long videos are dubbed in stream mode: the transcript is translated,
+# subtitled and voiced STREAM_WINDOW segments at a time, appending to the
+# outputs, so memory stays flat however long the input is. Batch mode
+# takes the whole transcript at once (fastest translation for short
+# videos). DUB_MODE=auto streams past STREAM_MIN_SECONDS.
+DUB_MODES = ("auto", "batch", "stream")
+DUB_MODE = settings.dub_mode
+STREAM_MIN_SECONDS = settings.stream_min_seconds
+STREAM_WINDOW = settings.stream_window
+
+TTS_MAX_CHARS = settings.tts_max_chars   # per synthesis request
+
+SOURCE_LANGUAGE = "ta"
+LANGUAGE_NAMES = {"en": "english", "fr": "french", "hi": "hindi", "es": "spanish", "de": "german"}
+
+Target = namedtuple("Target", ["language", "voice", "output"])
+
+
+# Heavy imports (moviepy, google.cloud.*) are deferred to the step that
+# needs them so `import test` stays fast.
+
+
+def artifact_path(suffix):
+    """Transcript / subtitle files live next to the dubbed audio, named after the video"""
+    stem = os.path.splitext(os.path.basename(INPUT_VIDEO))[0]
+    return os.path.join(os.path.dirname(OUTPUT_AUDIO), f"{stem}.{suffix}")
 
-# -------------------------
-# INIT Vertex AI
-# -------------------------
-vertexai.init(project=PROJECT_ID, location=LOCATION)
 
+def open_subtitles(stack, language):
+    """.srt + .vtt for `language` that cues are appended to, closed with `stack`"""
+    from transcripts import CueWriter
 
-def upload_to_gcs(bucket_name, source_file, destination_blob):
+    return [stack.enter_context(CueWriter(artifact_path(f"{language}.{fmt}"), fmt)) for fmt in ("srt", "vtt")]
 
-    storage_client = storage.Client()
 
-    bucket = storage_client.bucket(bucket_name)
+def write_subtitles(writers, cues):
+    for writer in writers:
+        writer.write(cues)
 
-    blob = bucket.blob(destination_blob)
 
-    blob.upload_from_filename(source_file)
+def dub_mode(duration_seconds, mode=None):
+    mode = mode or DUB_MODE
+    if mode not in DUB_MODES:
+        raise ValueError(f"Unknown dub mode '{mode}' (choose from: {', '.join(DUB_MODES)})")
+    if mode == "auto":
+        return "stream" if duration_seconds > STREAM_MIN_SECONDS else "batch"
+    return mode
 
-    print(f"Uploaded to gs://{bucket_name}/{destination_blob}")
 
-    return f"gs://{bucket_name}/{destination_blob}"
+def parse_targets(spec):
+    """"en:en-US-Neural2-D,fr" -> [Target]; English keeps OUTPUT_AUDIO"""
+    targets = []
+    for item in spec.split(","):
+        language, _, voice = item.strip().partition(":")
+        # Unknown languages fail here, before any audio is extracted
+        voice = voice_registry.voice(language, SOURCE_LANGUAGE, "dub", name=voice or None).name
+        if language == "en":
+            output = OUTPUT_AUDIO
+        else:
+            name = LANGUAGE_NAMES.get(language, language)
+            output = os.path.join(os.path.dirname(OUTPUT_AUDIO), f"{name}_output_audio.mp3")
+        targets.append(Target(language, voice, output))
+    return targets
+
 
 # -------------------------
 # STEP 1: Extract Audio
 # -------------------------
 def extract_audio(video_path, audio_path):
 
+    from moviepy import VideoFileClip
+
     with VideoFileClip(video_path) as video:
 
         if video.audio is None:
@@ -62,167 +130,127 @@ def extract_audio(video_path, audio_path):
 # STEP 2: French Speech → Text
 # -------------------------
 def speech_to_text(audio_file):
-
-    from google.cloud.speech_v1.services.speech.transports import SpeechRestTransport
-
-    transport = SpeechRestTransport()
-    speech_client = speech.SpeechClient(transport=transport)
-
-    bucket_name = "ilios-speech-audio"
-    blob_name = "temp_audio.wav"
-
-    gcs_uri = upload_to_gcs(bucket_name, audio_file, blob_name)
-
-    audio = speech.RecognitionAudio(uri=gcs_uri)
-
-    config = speech.RecognitionConfig(
-        encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
-        language_code="ta-IN",
-        enable_automatic_punctuation=True,
-        model="latest_long",   
-        use_enhanced=True,     
-        audio_channel_count=1,
-        enable_word_time_offsets=True,
-        enable_word_confidence=True,
-        max_alternatives=1,
-    )
-
-
-    print("Processing Tamil audio from GCS...")
-
-    operation = speech_client.long_running_recognize(
-        config=config,
-        audio=audio
-    )
-
-    response = operation.result(timeout=3600)
-
-    full_text = ""
-    word_count = 0
-
-    for result in response.results:
-        transcript = result.alternatives[0].transcript
-        confidence = result.alternatives[0].confidence if hasattr(result.alternatives[0], 'confidence') else 0
-        full_text += transcript + " "
-        word_count += len(transcript.split())
-        
-    print(f"Transcribed {word_count} words with average confidence")
-    
-    return full_text.strip()
+    """-> transcripts.Transcript (columnar), reused from the transcript artifact when present"""
+
+    from transcripts import TranscriptWriter, load_transcript
+
+    samples, rate = open_pcm(audio_file)
+    language_code = "ta-IN"
+    engine = choose_engine(len(samples) / rate)
+    audio_hash = file_digest(audio_file)
+    index_file = artifact_path("transcript.npz")
+
+    # Same audio, language and engine as last run -> read the index, skip recognition
+    if os.path.exists(index_file):
+        transcript = load_transcript(index_file)
+        if (transcript.audio_hash, transcript.language, transcript.engine) == (audio_hash, language_code, engine):
+            print(f"Reusing transcript {index_file} ({transcript.word_count} words)")
+            return transcript
+
+    # Short/medium files: parallel streaming sessions, no upload.
+    # Long files: GCS + long_running_recognize (see recognition.py).
+    # Segments go straight into the columnar index as they arrive.
+    writer = TranscriptWriter(language=language_code, audio_samples=len(samples),
+                              audio_hash=audio_hash, engine=engine)
+    for segment in iter_file_segments(
+        audio_file,
+        language_code,
+        bucket_name=UPLOAD_BUCKET,
+        blob_name=UPLOAD_BLOB,
+        engine=engine
+    ):
+        writer.add(segment)
+    writer.save(index_file)
+
+    transcript = load_transcript(index_file)
+    print(f"Transcribed {transcript.word_count} words in {len(transcript)} segments")
+
+    return transcript
 
 # -------------------------
-# STEP 3: Translate Tamil → English
+# STEP 3: Translate Tamil → Target
 # -------------------------
-def translate_to_english(tamil_text):
+def translate_to_english(segments, target="en", translator=None):
+    """One translation per segment, so subtitles keep the source timing"""
 
-    translate_client = translate.Client()
+    translator = translator or make_translator()
 
-    result = translate_client.translate(
-        tamil_text,
-        source_language="ta",
-        target_language="en"
-    )
-    
-    # Decode HTML entities like &#39; to '
-    translated_text = html.unescape(result["translatedText"])
-    
-    return translated_text
+    # Segments are packed into request-sized batches, translated in
+    # parallel and returned in order (HTML entities already decoded)
+    with tracer.span("translate"):
+        return translator.translate_many([segment.transcript for segment in segments], "ta", target)
 
 # -------------------------
-# STEP 4: English Text → Speech
+# STEP 4: Target Text → Speech
 # -------------------------
-def text_to_speech(long_text, output_file):
-    
-    # Clean and normalize the text
-    long_text = html.unescape(long_text)
-    
-    # Split text into sentences - handle multiple punctuation marks
-    sentences = re.split(r'(?<=[.!?])\s+', long_text)
-    
-    # Group sentences into chunks of max 4000 characters (safer limit)
-    chunks = []
-    current_chunk = ""
-    
-    for sentence in sentences:
-        # If a single sentence is too long, split it further
-        if len(sentence) > 4000:
-            # Split by commas or other natural breaks
-            sub_sentences = re.split(r'(?<=[,;:])\s+', sentence)
-            for sub in sub_sentences:
-                if len(current_chunk) + len(sub) + 1 <= 4000:
-                    current_chunk += sub + " "
+def tts_chunks(texts, max_chars=TTS_MAX_CHARS):
+    """Texts -> synthesis requests of up to max_chars, cut at sentence ends (clause ends if needed)"""
+
+    current = ""
+    for text in texts:
+        # Split text into sentences - handle multiple punctuation marks
+        for sentence in re.split(r'(?<=[.!?])\s+', html.unescape(text)):
+            # If a single sentence is too long, split it by commas or other natural breaks
+            pieces = re.split(r'(?<=[,;:])\s+', sentence) if len(sentence) > max_chars else [sentence]
+            for piece in pieces:
+                if len(current) + len(piece) + 1 <= max_chars:
+                    current += piece + " "
                 else:
-                    if current_chunk:
-                        chunks.append(current_chunk.strip())
-                    current_chunk = sub + " "
-        else:
-            if len(current_chunk) + len(sentence) + 1 <= 4000:
-                current_chunk += sentence + " "
-            else:
-                if current_chunk:
-                    chunks.append(current_chunk.strip())
-                current_chunk = sentence + " "
-    
-    if current_chunk:
-        chunks.append(current_chunk.strip())
-    
-    print(f"Total chunks: {len(chunks)}")
+                    if current.strip():
+                        yield current.strip()
+                    current = piece + " "
+
+    if current.strip():
+        yield current.strip()
+
+
+def text_to_speech(long_text, output_file, language="en", voice_name=None):
+    """
+    Voice `long_text` into one MP3. It may also be a list of texts, or a
+    generator read only as the chunks are synthesized; every chunk is
+    appended to the output as soon as it arrives.
+    """
+
+    from google.cloud import texttospeech
+
+    texts = [long_text] if isinstance(long_text, str) else long_text
+    chunks = tts_chunks(texts)
+    total = ""
+    if isinstance(texts, list):   # all there already: count the chunks up front
+        chunks = list(chunks)
+        total = f"/{len(chunks)}"
+        print(f"Total chunks: {len(chunks)}")
     
-    tts_client = texttospeech.TextToSpeechClient()
+    tts_client = clients.tts_client()
     
-    # Use a male English voice
-    voice = texttospeech.VoiceSelectionParams(
-        language_code="en-US",
-        name="en-US-Neural2-D"  # Male voice - clear and natural
-    )
+    # MP3, slightly slower (Tamil pacing) and lower - see "dub" in voices.json
+    voice, audio_config = voice_registry.google_params(language, SOURCE_LANGUAGE, "dub", name=voice_name)
     
-    audio_config = texttospeech.AudioConfig(
-        audio_encoding=texttospeech.AudioEncoding.MP3,
-        speaking_rate=0.95,  # Slightly slower to better match Tamil pacing
-        pitch=-2.0  # Slightly lower pitch for male voice
-    )
-    
-    audio_clips = []
-    
-    for i, chunk in enumerate(chunks):
-        print(f"Generating chunk {i+1}/{len(chunks)}")
-        
-        try:
-            input_text = texttospeech.SynthesisInput(text=chunk)
+    with AudioAppender(output_file) as audio:
+        for i, chunk in enumerate(chunks):
+            print(f"Generating chunk {i+1}{total}")
             
-            response = tts_client.synthesize_speech(
-                input=input_text,
-                voice=voice,
-                audio_config=audio_config
-            )
-            
-            temp_file = f"temp_chunk_{i}.mp3"
-            with open(temp_file, "wb") as out:
-                out.write(response.audio_content)
-            
-            audio_clips.append(AudioFileClip(temp_file))
-            
-        except Exception as e:
-            print(f"Error generating chunk {i+1}: {e}")
-            print(f"Chunk length: {len(chunk)} characters")
-            print(f"Chunk preview: {chunk[:100]}...")
-            raise
-    
-    # Concatenate all audio clips
-    if len(audio_clips) > 1:
-        print("Concatenating audio chunks...")
-        final_audio = concatenate_audioclips(audio_clips)
-        final_audio.write_audiofile(output_file, codec='libmp3lame')
-        final_audio.close()
-    else:
-        audio_clips[0].write_audiofile(output_file, codec='libmp3lame')
-        audio_clips[0].close()
-    
-    # Clean up temp files
-    for i in range(len(chunks)):
-        temp_file = f"temp_chunk_{i}.mp3"
-        if os.path.exists(temp_file):
-            os.remove(temp_file)
+            try:
+                input_text = texttospeech.SynthesisInput(text=chunk)
+                
+                with tracer.span("synthesize"):
+                    response = quotas.call(
+                        "tts",
+                        lambda: tts_client.synthesize_speech(
+                            input=input_text,
+                            voice=voice,
+                            audio_config=audio_config
+                        ),
+                        chars=len(chunk)
+                    )
+                
+                audio.write(response.audio_content)
+                
+            except Exception as e:
+                print(f"Error generating chunk {i+1}: {e}")
+                print(f"Chunk length: {len(chunk)} characters")
+                print(f"Chunk preview: {chunk[:100]}...")
+                raise
     
     print("✅ FINAL AUDIO GENERATED:", output_file)
 
@@ -231,35 +259,99 @@ def text_to_speech(long_text, output_file):
 # PIPELINE RUNNER
 # -------------------------
 def process_video():
+    # Dubbing is batch work: live translators sharing the project go first
+    quotas.default_priority = BATCH
+
+    with tracer.bind(tracer.new_utterance()):
+        with tracer.span("end_to_end"):
+            run_pipeline()
+
+    print("\n⏱ Stage timings:")
+    for stage, stats in tracer.histograms().items():
+        print(f"  {stage:<14} {stats['sum']:8.2f}s  ({stats['count']} calls)")
+
+
+def run_pipeline():
+
+    from moviepy import AudioFileClip
 
     print("Extracting Audio...")
-    extract_audio(INPUT_VIDEO, TEMP_AUDIO)
+    with tracer.span("extract_audio"):
+        extract_audio(INPUT_VIDEO, TEMP_AUDIO)
     
-    # Get original audio duration
-    original_audio = AudioFileClip(TEMP_AUDIO)
-    original_duration = original_audio.duration
-    original_audio.close()
+    # Get original audio duration (from the WAV header, nothing decoded)
+    samples, rate = open_pcm(TEMP_AUDIO)
+    original_duration = len(samples) / rate
     print(f"Original audio duration: {original_duration:.2f} seconds ({original_duration/60:.2f} minutes)")
 
     print("Converting Tamil Speech → Text...")
-    tamil_text = speech_to_text(TEMP_AUDIO)
-    print(f"Tamil Text ({len(tamil_text)} characters):", tamil_text[:200], "...")
-
-    print("Translating → English...")
-    english_text = translate_to_english(tamil_text)
-    print(f"English Text ({len(english_text)} characters):", english_text[:200], "...")
+    from transcripts import JsonWriter, subtitle_cues, translated_cues
+
+    transcript = speech_to_text(TEMP_AUDIO)
+    preview = " ".join(segment.transcript for segment in transcript.segments(0, 20))
+    print(f"Tamil Text ({transcript.word_count} words):", preview[:200], "...")
+
+    # Batch: the whole transcript is one window. Stream: STREAM_WINDOW
+    # segments at a time, appended to every output before the next
+    mode = dub_mode(original_duration)
+    window = STREAM_WINDOW if mode == "stream" else max(1, len(transcript))
+    print(f"Dubbing in {mode} mode ({min(window, len(transcript))} segments at a time)")
+
+    with ExitStack() as stack:
+        source_json = stack.enter_context(JsonWriter(artifact_path("ta.json"), language="ta-IN"))
+        source_subtitles = open_subtitles(stack, "ta")
+        for segments in transcript.windows(window):
+            source_json.write(segments)
+            write_subtitles(source_subtitles, subtitle_cues(segments))
+
+    # One transcript, every target language translated + voiced concurrently
+    targets = parse_targets(DUB_TARGETS)
+    utterance_id = tracer.current_utterance()
+
+    def dub(target):
+        with tracer.bind(utterance_id), ExitStack() as stack:
+            print(f"Translating → {target.language}...")
+            translator = make_translator()
+            subtitles = open_subtitles(stack, target.language)
+
+            def translated_texts():
+                for segments in transcript.windows(window):
+                    translated = translate_to_english(segments, target.language, translator)
+                    write_subtitles(subtitles, translated_cues(segments, translated))
+                    yield from (text for text in translated if text)
+
+            # Batch translates everything before voicing; stream voices as it goes
+            texts = translated_texts() if mode == "stream" else list(translated_texts())
+
+            print(f"Generating {target.language} Audio ({target.voice})...")
+            text_to_speech(texts, target.output, target.language, target.voice)
+
+    with ThreadPoolExecutor(max_workers=len(targets)) as pool:
+        list(pool.map(dub, targets))   # list() re-raises the first failure
+
+    for target in targets:
+        # Check generated audio duration
+        generated_audio = AudioFileClip(target.output)
+        generated_duration = generated_audio.duration
+        generated_audio.close()
+        print(f"[{target.language}] Generated audio duration: {generated_duration:.2f} seconds "
+              f"({generated_duration/60:.2f} minutes), "
+              f"difference: {abs(original_duration - generated_duration):.2f} seconds")
+
+    if OUTPUT_VIDEO:
+        from media import mux_audio_tracks
+
+        print("Muxing dubbed tracks into one video...")
+        with tracer.span("merge"):
+            mux_audio_tracks(
+                INPUT_VIDEO,
+                [(target.output, target.language) for target in targets],
+                OUTPUT_VIDEO,
+                keep_original=True
+            )
+        print("✅ Multi-track video saved:", OUTPUT_VIDEO)
 
-    print("Generating English Audio...")
-    text_to_speech(english_text, OUTPUT_AUDIO)
-    
-    # Check generated audio duration
-    generated_audio = AudioFileClip(OUTPUT_AUDIO)
-    generated_duration = generated_audio.duration
-    generated_audio.close()
-    print(f"Generated audio duration: {generated_duration:.2f} seconds ({generated_duration/60:.2f} minutes)")
-    print(f"Duration difference: {abs(original_duration - generated_duration):.2f} seconds")
-
-    print("✅ Completed! Output saved:", OUTPUT_AUDIO)
+    print("✅ Completed! Output saved:", ", ".join(target.output for target in targets))
 
 
 # -------------------------
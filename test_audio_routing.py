@@ -7,9 +7,15 @@ import sounddevice as sd
 import numpy as np
 import time
 
-# Device configuration (same as web_translator.py)
-INPUT_DEVICE = 2   # CABLE Output - captures Meet audio
-OUTPUT_DEVICE = 4  # CABLE Input - sends to Meet
+import config
+
+# The same device settings as web_translator.py (config file, env or flags)
+settings = config.parse_args("Test audio routing through the virtual cables")
+
+from resample import CaptureConverter, input_format, play
+
+INPUT_DEVICE = settings.input_device    # CABLE Output - captures Meet audio
+OUTPUT_DEVICE = settings.output_device  # CABLE Input - sends to Meet
 
 RATE = 16000
 DURATION = 3  # seconds
@@ -37,14 +43,18 @@ print("💡 Play something in Google Meet or any audio through CABLE Output")
 print("   (You have 3 seconds to start playing audio)")
 
 try:
+    # Record at the device's own format and convert like the translator does
+    rate, channels = input_format(INPUT_DEVICE)
+    print(f"   Device format: {rate} Hz, {channels} channel(s)")
     recording = sd.rec(
-        int(DURATION * RATE),
-        samplerate=RATE,
-        channels=1,
+        int(DURATION * rate),
+        samplerate=rate,
+        channels=channels,
         dtype='int16',
         device=INPUT_DEVICE
     )
     sd.wait()
+    recording = CaptureConverter(rate, channels, RATE).convert(recording)
     
     # Check if we captured audio
     max_amplitude = np.max(np.abs(recording))
@@ -76,8 +86,7 @@ try:
     tone = np.sin(frequency * 2 * np.pi * t) * 0.3
     tone = (tone * 32767).astype(np.int16)
     
-    sd.play(tone, RATE, device=OUTPUT_DEVICE)
-    sd.wait()
+    play(tone, RATE, device=OUTPUT_DEVICE)
     
     print("   ✅ Test tone played successfully!")
     print("   💡 If you're in Meet with mic set to CABLE Input, others should have heard it")
@@ -93,19 +102,20 @@ print("💡 This simulates the translation flow")
 
 try:
     print("   Recording 3 seconds...")
+    rate, channels = input_format(INPUT_DEVICE)
     recording = sd.rec(
-        int(3 * RATE),
-        samplerate=RATE,
-        channels=1,
+        int(3 * rate),
+        samplerate=rate,
+        channels=channels,
         dtype='int16',
         device=INPUT_DEVICE
     )
     sd.wait()
+    recording = CaptureConverter(rate, channels, RATE).convert(recording)
     
     if np.max(np.abs(recording)) > 100:
         print("   Playing back what was recorded...")
-        sd.play(recording, RATE, device=OUTPUT_DEVICE)
-        sd.wait()
+        play(recording, RATE, device=OUTPUT_DEVICE)
         print("   ✅ Echo test complete!")
     else:
         print("   ⚠️  No audio captured to play back")
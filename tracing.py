@@ -0,0 +1,159 @@
+"""
+Latency Tracing
+Monotonic-clock spans per pipeline stage, tied to an utterance ID.
+
+    utterance_id = tracer.new_utterance()
+    with tracer.bind(utterance_id):
+        with tracer.span("translate"):
+            ...
+
+Set TRACE_LOG=trace.jsonl to write every span as a JSON line; the
+per-stage p50/p95/p99 summary is appended to the same file at exit.
+The log stays open (line-buffered) between spans and is written outside
+the stats lock, so tracing adds no open()/close() to a traced stage.
+"""
+
+import atexit
+import itertools
+import json
+import math
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+from config import settings
+
+MAX_SAMPLES_PER_STAGE = settings.trace_samples   # rolling window used for percentiles
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(q * len(sorted_values)) - 1
+    return sorted_values[max(0, min(rank, len(sorted_values) - 1))]
+
+
+class Tracer:
+
+    def __init__(self, log_path=None, max_samples=MAX_SAMPLES_PER_STAGE):
+        self.log_path = log_path
+        self._samples = defaultdict(lambda: deque(maxlen=max_samples))
+        self._totals = defaultdict(lambda: [0, 0.0])   # stage -> [count, sum]
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._ids = itertools.count(1)
+        self._prefix = f"{os.getpid():x}"
+        self._log = None
+        self._log_lock = threading.Lock()
+
+        if log_path:
+            atexit.register(self.write_summary)
+
+    # ------------------------------
+    # Utterance context
+    # ------------------------------
+    def new_utterance(self):
+        return f"{self._prefix}-{next(self._ids)}"
+
+    @contextmanager
+    def bind(self, utterance_id):
+        """Spans opened in this thread default to `utterance_id`"""
+        previous = getattr(self._local, "utterance_id", None)
+        self._local.utterance_id = utterance_id
+        try:
+            yield utterance_id
+        finally:
+            self._local.utterance_id = previous
+
+    def current_utterance(self):
+        return getattr(self._local, "utterance_id", None)
+
+    # ------------------------------
+    # Spans
+    # ------------------------------
+    @contextmanager
+    def span(self, stage, utterance_id=None):
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.record(stage, time.monotonic() - start, utterance_id, start)
+
+    def record(self, stage, seconds, utterance_id=None, start=None):
+        utterance_id = utterance_id or self.current_utterance()
+
+        with self._lock:
+            self._samples[stage].append(seconds)
+            totals = self._totals[stage]
+            totals[0] += 1
+            totals[1] += seconds
+
+        if self.log_path:
+            self._write({
+                "utterance": utterance_id,
+                "stage": stage,
+                "start": start,
+                "duration_ms": round(seconds * 1000, 3),
+            })
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._totals.clear()
+
+    # ------------------------------
+    # Export
+    # ------------------------------
+    def histograms(self):
+        """{stage: {count, sum, p50, p95, p99, max}} in seconds"""
+        with self._lock:
+            snapshot = {stage: sorted(values) for stage, values in self._samples.items()}
+            totals = {stage: tuple(t) for stage, t in self._totals.items()}
+
+        result = {}
+        for stage, values in snapshot.items():
+            count, total = totals[stage]
+            stats = {"count": count, "sum": total}
+            for q in QUANTILES:
+                stats[f"p{int(q * 100)}"] = percentile(values, q)
+            stats["max"] = values[-1] if values else 0.0
+            result[stage] = stats
+        return result
+
+    def prometheus_text(self, metric="translator_stage_latency_seconds"):
+        lines = [
+            f"# HELP {metric} Per-stage pipeline latency",
+            f"# TYPE {metric} summary",
+        ]
+        for stage, stats in sorted(self.histograms().items()):
+            for q in QUANTILES:
+                lines.append(f'{metric}{{stage="{stage}",quantile="{q}"}} '
+                             f'{stats[f"p{int(q * 100)}"]:.6f}')
+            lines.append(f'{metric}_sum{{stage="{stage}"}} {stats["sum"]:.6f}')
+            lines.append(f'{metric}_count{{stage="{stage}"}} {stats["count"]}')
+        return "\n".join(lines) + "\n"
+
+    def write_summary(self):
+        """Append the summary and close the log (a later span reopens it)"""
+        if not self.log_path:
+            return
+        self._write({"summary": self.histograms()})
+        with self._log_lock:
+            if self._log:
+                self._log.close()
+                self._log = None
+
+    def _write(self, record):
+        line = json.dumps(record) + "\n"
+        with self._log_lock:
+            if self._log is None:
+                self._log = open(self.log_path, "a", encoding="utf-8", buffering=1)
+            self._log.write(line)
+
+
+# Shared tracer for every pipeline in this repo
+tracer = Tracer(log_path=settings.trace_log)
@@ -0,0 +1,347 @@
+"""
+Transcript Artifacts
+Recognition output (segments with word timings and confidence) saved as a
+compact columnar .npz, so later steps - subtitles, alignment, re-runs -
+load an index instead of calling recognition again:
+
+    save_transcript("talk.transcript.npz", segments, language="ta-IN",
+                    audio_hash=recognition.file_digest("talk.wav"), engine="streaming")
+    transcript = load_transcript("talk.transcript.npz")
+    transcript.words_between(60.0, 75.0)
+
+Word text is one UTF-8 blob plus offsets; times and confidences are plain
+float arrays. The audio's hash, language and engine are stored with them
+so a caller can tell whether the index still matches its input.
+TranscriptWriter builds the same columns a segment at a
+time, so a long recognition is never held as Python objects. SRT / VTT /
+JSON exports are built from the same segments and can be appended to as
+segments arrive (CueWriter, JsonWriter).
+"""
+
+import json
+from array import array
+
+import numpy as np
+
+from recognition import Segment, Word
+
+FORMAT_VERSION = 1
+MAX_CUE_CHARS = 84       # two subtitle lines of ~42 characters
+MAX_CUE_SECONDS = 7.0
+
+
+# ==============================
+# COLUMNAR STORE
+# ==============================
+def _pack(strings):
+    """[str] -> (uint8 UTF-8 blob, int64 offsets with len(strings) + 1 entries)"""
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum(np.array([len(b) for b in encoded], dtype=np.int64), out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def _unpack(blob, offsets, i):
+    return blob[offsets[i]:offsets[i + 1]].tobytes().decode("utf-8")
+
+
+def save_transcript(path, segments, language="", audio_samples=0, audio_hash="", engine=""):
+    """Write segments (recognition.Segment) as columnar arrays to `path` (.npz)"""
+    words = [word for segment in segments for word in segment.words]
+    word_blob, word_offsets = _pack([w.word for w in words])
+    text_blob, text_offsets = _pack([s.transcript for s in segments])
+
+    _save(
+        path, language, audio_samples, audio_hash, engine,
+        word_start=np.array([w.start for w in words], dtype=np.float64),
+        word_end=np.array([w.end for w in words], dtype=np.float64),
+        word_confidence=np.array([w.confidence for w in words], dtype=np.float32),
+        word_blob=word_blob,
+        word_offsets=word_offsets,
+        segment_start=np.array([s.start for s in segments], dtype=np.float64),
+        segment_end=np.array([s.end for s in segments], dtype=np.float64),
+        segment_confidence=np.array([s.confidence for s in segments], dtype=np.float32),
+        segment_blob=text_blob,
+        segment_offsets=text_offsets,
+        word_index=np.cumsum([0] + [len(s.words) for s in segments], dtype=np.int64),
+    )
+
+
+def _save(path, language, audio_samples, audio_hash, engine, **columns):
+    # words of segment i are word_index[i]:word_index[i + 1]
+    np.savez(
+        path,
+        version=np.array(FORMAT_VERSION),
+        language=np.array(language),
+        audio_samples=np.array(audio_samples, dtype=np.int64),
+        audio_hash=np.array(audio_hash),
+        engine=np.array(engine),
+        **columns
+    )
+
+
+class TranscriptWriter:
+    """
+    save_transcript() for segments that arrive over time: each add()
+    appends to typed arrays (about 30 bytes a word), save() writes the
+    same .npz.
+    """
+
+    def __init__(self, language="", audio_samples=0, audio_hash="", engine=""):
+        self.language = language
+        self.audio_samples = audio_samples
+        self.audio_hash = audio_hash
+        self.engine = engine
+        self.word_start, self.word_end, self.word_confidence = array("d"), array("d"), array("f")
+        self.segment_start, self.segment_end, self.segment_confidence = array("d"), array("d"), array("f")
+        self.word_blob, self.segment_blob = bytearray(), bytearray()
+        self.word_offsets, self.segment_offsets, self.word_index = array("q", [0]), array("q", [0]), array("q", [0])
+
+    def add(self, segment):
+        for word in segment.words:
+            self.word_start.append(word.start)
+            self.word_end.append(word.end)
+            self.word_confidence.append(word.confidence)
+            self.word_blob += word.word.encode("utf-8")
+            self.word_offsets.append(len(self.word_blob))
+
+        self.segment_start.append(segment.start)
+        self.segment_end.append(segment.end)
+        self.segment_confidence.append(segment.confidence)
+        self.segment_blob += segment.transcript.encode("utf-8")
+        self.segment_offsets.append(len(self.segment_blob))
+        self.word_index.append(len(self.word_start))
+
+    def save(self, path):
+        _save(
+            path, self.language, self.audio_samples, self.audio_hash, self.engine,
+            **{name: np.frombuffer(getattr(self, name), dtype=dtype) for name, dtype in (
+                ("word_start", np.float64), ("word_end", np.float64), ("word_confidence", np.float32),
+                ("word_blob", np.uint8), ("word_offsets", np.int64),
+                ("segment_start", np.float64), ("segment_end", np.float64), ("segment_confidence", np.float32),
+                ("segment_blob", np.uint8), ("segment_offsets", np.int64), ("word_index", np.int64),
+            )}
+        )
+
+
+class Transcript:
+    """Columnar transcript; rows are only turned into Word/Segment on request"""
+
+    def __init__(self, arrays):
+        self.language = str(arrays["language"])
+        self.audio_samples = int(arrays["audio_samples"])
+        # Absent from indexes written before they were stored - such an index matches no audio
+        self.audio_hash = str(arrays["audio_hash"]) if "audio_hash" in arrays else ""
+        self.engine = str(arrays["engine"]) if "engine" in arrays else ""
+        self.word_start = arrays["word_start"]
+        self.word_end = arrays["word_end"]
+        self.word_confidence = arrays["word_confidence"]
+        self.segment_start = arrays["segment_start"]
+        self.segment_end = arrays["segment_end"]
+        self.segment_confidence = arrays["segment_confidence"]
+        self.word_index = arrays["word_index"]
+        self._word_blob = arrays["word_blob"]
+        self._word_offsets = arrays["word_offsets"]
+        self._segment_blob = arrays["segment_blob"]
+        self._segment_offsets = arrays["segment_offsets"]
+
+    def __len__(self):
+        return len(self.segment_start)
+
+    @property
+    def word_count(self):
+        return len(self.word_start)
+
+    def word(self, i):
+        return Word(_unpack(self._word_blob, self._word_offsets, i),
+                    float(self.word_start[i]), float(self.word_end[i]), float(self.word_confidence[i]))
+
+    def segment(self, i):
+        words = [self.word(j) for j in range(self.word_index[i], self.word_index[i + 1])]
+        return Segment(float(self.segment_start[i]), float(self.segment_end[i]),
+                       _unpack(self._segment_blob, self._segment_offsets, i),
+                       float(self.segment_confidence[i]), words)
+
+    def words(self, start=0, stop=None):
+        """Words [start, stop) (every Word by default), converted column-at-a-time"""
+        stop = self.word_count if stop is None else min(stop, self.word_count)
+        start = min(start, stop)
+        offsets = (self._word_offsets[start:stop + 1] - self._word_offsets[start]).tolist()
+        blob = self._word_blob[self._word_offsets[start]:self._word_offsets[stop]].tobytes()
+        return [
+            Word(blob[offsets[i]:offsets[i + 1]].decode("utf-8"), begin, end, confidence)
+            for i, (begin, end, confidence) in enumerate(zip(
+                self.word_start[start:stop].tolist(), self.word_end[start:stop].tolist(),
+                self.word_confidence[start:stop].tolist()
+            ))
+        ]
+
+    def segments(self, start=0, stop=None):
+        """Segments [start, stop) (every Segment by default)"""
+        stop = len(self) if stop is None else min(stop, len(self))
+        start = min(start, stop)
+        index = self.word_index[start:stop + 1].tolist()
+        words = self.words(index[0], index[-1])
+        offsets = (self._segment_offsets[start:stop + 1] - self._segment_offsets[start]).tolist()
+        blob = self._segment_blob[self._segment_offsets[start]:self._segment_offsets[stop]].tobytes()
+        return [
+            Segment(begin, end, blob[offsets[i]:offsets[i + 1]].decode("utf-8"), confidence,
+                    words[index[i] - index[0]:index[i + 1] - index[0]])
+            for i, (begin, end, confidence) in enumerate(zip(
+                self.segment_start[start:stop].tolist(), self.segment_end[start:stop].tolist(),
+                self.segment_confidence[start:stop].tolist()
+            ))
+        ]
+
+    def windows(self, size):
+        """segments() `size` at a time, so a long transcript is never all Python objects at once"""
+        for start in range(0, len(self), size):
+            yield self.segments(start, start + size)
+
+    def text(self):
+        return " ".join(_unpack(self._segment_blob, self._segment_offsets, i) for i in range(len(self)))
+
+    def words_between(self, start, end):
+        """Words overlapping [start, end) seconds - binary search, no scan"""
+        lo = np.searchsorted(self.word_end, start, side="right")
+        hi = np.searchsorted(self.word_start, end, side="left")
+        return [self.word(i) for i in range(lo, hi)]
+
+
+def load_transcript(path):
+    with np.load(path) as arrays:
+        if int(arrays["version"]) != FORMAT_VERSION:
+            raise ValueError(f"{path} is transcript format {int(arrays['version'])}, expected {FORMAT_VERSION}")
+        return Transcript({name: arrays[name] for name in arrays.files})
+
+
+# ==============================
+# EXPORTS
+# ==============================
+def subtitle_cues(segments, max_chars=MAX_CUE_CHARS, max_seconds=MAX_CUE_SECONDS):
+    """
+    (start, end, text) cues. Long segments are cut at word boundaries
+    using word timings; segments without words become one cue.
+    """
+    cues = []
+    for segment in segments:
+        if not segment.words or (len(segment.transcript) <= max_chars and
+                                 segment.end - segment.start <= max_seconds):
+            if segment.transcript:
+                cues.append((segment.start, segment.end, segment.transcript))
+            continue
+
+        current = []
+        for word in segment.words:
+            if current and (len(" ".join(w.word for w in current + [word])) > max_chars or
+                            word.end - current[0].start > max_seconds):
+                cues.append((current[0].start, current[-1].end, " ".join(w.word for w in current)))
+                current = []
+            current.append(word)
+        if current:
+            cues.append((current[0].start, current[-1].end, " ".join(w.word for w in current)))
+
+    return cues
+
+
+def translated_cues(segments, texts, max_chars=MAX_CUE_CHARS):
+    """
+    Cues for translated text on the source timing: each segment's
+    translation is cut at spaces and its time shared out by length.
+    """
+    cues = []
+    for segment, text in zip(segments, texts):
+        pieces = []
+        for word in text.split():
+            if pieces and len(pieces[-1]) + 1 + len(word) <= max_chars:
+                pieces[-1] += " " + word
+            else:
+                pieces.append(word)
+
+        start = segment.start
+        per_char = (segment.end - segment.start) / max(1, sum(len(p) for p in pieces))
+        for piece in pieces:
+            end = start + len(piece) * per_char
+            cues.append((start, end, piece))
+            start = end
+
+    return cues
+
+
+def _timestamp(seconds, separator):
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3600000)
+    minutes, millis = divmod(millis, 60000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
+
+
+class CueWriter:
+    """An .srt or .vtt file that cues are appended to as they're produced (numbering carries on)"""
+
+    def __init__(self, path, fmt="srt"):
+        self.fmt = fmt
+        self.count = 0
+        self.file = open(path, "w", encoding="utf-8")
+        if fmt == "vtt":
+            self.file.write("WEBVTT\n\n")
+
+    def write(self, cues):
+        for start, end, text in cues:
+            self.count += 1
+            if self.fmt == "vtt":
+                self.file.write(f"{_timestamp(start, '.')} --> {_timestamp(end, '.')}\n{text}\n\n")
+            else:
+                self.file.write(f"{self.count}\n{_timestamp(start, ',')} --> {_timestamp(end, ',')}\n{text}\n\n")
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_srt(path, cues):
+    with CueWriter(path) as writer:
+        writer.write(cues)
+
+
+def write_vtt(path, cues):
+    with CueWriter(path, "vtt") as writer:
+        writer.write(cues)
+
+
+class JsonWriter:
+    """write_json()'s document, with segments appended as they're produced"""
+
+    def __init__(self, path, language=""):
+        self.count = 0
+        self.file = open(path, "w", encoding="utf-8")
+        self.file.write(f'{{"language": {json.dumps(language, ensure_ascii=False)}, "segments": [')
+
+    def write(self, segments):
+        for segment in segments:
+            if self.count:
+                self.file.write(", ")
+            self.count += 1
+            self.file.write(json.dumps(
+                {**segment._asdict(), "words": [word._asdict() for word in segment.words]}, ensure_ascii=False
+            ))
+
+    def close(self):
+        self.file.write("]}")
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_json(path, segments, language=""):
+    with JsonWriter(path, language) as writer:
+        writer.write(segments)
@@ -0,0 +1,200 @@
+"""
+Batched Translation
+Packs many short segments into as few Translate requests as the API
+limits allow, keeping order and segment boundaries, plus a micro-batching
+window so concurrent live utterances share one request. Long transcripts
+are split at sentence boundaries and their requests sent in parallel.
+"""
+
+import html
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import clients
+from quota import quotas
+
+# Translate v2 limits: 128 strings per request, ~5k code points recommended
+MAX_SEGMENTS_PER_REQUEST = 128
+MAX_CHARS_PER_REQUEST = 5000
+MIN_CLAUSE_CHARS = 20   # shorter clauses ride along with the next one
+
+SENTENCE_BREAK = re.compile(r'(?<=[.!?।])\s+')
+CLAUSE_BREAK = re.compile(r'(?<=[,;:])\s+')
+
+
+# ==============================
+# SPLITTING
+# ==============================
+def split_text(text, max_chars=MAX_CHARS_PER_REQUEST):
+    """
+    Cut text into chunks of at most max_chars, preferring sentence
+    boundaries, then clause boundaries, then spaces.
+    """
+    chunks = []
+    current = ""
+
+    for sentence in SENTENCE_BREAK.split(text.strip()):
+        pieces = [sentence] if len(sentence) <= max_chars else _split_long(sentence, max_chars)
+        for piece in pieces:
+            if current and len(current) + 1 + len(piece) > max_chars:
+                chunks.append(current)
+                current = piece
+            else:
+                current = f"{current} {piece}" if current else piece
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _split_long(sentence, max_chars):
+    pieces = []
+    for clause in CLAUSE_BREAK.split(sentence):
+        while len(clause) > max_chars:
+            cut = clause.rfind(" ", 0, max_chars + 1)
+            cut = cut if cut > 0 else max_chars
+            pieces.append(clause[:cut].strip())
+            clause = clause[cut:].strip()
+        if clause:
+            pieces.append(clause)
+    return pieces
+
+
+def split_clauses(text, min_chars=MIN_CLAUSE_CHARS):
+    """
+    Cut text at sentence and clause boundaries for progressive TTS, so
+    the first clause can play while the rest is still being synthesized.
+    """
+    clauses = []
+    for sentence in SENTENCE_BREAK.split(text.strip()):
+        for clause in CLAUSE_BREAK.split(sentence):
+            if clauses and len(clauses[-1]) < min_chars:
+                clauses[-1] += " " + clause
+            elif clause:
+                clauses.append(clause)
+    return clauses
+
+
+def pack_batches(segments, max_segments=MAX_SEGMENTS_PER_REQUEST, max_chars=MAX_CHARS_PER_REQUEST):
+    """
+    Group segment indices into request-sized batches, in order.
+    A segment longer than max_chars gets a batch of its own.
+    """
+    batches = []
+    current = []
+    chars = 0
+
+    for i, segment in enumerate(segments):
+        size = len(segment)
+        if current and (len(current) >= max_segments or chars + size > max_chars):
+            batches.append(current)
+            current = []
+            chars = 0
+        current.append(i)
+        chars += size
+
+    if current:
+        batches.append(current)
+    return batches
+
+
+def translate_batch(segments, source, target, client=None, max_workers=1,
+                    max_segments=MAX_SEGMENTS_PER_REQUEST, max_chars=MAX_CHARS_PER_REQUEST):
+    """
+    Translate a list of strings with the fewest requests; returns a list
+    in the same order. Requests run on up to `max_workers` threads.
+    """
+    client = client or clients.translate_client()
+    results = [""] * len(segments)
+
+    # Blank segments keep their slot but never reach the API
+    todo = [i for i, segment in enumerate(segments) if segment.strip()]
+    texts = [segments[i] for i in todo]
+    batches = pack_batches(texts, max_segments, max_chars)
+
+    # Pool threads don't inherit the caller's lane
+    priority = quotas.current_priority()
+
+    def send(batch):
+        values = [texts[i] for i in batch]
+        return quotas.call(
+            "translate",
+            lambda: client.translate(values, source_language=source, target_language=target),
+            chars=sum(len(value) for value in values),
+            priority=priority
+        )
+
+    if max_workers > 1 and len(batches) > 1:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as pool:
+            responses = list(pool.map(send, batches))   # map() keeps batch order
+    else:
+        responses = [send(batch) for batch in batches]
+
+    for batch, response in zip(batches, responses):
+        for i, item in zip(batch, response):
+            results[todo[i]] = html.unescape(item["translatedText"])
+
+    return results
+
+
+# ==============================
+# LIVE MICRO-BATCHING
+# ==============================
+class MicroBatcher:
+    """
+    Holds each submitted segment for up to `window` seconds so segments
+    arriving together (several speakers, several clients) go out as one
+    request. submit() returns a Future with the translated text.
+    """
+
+    def __init__(self, window=0.02, client=None,
+                 max_segments=MAX_SEGMENTS_PER_REQUEST, max_chars=MAX_CHARS_PER_REQUEST):
+        self.window = window
+        self.client = client
+        self.max_segments = max_segments
+        self.max_chars = max_chars
+        self._pending = {}   # (source, target) -> [(text, future)]
+        self._lock = threading.Lock()
+
+    def submit(self, text, source, target):
+        future = Future()
+        key = (source, target)
+
+        with self._lock:
+            pending = self._pending.setdefault(key, [])
+            pending.append((text, future))
+            first = len(pending) == 1
+            full = (len(pending) >= self.max_segments or
+                    sum(len(t) for t, _ in pending) >= self.max_chars)
+
+        if full:
+            self._flush(key)
+        elif first:
+            timer = threading.Timer(self.window, self._flush, args=(key,))
+            timer.daemon = True
+            timer.start()
+
+        return future
+
+    def translate(self, text, source, target):
+        return self.submit(text, source, target).result()
+
+    def _flush(self, key):
+        with self._lock:
+            pending = self._pending.pop(key, [])
+        if not pending:
+            return
+
+        try:
+            translated = translate_batch(
+                [text for text, _ in pending], *key,
+                client=self.client, max_segments=self.max_segments, max_chars=self.max_chars
+            )
+        except Exception as e:
+            for _, future in pending:
+                future.set_exception(e)
+            return
+
+        for (_, future), text in zip(pending, translated):
+            future.set_result(text)
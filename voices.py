@@ -0,0 +1,107 @@
+"""
+Voice Registry
+Which voice speaks each target language, loaded from voices.json (or
+the voices_file setting) so a new language pair is a config change:
+
+    "voices":     language -> language_code, Google voice name, optional
+                  speaking_rate / pitch / sample_rate / coqui_model
+    "directions": "source-target" -> overrides for that pair only,
+                  e.g. "fr-en": {"name": "en-GB-Neural2-B"}
+    "profiles":   audio settings per use - "live" (LINEAR16 for the
+                  translators) and "dub" (MP3 for test.py / demo.py)
+
+A setting in a direction beats the language's, which beats the profile's.
+Google's VoiceSelectionParams / AudioConfig are built once per
+(language, source, profile, overrides) and reused for every utterance.
+"""
+
+import json
+import threading
+from collections import namedtuple
+
+from config import settings
+
+VOICES_FILE = settings.voices_file
+
+Voice = namedtuple("Voice", [
+    "language", "language_code", "name", "encoding", "sample_rate", "speaking_rate", "pitch", "coqui_model",
+])
+DEFAULTS = {"encoding": "LINEAR16", "sample_rate": 0, "speaking_rate": 1.0, "pitch": 0.0, "coqui_model": None}
+
+
+class VoiceRegistry:
+
+    def __init__(self, config):
+        self.voices = config.get("voices", {})
+        self.directions = config.get("directions", {})
+        self.profiles = config.get("profiles", {})
+        self._params = {}
+        self._lock = threading.Lock()
+
+        for language, entry in self.voices.items():
+            missing = {"language_code", "name"} - set(entry)
+            if missing:
+                raise ValueError(f"Voice '{language}' is missing {', '.join(sorted(missing))}")
+
+    @classmethod
+    def load(cls, path=VOICES_FILE):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def languages(self):
+        return list(self.voices)
+
+    def voice(self, language, source=None, profile="live", **overrides):
+        """Every setting for speaking `language` (translated from `source`); None overrides are ignored"""
+        overrides = {key: value for key, value in overrides.items() if value is not None}
+        if language not in self.voices and "name" not in overrides:
+            raise ValueError(
+                f"No voice for '{language}' (choose from: {', '.join(self.voices)}) - add it to {VOICES_FILE}"
+            )
+        if profile not in self.profiles:
+            raise ValueError(f"Unknown voice profile '{profile}' (choose from: {', '.join(self.profiles)})")
+
+        merged = dict(DEFAULTS, language=language)
+        merged.update(self.profiles[profile])
+        merged.update(self.voices.get(language, {}))
+        if source:
+            merged.update(self.directions.get(f"{source}-{language}", {}))
+
+        # A voice picked by name carries its locale: "fr-CA-Neural2-A" -> "fr-CA"
+        if "name" in overrides and "language_code" not in overrides:
+            overrides["language_code"] = "-".join(overrides["name"].split("-")[:2])
+        merged.update(overrides)
+        return Voice(**{field: merged[field] for field in Voice._fields})
+
+    def google_params(self, language, source=None, profile="live", **overrides):
+        """(VoiceSelectionParams, AudioConfig) for synthesize_speech(), built on first use"""
+        key = (language, source, profile, tuple(sorted((k, v) for k, v in overrides.items() if v is not None)))
+        params = self._params.get(key)
+        if params is None:
+            with self._lock:
+                params = self._params.get(key)
+                if params is None:
+                    params = self._build(self.voice(language, source, profile, **overrides))
+                    self._params[key] = params
+        return params
+
+    @staticmethod
+    def _build(voice):
+        from google.cloud import texttospeech
+
+        selection = texttospeech.VoiceSelectionParams(language_code=voice.language_code, name=voice.name)
+        audio_config = texttospeech.AudioConfig(
+            audio_encoding=texttospeech.AudioEncoding[voice.encoding],
+            sample_rate_hertz=voice.sample_rate,   # 0 = the voice's native rate
+            speaking_rate=voice.speaking_rate,
+            pitch=voice.pitch,
+        )
+        return selection, audio_config
+
+    def coqui_models(self):
+        """language -> Coqui model name, for languages that have one"""
+        return {language: entry["coqui_model"]
+                for language, entry in self.voices.items() if entry.get("coqui_model")}
+
+
+registry = VoiceRegistry.load()
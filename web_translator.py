@@ -1,236 +1,510 @@
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, Response, render_template, jsonify, request
 from flask_socketio import SocketIO, emit
 import sounddevice as sd
-import numpy as np
+import itertools
 import queue
 import threading
 import time
-from google.cloud import speech
-from google.cloud import texttospeech
-from google.cloud import translate_v2 as translate
+
+import config
+
+if __name__ == '__main__':
+    # --output-device / --profile / --config ... before the modules below read their settings
+    config.parse_args("Live meeting translator - web UI")
+
+from backends import make_backends, prewarm, to_int16
+from emission import TranscriptEmitter, stats as emission_stats
+from jitter import JitterBuffer, parse_frame
+from quota import quotas
+from resample import CaptureConverter, input_format, play
+from tracing import tracer
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key'
 socketio = SocketIO(app, cors_allowed_origins="*")
 
-RATE = 16000
-CHUNK = int(RATE / 10)
+settings = config.settings
 
-speech_client = speech.SpeechClient()
-translate_client = translate.Client()
-tts_client = texttospeech.TextToSpeechClient()
+RATE = 16000
+CHUNK = RATE * settings.chunk_ms // 1000
 
-audio_queue = queue.Queue()
+# Per-stage backends - e.g. --stt-backend whisper --mt-backend nllb --tts-backend coqui runs fully offline
+backends = make_backends()
+warm_up_lock = threading.Lock()   # backends are pre-warmed once per process (handle_connect)
+warmed_up = False
 
-# Audio device configuration
+# Audio device configuration: an index or (part of) a name, per machine
+# in a config file or --input-device / --output-device.
 # Run setup_audio_devices.py to find your device IDs
-INPUT_DEVICE = 2   # CABLE Output - captures Meet audio
-OUTPUT_DEVICE = 15  # CABLE Input - sends translated audio to Meet
-
-# Translation state
-translation_state = {
-    'active': False,
-    'source_lang': 'fr',
-    'target_lang': 'en',
-    'source_lang_code': 'fr-FR',
-    'source_lang_name': 'French',
-    'target_lang_name': 'English'
+INPUT_DEVICE = settings.input_device     # CABLE Output - captures Meet audio
+OUTPUT_DEVICE = settings.output_device   # CABLE Input - sends translated audio to Meet
+
+# Duplex mode also translates you: your mic goes the other way into Meet,
+# and the other side's translation plays on your headphones
+LOCAL_INPUT_DEVICE = settings.local_input_device   # your microphone (None = default)
+LISTEN_DEVICE = settings.listen_device             # your headphones/speakers (None = default)
+
+# Where a session's audio comes from unless the client asks:
+# "device" = INPUT_DEVICE on this machine, "browser" = the user's mic via Socket.IO
+AUDIO_SOURCE = settings.audio_source
+JITTER_TARGET_MS = settings.jitter_target_ms
+
+# Where translated speech plays unless the client asks:
+# "device" = OUTPUT_DEVICE on this machine, "browser" = streamed to the page, clause by clause
+PLAYBACK = settings.playback
+
+DIRECTIONS = {
+    'fr-en': {
+        'source_lang': 'fr',
+        'target_lang': 'en',
+        'source_lang_code': 'fr-FR',
+        'source_lang_name': 'French',
+        'target_lang_name': 'English'
+    },
+    'en-fr': {
+        'source_lang': 'en',
+        'target_lang': 'fr',
+        'source_lang_code': 'en-US',
+        'source_lang_name': 'English',
+        'target_lang_name': 'French'
+    },
+}
+
+# 'auto' direction: one stream hears either language and each final goes
+# the other way. First code is the primary recognition language.
+AUTO = 'auto'
+DETECT_LANGUAGES = {
+    'fr-FR': 'fr-en',
+    'en-US': 'en-fr',
 }
 
-stream = None
-streaming_thread = None
-stop_streaming = threading.Event()
 
-def audio_callback(indata, frames, time_info, status):
-    if status:
-        print(f"⚠️  Audio callback status: {status}")
-    if translation_state['active'] and not stop_streaming.is_set():
-        audio_queue.put(indata.copy())
-        # Debug: Show we're receiving audio every 100 chunks
-        if audio_queue.qsize() % 100 == 0:
-            print(f"📊 Audio queue size: {audio_queue.qsize()} (receiving audio)")
+# ==============================
+# SESSIONS
+# ==============================
+def reverse_direction(direction):
+    """'fr-en' -> 'en-fr' ('auto' already covers both)"""
+    return "-".join(reversed(direction.split("-")))
+
+
+class Lane:
+    """
+    One recognition stream in one direction, fed by its session's capture.
+    Switching direction starts a new lane; the old one is finished and
+    still translates whatever was said before the switch.
+    """
+
+    def __init__(self, direction):
+        self.direction = direction
+        self.state = dict(DIRECTIONS[direction]) if direction != AUTO else None
+        self.queue = queue.Queue()
+
+    @property
+    def label(self):
+        if self.direction == AUTO:
+            names = [DIRECTIONS[d]['source_lang_name'] for d in DETECT_LANGUAGES.values()]
+            return f"Auto-detect ({' ⇄ '.join(names)})"
+        return f"{self.state['source_lang_name']} → {self.state['target_lang_name']}"
+
+    def results(self):
+        """(transcript, is_final, direction) - per result when detecting, else always this lane's"""
+        if self.direction == AUTO:
+            responses = backends.stt.stream_detect(self.chunks(), list(DETECT_LANGUAGES), RATE)
+            for transcript, is_final, language_code in responses:
+                yield transcript, is_final, DETECT_LANGUAGES[language_code]
+        else:
+            responses = backends.stt.stream(self.chunks(), self.state['source_lang_code'], RATE)
+            for transcript, is_final in responses:
+                yield transcript, is_final, self.direction
+
+    def feed(self, pcm):
+        self.queue.put(pcm)
+
+    def finish(self):
+        self.queue.put(None)
+
+    def chunks(self):
+        while True:
+            pcm = self.queue.get()
+            if pcm is None:
+                return
+            yield pcm
+
+
+class Session:
+    """One audio input: where its audio comes from, who sees its results and where they play"""
+
+    def __init__(self, room=None):
+        self.room = room   # Socket.IO sid, or None to broadcast
+        self.state = dict(active=False, playback=PLAYBACK)
+        self.output_device = OUTPUT_DEVICE
+        self.lane = None
+        self.stop = threading.Event()
+        self.thread = None
+        self.capture = None
+        self._lane_lock = threading.Lock()
+        # Interim/final transcripts go out coalesced at TRANSCRIPT_FPS
+        self.transcripts = TranscriptEmitter(lambda event, data: self.emit(event, data))
+
+    def emit(self, event, data=None):
+        socketio.emit(event, data, to=self.room)
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def chunks(self):
+        """Raw int16 bytes for the recognizer"""
+        raise NotImplementedError
+
+    def feed(self, pcm):
+        with self._lane_lock:
+            self.lane.feed(pcm)
+
+    def replace_lane(self, lane):
+        """Chunks go to `lane` from now on; the old lane gets none after its end marker"""
+        with self._lane_lock:
+            old, self.lane = self.lane, lane
+            if old:
+                old.finish()
+
+    @property
+    def description(self):
+        return "audio"
+
+
+class DeviceSession(Session):
+    """Captures an input device on the server host (e.g. a VB-Cable from Meet)"""
+
+    def __init__(self, room=None, device=INPUT_DEVICE):
+        super().__init__(room)
+        self.device = device
+        self.queue = queue.Queue()
+        self.stream = None
+        self.converter = None
+
+    @property
+    def description(self):
+        return f"device: {self.device if self.device is not None else 'Default'}"
+
+    def audio_callback(self, indata, frames, time_info, status):
+        if status:
+            print(f"⚠️  Audio callback status: {status}")
+        if self.state['active'] and not self.stop.is_set():
+            self.queue.put((time.monotonic(), indata.copy()))
+            # Debug: Show we're receiving audio every 100 chunks
+            if self.queue.qsize() % 100 == 0:
+                print(f"📊 Audio queue size: {self.queue.qsize()} (receiving audio)")
+
+    def open(self):
+        # Drop audio left over from the previous stream
+        while not self.queue.empty():
+            self.queue.get()
+
+        # Open at the device's own format; chunks() converts to RATE mono
+        rate, channels = input_format(self.device)
+        self.converter = CaptureConverter(rate, channels, RATE)
+        self.stream = sd.InputStream(
+            samplerate=rate,
+            blocksize=rate * settings.chunk_ms // 1000,
+            dtype="int16",
+            channels=channels,
+            device=self.device,
+            callback=self.audio_callback,
+        )
+        self.stream.start()
 
+    def close(self):
+        if self.stream:
+            try:
+                self.stream.stop()
+                self.stream.close()
+            except:
+                pass
+            self.stream = None
 
-def audio_generator():
-    while translation_state['active']:
-        try:
-            chunk = audio_queue.get(timeout=1)
-            yield speech.StreamingRecognizeRequest(
-                audio_content=chunk.tobytes()
-            )
-        except queue.Empty:
-            continue
+    def chunks(self):
+        while self.state['active']:
+            try:
+                queued_at, chunk = self.queue.get(timeout=1)
+                tracer.record("capture", time.monotonic() - queued_at)
+                yield self.converter.convert(chunk).tobytes()
+            except queue.Empty:
+                continue
 
 
-def speak_text(text, lang_code):
+class BrowserSession(Session):
+    """Audio captured by the browser's AudioWorklet, sent as numbered 16 kHz int16 frames"""
+
+    def __init__(self, room):
+        super().__init__(room)
+        self.buffer = JitterBuffer(target_ms=JITTER_TARGET_MS)
+
+    @property
+    def description(self):
+        return f"browser: {self.room}"
+
+    def open(self):
+        self.buffer.reset()
+
+    def chunks(self):
+        for received_at, pcm in self.buffer.chunks(CHUNK * 2, self.stop):
+            if not self.state['active']:
+                break
+            # Time spent in the jitter buffer
+            tracer.record("capture", time.monotonic() - received_at)
+            yield pcm
+
+
+# Server audio devices can each feed one stream; browsers get one each
+device_session = DeviceSession()
+local_session = DeviceSession(device=LOCAL_INPUT_DEVICE)
+browser_sessions = {}
+client_sessions = {}   # sid -> [(session, reversed)] that client started
+
+
+def session_for(sid, source=None):
+    source = source or AUDIO_SOURCE
+    if source == "browser":
+        if sid not in browser_sessions:
+            browser_sessions[sid] = BrowserSession(sid)
+        return browser_sessions[sid]
+    if source == "local":
+        return local_session
+    return device_session
+
+
+def sessions_for(sid, data):
+    """
+    [(session, reversed)] a start request drives: one session, or in
+    duplex mode the meeting input plus your own mic going the other way.
+    """
+    primary = session_for(sid, data.get('source'))
+    if not data.get('duplex'):
+        primary.output_device = OUTPUT_DEVICE
+        return [(primary, False)]
+
+    local = local_session if primary is device_session else primary
+    device_session.output_device = LISTEN_DEVICE
+    local.output_device = OUTPUT_DEVICE
+    return [(device_session, False), (local, True)]
+
+
+# ==============================
+# PIPELINE
+# ==============================
+def speak_text(session, text, lang_code, utterance_start, playback, source=None):
     """Generate and play audio"""
-    synthesis_input = texttospeech.SynthesisInput(text=text)
+    if playback == "browser":
+        send_speech(session, text, lang_code, utterance_start, source)
+        return
 
-    if lang_code == "fr":
-        voice = texttospeech.VoiceSelectionParams(
-            language_code="fr-FR",
-            name="fr-FR-Neural2-B"
-        )
-    else:
-        voice = texttospeech.VoiceSelectionParams(
-            language_code="en-US",
-            name="en-US-Neural2-D"
-        )
+    with tracer.span("synthesize"):
+        audio_data, rate = backends.tts.synthesize(text, lang_code, source)
+
+    tracer.record("first_sound", time.monotonic() - utterance_start)
+    with tracer.span("playback"):
+        play(audio_data, rate, device=session.output_device)
+    tracer.record("end_to_end", time.monotonic() - utterance_start)
+
+
+def send_speech(session, text, lang_code, utterance_start, source=None):
+    """
+    Push each clause to the page as soon as it is synthesized; the page
+    queues them back to back with Web Audio and reports when they play.
+    """
+    # Server wall clock at the start of the utterance, for the page's report
+    started_ms = (time.time() - (time.monotonic() - utterance_start)) * 1000
+    clauses = backends.tts.synthesize_clauses(text, lang_code, source)
+
+    for index in itertools.count():
+        with tracer.span("synthesize"):
+            audio = next(clauses, None)
+        if audio is None:
+            break
+
+        samples, rate = audio
+        session.emit('tts_audio', {
+            'utterance': tracer.current_utterance(),
+            'index': index,
+            'rate': rate,
+            'started_at': started_ms,
+            'sent_at': time.time() * 1000,
+            'pcm': to_int16(samples).tobytes(),
+        })
+
+
+def run_capture(session):
+    """Feed the session's audio to its current lane - a direction switch never reopens the input"""
+    try:
+        for pcm in session.chunks():
+            session.feed(pcm)
+    except Exception as e:
+        if not session.stop.is_set():
+            print(f"❌ Capture error: {e}")
+            session.emit('error', {'message': str(e)})
+    finally:
+        print("🧹 Cleaning up audio stream...")
+        session.close()
+        session.replace_lane(None)
+        print("✅ Stream cleanup complete")
 
-    audio_config = texttospeech.AudioConfig(
-        audio_encoding=texttospeech.AudioEncoding.LINEAR16,
-        sample_rate_hertz=RATE
-    )
-
-    response = tts_client.synthesize_speech(
-        input=synthesis_input,
-        voice=voice,
-        audio_config=audio_config
-    )
-
-    audio_data = np.frombuffer(response.audio_content, dtype=np.int16)
-    sd.play(
-    audio_data,
-    RATE,
-    device=OUTPUT_DEVICE
-)
-    sd.wait()
-
-
-def run_streaming():
-    """Background streaming translation"""
-    global stream
-    
-    print(f"🎤 Starting speech recognition for {translation_state['source_lang_code']}...")
-    
-    config = speech.RecognitionConfig(
-        encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
-        sample_rate_hertz=RATE,
-        language_code=translation_state['source_lang_code'],
-        model="default",
-        enable_automatic_punctuation=True,
-    )
-
-    streaming_config = speech.StreamingRecognitionConfig(
-        config=config,
-        interim_results=True,
-        single_utterance=False
-    )
+
+def run_lane(session, lane):
+    """Recognize one lane's audio and translate its finals until the lane is finished"""
+    playback = session.state['playback']
 
     last_transcript = ""
+    utterance_id = None
+    utterance_start = None
 
-    def translate_and_speak(text):
+    def translate_and_speak(text, direction, utterance_id, utterance_start):
+        state = DIRECTIONS[direction]
         try:
-            socketio.emit('translation_status', {'status': 'translating'})
-            
-            translated = translate_client.translate(
-                text,
-                source_language=translation_state['source_lang'],
-                target_language=translation_state['target_lang']
-            )
-
-            translated_text = translated["translatedText"]
+            session.emit('translation_status', {'status': 'translating', 'direction': direction})
             
-            socketio.emit('translation_result', {
-                'source': text,
-                'target': translated_text,
-                'source_lang': translation_state['source_lang_name'],
-                'target_lang': translation_state['target_lang_name']
-            })
-
-            speak_text(translated_text, translation_state['target_lang'])
+            with tracer.bind(utterance_id):
+                with tracer.span("translate"):
+                    translated_text = backends.mt.translate(
+                        text,
+                        state['source_lang'],
+                        state['target_lang']
+                    )
+                
+                session.emit('translation_result', {
+                    'source': text,
+                    'target': translated_text,
+                    'source_lang': state['source_lang_name'],
+                    'target_lang': state['target_lang_name'],
+                    'direction': direction
+                })
+
+                speak_text(session, translated_text, state['target_lang'], utterance_start, playback,
+                           state['source_lang'])
             
         except Exception as e:
             print(f"❌ Translation error: {e}")
-            socketio.emit('error', {'message': str(e)})
-
-    # Create audio input stream
-    try:
-        print(f"🎤 Opening audio input stream (device: {INPUT_DEVICE})...")
-        stream = sd.InputStream(
-            samplerate=RATE,
-            blocksize=CHUNK,
-            dtype="int16",
-            channels=1,
-            device=INPUT_DEVICE,
-            callback=audio_callback,
-        )
-        
-        stream.start()
-        print(f"✅ Audio stream started for {translation_state['source_lang_name']} → {translation_state['target_lang_name']}")
-        socketio.emit('ready', {'message': 'Listening...'})
-        
-    except Exception as e:
-        print(f"❌ Failed to start audio stream: {e}")
-        socketio.emit('error', {'message': f'Microphone error: {str(e)}'})
-        translation_state['active'] = False
-        return
+            session.emit('error', {'message': str(e)})
 
     try:
-        print(f"🎤 Starting speech recognition for {translation_state['source_lang_code']}...")
-        print(f"📡 Connected to Google Speech API, listening for speech...")
-        
-        requests = audio_generator()
-        responses = speech_client.streaming_recognize(
-            streaming_config,
-            requests,
-        )
+        print(f"🎤 Starting speech recognition ({lane.label})...")
+        print(f"📡 Connected to {type(backends.stt).__name__}, listening for speech...")
 
-        for response in responses:
+        for transcript, is_final, direction in lane.results():
             # Check if we should stop
-            if stop_streaming.is_set() or not translation_state['active']:
+            if session.stop.is_set():
                 print("🛑 Stopping stream (signal received)")
                 break
                 
-            if not response.results:
+            if not transcript.strip():
                 continue
+
+            # First result of a new utterance starts its trace
+            if utterance_id is None:
+                utterance_id = tracer.new_utterance()
+                utterance_start = time.monotonic()
+
+            if is_final:
+                print(f"✅ Final transcript ({direction}): {transcript}")
+                tracer.record("recognize", time.monotonic() - utterance_start, utterance_id)
+                session.transcripts.final(direction, transcript)
                 
-            for result in response.results:
-                if not result.alternatives:
-                    continue
+                if transcript.strip() and transcript != last_transcript:
+                    last_transcript = transcript
                     
-                transcript = result.alternatives[0].transcript
+                    thread = threading.Thread(
+                        target=translate_and_speak, 
+                        args=(transcript, direction, utterance_id, utterance_start),
+                        daemon=True
+                    )
+                    thread.start()
+
+                utterance_id = None
+                
+            else:
+                session.transcripts.interim(direction, transcript)
                 
-                if not transcript.strip():
-                    continue
-
-                if result.is_final:
-                    print(f"✅ Final transcript: {transcript}")
-                    socketio.emit('transcript', {
-                        'text': transcript,
-                        'is_final': True
-                    })
-                    
-                    if transcript.strip() and transcript != last_transcript:
-                        last_transcript = transcript
-                        
-                        thread = threading.Thread(
-                            target=translate_and_speak, 
-                            args=(transcript,),
-                            daemon=True
-                        )
-                        thread.start()
-                    
-                else:
-                    socketio.emit('transcript', {
-                        'text': transcript,
-                        'is_final': False
-                    })
-                    
     except Exception as e:
-        if not stop_streaming.is_set():
+        if not session.stop.is_set():
             print(f"❌ Streaming error: {e}")
-            socketio.emit('error', {'message': str(e)})
+            session.emit('error', {'message': str(e)})
     finally:
-        print("🧹 Cleaning up audio stream...")
-        if stream:
-            try:
-                stream.stop()
-                stream.close()
-            except:
-                pass
-            stream = None
-        print("✅ Stream cleanup complete")
+        if session.lane is lane:
+            # The recognizer ended on its own rather than by a switch - nothing left to feed
+            session.state['active'] = False
+            session.stop.set()
+        print(f"✅ {lane.label} stream finished")
+
+
+def run_streaming(session):
+    """Open the session's input, start capturing and recognize its first lane in this thread"""
+    try:
+        print(f"🎤 Opening audio input ({session.description})...")
+        session.open()
+        print(f"✅ Audio stream started for {session.lane.label}")
+        session.emit('ready', {'message': 'Listening...'})
+        
+    except Exception as e:
+        print(f"❌ Failed to start audio stream: {e}")
+        session.emit('error', {'message': f'Microphone error: {str(e)}'})
+        session.state['active'] = False
+        return
+
+    session.capture = threading.Thread(target=run_capture, args=(session,), daemon=True)
+    session.capture.start()
+    run_lane(session, session.lane)
+
+
+def start_session(session, direction, playback=None, room=None):
+    # A stream that ended on its own may still be closing its input; let it
+    # finish first or its cleanup would end the new lane
+    if session.state['active'] or (session.capture and session.capture.is_alive()):
+        stop_session(session)
+
+    direction = direction if direction in DIRECTIONS or direction == AUTO else 'en-fr'
+    session.state['playback'] = playback or PLAYBACK
+    session.state['active'] = True
+    session.room = room or session.room
+    session.stop.clear()
+    session.replace_lane(Lane(direction))
+
+    print(f"✅ Starting translation: {session.lane.label}")
+
+    # Start streaming in background thread
+    session.thread = threading.Thread(target=run_streaming, args=(session,), daemon=True)
+    session.thread.start()
+
+
+def switch_direction(session, direction):
+    """
+    Start a recognizer for the new direction and hand it the very next
+    chunk; the old one drains on its own thread. Nothing is torn down,
+    so no speech is lost in the switch.
+    """
+    if session.lane and session.lane.direction == direction:
+        return
+
+    lane = Lane(direction)
+    threading.Thread(target=run_lane, args=(session, lane), daemon=True).start()
+    session.replace_lane(lane)
+    print(f"🔄 Switched to {lane.label}")
+
+
+def stop_session(session):
+    session.stop.set()
+    session.state['active'] = False
+    session.close()
+
+    # Wait for threads to finish
+    for thread in (session.capture, session.thread):
+        if thread and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=2)
+
+
+def status_text(pairs):
+    return " | ".join(session.lane.label for session, _ in pairs if session.lane)
 
 
 @app.route('/')
@@ -238,99 +512,111 @@ def index():
     return render_template('translator.html')
 
 
+@app.route('/metrics')
+def metrics():
+    """Per-stage latency quantiles, transcript emission and API quota counters in Prometheus text format"""
+    return Response(tracer.prometheus_text() + emission_stats.prometheus_text() + quotas.prometheus_text(),
+                    mimetype='text/plain; version=0.0.4')
+
+
+@app.route('/metrics.json')
+def metrics_json():
+    return jsonify(tracer.histograms())
+
+
+@app.route('/metrics/emission.json')
+def metrics_emission_json():
+    """Transcript messages and bytes per second, per-result (before) vs coalesced (after)"""
+    return jsonify(emission_stats.snapshot())
+
+
+@app.route('/metrics/quota.json')
+def metrics_quota_json():
+    """Per-API calls, retries, 429s, queued requests and circuit state"""
+    return jsonify(quotas.snapshot())
+
+
+@socketio.on('connect')
+def handle_connect():
+    # Warm connections/models while the first user is still picking a
+    # direction - once per process, not on every page load or reconnect
+    global warmed_up
+    with warm_up_lock:
+        if warmed_up:
+            return
+        warmed_up = True
+    prewarm(backends)
+
+
+@socketio.on('disconnect')
+def handle_disconnect():
+    for session, _ in client_sessions.pop(request.sid, []):
+        stop_session(session)
+    session = browser_sessions.pop(request.sid, None)
+    if session:
+        stop_session(session)
+        session.transcripts.close()
+
+
+@socketio.on('clock_sync')
+def handle_clock_sync(client_ms):
+    """Ack with server time so the browser can stamp frames on the server clock"""
+    return time.time() * 1000
+
+
+@socketio.on('audio_frame')
+def handle_audio_frame(packet):
+    session = browser_sessions.get(request.sid)
+    if session and session.state['active']:
+        session.buffer.push(*parse_frame(packet))
+
+
 @socketio.on('start_translation')
 def handle_start(data):
-    global translation_state, streaming_thread, stop_streaming
-    
     direction = data.get('direction', 'fr-en')
-    
-    if direction == 'fr-en':
-        translation_state.update({
-            'source_lang': 'fr',
-            'target_lang': 'en',
-            'source_lang_code': 'fr-FR',
-            'source_lang_name': 'French',
-            'target_lang_name': 'English'
-        })
-    else:
-        translation_state.update({
-            'source_lang': 'en',
-            'target_lang': 'fr',
-            'source_lang_code': 'en-US',
-            'source_lang_name': 'English',
-            'target_lang_name': 'French'
-        })
-    
-    translation_state['active'] = True
-    stop_streaming.clear()
-    
-    # Clear audio queue
-    while not audio_queue.empty():
-        audio_queue.get()
-    
-    print(f"✅ Starting translation: {translation_state['source_lang_name']} → {translation_state['target_lang_name']}")
-    
-    emit('status', {
-        'active': True,
-        'direction': f"{translation_state['source_lang_name']} → {translation_state['target_lang_name']}"
-    })
-    
-    # Start streaming in background thread
-    streaming_thread = threading.Thread(target=run_streaming, daemon=True)
-    streaming_thread.start()
+    pairs = sessions_for(request.sid, data)
+
+    for session, reverse in pairs:
+        # Your own mic in duplex mode always plays into the meeting
+        playback = "device" if reverse else data.get('playback')
+        start_session(session, reverse_direction(direction) if reverse else direction,
+                      playback, room=request.sid)
+    client_sessions[request.sid] = pairs
+
+    emit('status', {'active': True, 'direction': status_text(pairs)})
+
+
+@socketio.on('playback_started')
+def handle_playback_started(data):
+    """The page queued a tts_audio chunk; times are server clock ms"""
+    utterance = data['utterance']
+    tracer.record("downlink", max(0.0, data['received_at'] - data['sent_at']) / 1000, utterance)
+    # Time spent behind audio that was still playing
+    tracer.record("playout_wait", max(0.0, data['plays_at'] - data['received_at']) / 1000, utterance)
+    if data['index'] == 0:
+        tracer.record("first_sound", (data['received_at'] - data['started_at']) / 1000, utterance)
 
 
 @socketio.on('stop_translation')
-def handle_stop():
-    global translation_state, stream, stop_streaming, streaming_thread
-    
+def handle_stop(data=None):
     print("🛑 Stopping translation...")
-    stop_streaming.set()
-    translation_state['active'] = False
-    
-    if stream:
-        try:
-            stream.stop()
-            stream.close()
-        except:
-            pass
-        stream = None
-    
-    # Wait for thread to finish
-    if streaming_thread and streaming_thread.is_alive():
-        streaming_thread.join(timeout=2)
+    for session, _ in client_sessions.pop(request.sid, []):
+        stop_session(session)
     
     emit('status', {'active': False})
 
 
 @socketio.on('change_direction')
 def handle_change_direction(data):
-    global stop_streaming, streaming_thread
-    
     print(f"🔄 Changing direction to: {data.get('direction')}")
-    
-    # Signal the streaming thread to stop
-    stop_streaming.set()
-    translation_state['active'] = False
-    
-    # Wait for thread to finish
-    if streaming_thread and streaming_thread.is_alive():
-        print("⏳ Waiting for old stream to stop...")
-        streaming_thread.join(timeout=2)
-    
-    # Clear the stop flag
-    stop_streaming.clear()
-    
-    # Clear audio queue
-    while not audio_queue.empty():
-        audio_queue.get()
-    
-    # Wait a moment for cleanup
-    time.sleep(0.3)
-    
-    # Start with new direction
-    print("▶️  Starting new stream...")
-    handle_start(data)
+    direction = data.get('direction', 'fr-en')
+    pairs = client_sessions.get(request.sid, [])
+
+    # Streams and inputs stay open - each session just moves to a new lane
+    for session, reverse in pairs:
+        switch_direction(session, reverse_direction(direction) if reverse else direction)
+
+    emit('status', {'active': True, 'direction': status_text(pairs)})
 
 
 if __name__ == '__main__':
@@ -352,7 +638,12 @@ if __name__ == '__main__':
     
     # Show current configuration
     print(f"\n⚙️  Current Configuration:")
+    print(f"  Profile: {settings.profile or 'default'} (--print-config shows every setting)")
+    print(f"  Audio Source: {AUDIO_SOURCE} (browser sessions can always send their own mic)")
     print(f"  Input Device: {INPUT_DEVICE if INPUT_DEVICE is not None else 'Default'}")
+    print(f"  Duplex: mic {LOCAL_INPUT_DEVICE if LOCAL_INPUT_DEVICE is not None else 'Default'}"
+          f" → Meet, Meet → {LISTEN_DEVICE if LISTEN_DEVICE is not None else 'Default'}")
+    print(f"  Playback: {PLAYBACK} (browser playback needs no virtual cable)")
     print(f"  Output Device: {OUTPUT_DEVICE if OUTPUT_DEVICE is not None else 'Default'}")
     
     if INPUT_DEVICE is None or OUTPUT_DEVICE is None:
@@ -360,8 +651,8 @@ if __name__ == '__main__':
         print("   Run 'python setup_audio_devices.py' to configure")
     
     print("\n🌐 Starting web server...")
-    print("📱 Open your browser and go to: http://localhost:5000")
-    print("\n💡 You can switch translation direction on the fly!")
+    print(f"📱 Open your browser and go to: http://localhost:{settings.web_port}")
+    print("\n💡 You can switch translation direction on the fly, or translate both ways at once (duplex)!")
     print("Press Ctrl+C to stop\n")
     
-    socketio.run(app, debug=False, host='0.0.0.0', port=5000)
+    socketio.run(app, debug=False, host=settings.web_host, port=settings.web_port)